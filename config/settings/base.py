@@ -27,6 +27,7 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     "django.contrib.sites",
     "django.contrib.humanize",
+    "django.contrib.postgres",
 ]
 
 THIRD_PARTY_APPS = [
@@ -179,6 +180,7 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
 }
@@ -209,6 +211,16 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": getenv("REDIS_URL", "redis://redis:6379/1"),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    }
+}
+
 if USE_TZ:
     CELERY_TIMEZONE = TIME_ZONE
 
@@ -225,17 +237,52 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_WORKER_SEND_TASK_EVENTS = True
+CELERY_BEAT_SCHEDULE = {
+    "replenish-account-number-pool": {
+        "task": "replenish_account_number_pool",
+        "schedule": timedelta(minutes=5),
+    },
+    "replenish-username-pool": {
+        "task": "replenish_username_pool",
+        "schedule": timedelta(minutes=5),
+    },
+    "flush-content-views": {
+        "task": "flush_content_views",
+        "schedule": timedelta(minutes=1),
+    },
+    "open-pending-accounts": {
+        "task": "open_pending_accounts",
+        "schedule": timedelta(minutes=10),
+    },
+    "purge-stale-chunked-uploads": {
+        "task": "purge_stale_chunked_uploads",
+        "schedule": timedelta(hours=1),
+    },
+    "rebuild-account-number-filter": {
+        "task": "rebuild_account_number_filter",
+        "schedule": timedelta(hours=6),
+    },
+}
 
 CLOUDINARY_CLOUD_NAME = getenv("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = getenv("CLOUDINARY_API_KEY")
 CLOUDINARY_API_SECRET = getenv("CLOUDINARY_API_SECRET")
 
+CLOUDINARY_UPLOAD_PREFIX = getenv("CLOUDINARY_UPLOAD_PREFIX")
+
 cloudinary.config(
     cloud_name=CLOUDINARY_CLOUD_NAME,
     api_key=CLOUDINARY_API_KEY,
     api_secret=CLOUDINARY_API_SECRET,
 )
 
+if CLOUDINARY_UPLOAD_PREFIX:
+    cloudinary.config(upload_prefix=CLOUDINARY_UPLOAD_PREFIX)
+
+PHOTO_UPLOAD_TEMP_DIR = getenv("PHOTO_UPLOAD_TEMP_DIR") or str(
+    BASE_DIR / "tmp" / "photo_uploads"
+)
+
 COOKIE_NAME = "access"
 COOKIE_SAMESITE = "Lax"
 COOKIE_PATH = "/"
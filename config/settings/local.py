@@ -41,3 +41,53 @@ LOCKOUT_DURATION = timedelta(minutes=1)
 LOGIN_ATTEMPTS = 3
 
 OTP_EXPIRATION = timedelta(minutes=1)
+OTP_STORE_BACKEND = "core_apps.user_auth.otp.RedisOTPStore"
+OTP_MAX_ATTEMPTS = 5
+
+BATCH_TRANSFER_MAX_ITEMS = 5000
+
+STATEMENT_EXPORT_CHUNK_SIZE = 2000
+
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+
+IDENTIFIER_POOL_SIZE = 1000
+
+ACCOUNT_NUMBER_FILTER_SIZE = 2**24
+
+ACCOUNT_NUMBER_FILTER_HASHES = 7
+
+ACCOUNT_NUMBER_FILTER_REFRESH = 60
+
+FLOW_STATE_TTL = OTP_EXPIRATION * 5
+
+USER_SNAPSHOT_TTL = 5 * 60
+
+USER_SNAPSHOT_LOCAL_TTL = 5
+
+USER_SNAPSHOT_LOCAL_SIZE = 10_000
+
+FAST_JSON_RENDERER = True
+
+CONTENT_VIEW_FLUSH_BATCH_SIZE = 500
+
+PHOTO_UPLOAD_WORKERS = 3
+
+PHOTO_OUTPUT_FORMAT = "WEBP"
+
+PHOTO_MAX_DIMENSIONS = (1600, 1600)
+
+PHOTO_QUALITY = 80
+
+PHOTO_THUMBNAIL_DIMENSIONS = (200, 200)
+
+PHOTO_THUMBNAIL_QUALITY = 70
+
+CHUNKED_UPLOAD_CHUNK_SIZE = 1 * 1024 * 1024
+
+CHUNKED_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+
+CHUNKED_UPLOAD_TTL = 24 * 60 * 60
+
+ACCOUNT_OPENING_BATCH_SIZE = 200
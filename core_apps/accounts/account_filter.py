@@ -0,0 +1,112 @@
+import hashlib
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from loguru import logger
+from redis.exceptions import RedisError
+
+from .models import BankAccount
+
+BLOOM_KEY = "account_numbers:bloom"
+BLOOM_READY_KEY = "account_numbers:bloom:ready"
+
+
+class AccountNumberFilter:
+    """Bloom filter over issued account numbers, shared through a Redis bitmap.
+
+    Each process keeps a copy of the bitmap and reloads it every
+    ``ACCOUNT_NUMBER_FILTER_REFRESH`` seconds. A local miss is confirmed
+    against Redis before rejecting, so accounts opened by another process
+    since the last reload are never reported as unknown.
+    """
+
+    def __init__(self, size: int, hashes: int, refresh: int) -> None:
+        self.size = size
+        self.hashes = hashes
+        self.refresh = refresh
+        self._bits: bytes | None = None
+        self._loaded_at = 0.0
+
+    def _positions(self, account_number: str) -> list[int]:
+        digest = hashlib.blake2b(account_number.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def _local_bits(self, connection) -> bytes | None:
+        if self._bits is None or time.monotonic() - self._loaded_at > self.refresh:
+            if connection.exists(BLOOM_READY_KEY):
+                self._bits = connection.get(BLOOM_KEY) or b""
+            else:
+                self._bits = None
+            self._loaded_at = time.monotonic()
+        return self._bits
+
+    @staticmethod
+    def _is_set(bits: bytes, position: int) -> bool:
+        index = position >> 3
+        return index < len(bits) and bool(bits[index] & (0x80 >> (position & 7)))
+
+    def might_contain(self, account_number: str) -> bool:
+        positions = self._positions(account_number)
+        try:
+            connection = get_redis_connection("default")
+            bits = self._local_bits(connection)
+            if bits is None:
+                return True
+            if all(self._is_set(bits, position) for position in positions):
+                return True
+
+            pipeline = connection.pipeline(transaction=False)
+            for position in positions:
+                pipeline.getbit(BLOOM_KEY, position)
+            return all(pipeline.execute())
+        except RedisError as e:
+            logger.warning(f"Account number filter unavailable: {e}")
+            return True
+
+    def add(self, account_number: str) -> None:
+        try:
+            pipeline = get_redis_connection("default").pipeline(transaction=False)
+            for position in self._positions(account_number):
+                pipeline.setbit(BLOOM_KEY, position, 1)
+            pipeline.execute()
+        except RedisError as e:
+            logger.error(f"Failed to add {account_number} to account filter: {e}")
+
+    def rebuild(self, account_numbers: Iterable[str]) -> int:
+        bits = bytearray((self.size + 7) // 8)
+        count = 0
+        for account_number in account_numbers:
+            for position in self._positions(account_number):
+                bits[position >> 3] |= 0x80 >> (position & 7)
+            count += 1
+
+        # Bits added while the snapshot was being read are OR-ed back in
+        # before the swap, so concurrent account creation is never lost.
+        connection = get_redis_connection("default")
+        staging_key = f"{BLOOM_KEY}:rebuild"
+        connection.set(staging_key, bytes(bits))
+        pipeline = connection.pipeline(transaction=True)
+        pipeline.bitop("OR", staging_key, staging_key, BLOOM_KEY)
+        pipeline.rename(staging_key, BLOOM_KEY)
+        pipeline.set(BLOOM_READY_KEY, 1)
+        pipeline.execute()
+        self._bits = None
+        return count
+
+
+account_number_filter = AccountNumberFilter(
+    size=settings.ACCOUNT_NUMBER_FILTER_SIZE,
+    hashes=settings.ACCOUNT_NUMBER_FILTER_HASHES,
+    refresh=settings.ACCOUNT_NUMBER_FILTER_REFRESH,
+)
+
+
+def rebuild_account_number_filter() -> int:
+    account_numbers = BankAccount.objects.values_list(
+        "account_number", flat=True
+    ).iterator(chunk_size=10000)
+    return account_number_filter.rebuild(account_numbers)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
+
+from core_apps.common.paginators import EstimatedCountPaginator
 from .models import BankAccount
 
 User = get_user_model()
@@ -19,6 +21,7 @@ class BankAccountAdmin(admin.ModelAdmin):
         "kyc_verified",
         "get_verified_by",
     ]
+    list_select_related = ["user", "verified_by"]
     list_filter = [
         "currency",
         "account_type",
@@ -34,6 +37,9 @@ class BankAccountAdmin(admin.ModelAdmin):
         "user__last_name",
     ]
     readonly_fields = ["account_number", "created_at", "updated_at"]
+    autocomplete_fields = ["user", "verified_by"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (
             None,
@@ -85,7 +91,7 @@ class BankAccountAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         if not obj:
             return True
-        return request.user.is_superuser or obj.verified_by == request.user
+        return request.user.is_superuser or obj.verified_by_id == request.user.pk
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "verified_by":
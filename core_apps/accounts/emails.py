@@ -1,5 +1,5 @@
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
@@ -184,3 +184,66 @@ def send_tranfer_otp_email(email, otp):
         logger.info(f"OTP email sent successfully to: {email}")
     except Exception as e:
         logger.error(f"Failed to send otp email to: {email}. Error: {str(e)}")
+
+
+def send_batch_transfer_emails(sender_account, transactions):
+    subject = _("Transfer notification")
+    from_email = settings.DEFAULT_FROM_EMAIL
+    sender = sender_account.user
+    messages = []
+
+    for transfer in transactions:
+        receiver_account = transfer.receiver_account
+        context = {
+            "amount": transfer.amount,
+            "currency": sender_account.currency,
+            "sender_account_number": sender_account.account_number,
+            "receiver_account_number": receiver_account.account_number,
+            "sender_name": sender.full_name,
+            "receiver_name": receiver_account.user.full_name,
+            "user": receiver_account.user.full_name,
+            "is_sender": False,
+            "new_balance": receiver_account.account_balance,
+            "site_name": settings.SITE_NAME,
+        }
+        html_email = render_to_string("emails/transfer_notification.html", context)
+        message = EmailMultiAlternatives(
+            subject,
+            strip_tags(html_email),
+            from_email,
+            [receiver_account.user.email],
+        )
+        message.attach_alternative(html_email, "text/html")
+        messages.append(message)
+
+    summary_context = {
+        "user": sender.full_name,
+        "currency": sender_account.currency,
+        "sender_account_number": sender_account.account_number,
+        "transfer_count": len(transactions),
+        "total_amount": sum(transfer.amount for transfer in transactions),
+        "new_balance": sender_account.account_balance,
+        "site_name": settings.SITE_NAME,
+    }
+    summary_html_email = render_to_string(
+        "emails/batch_transfer_summary.html", summary_context
+    )
+    summary_email = EmailMultiAlternatives(
+        _("Batch transfer confirmation"),
+        strip_tags(summary_html_email),
+        from_email,
+        [sender.email],
+    )
+    summary_email.attach_alternative(summary_html_email, "text/html")
+    messages.append(summary_email)
+
+    try:
+        get_connection().send_messages(messages)
+        logger.info(
+            f"Batch transfer notifications queued for {len(transactions)} receivers "
+            f"from account {sender_account.account_number}"
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to send batch transfer notification emails. Error: {str(e)}"
+        )
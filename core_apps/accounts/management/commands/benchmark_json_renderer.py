@@ -0,0 +1,109 @@
+import json
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from core_apps.accounts.models import BankAccount, Transaction
+from core_apps.accounts.serializers import TransactionSerializer
+from core_apps.common.renderers import GenericJSONRenderer, orjson
+from core_apps.user_auth.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Render pages of serialized transactions through GenericJSONRenderer "
+        "and report latency percentiles for the json.dumps and orjson paths"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--samples", type=int, default=2000)
+        parser.add_argument("--output", help="Write the markdown report to a file")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed, nothing to compare")
+            return
+
+        page = self.build_page(options["rows"])
+        renderer = GenericJSONRenderer()
+        context = {"response": Response(status=200), "view": None}
+
+        outputs = {}
+        lines = [
+            "# GenericJSONRenderer benchmark",
+            "",
+            f"Rows per page: {options['rows']}, samples: {options['samples']}",
+            "",
+            "| Renderer | p50 (ms) | p95 (ms) | p99 (ms) | bytes |",
+            "| --- | --- | --- | --- | --- |",
+        ]
+        for label, fast in [("json.dumps (legacy)", False), ("orjson", True)]:
+            with override_settings(FAST_JSON_RENDERER=fast):
+                timings = []
+                for _ in range(options["samples"]):
+                    started = time.perf_counter()
+                    outputs[label] = renderer.render(page, renderer_context=context)
+                    timings.append((time.perf_counter() - started) * 1000)
+            percentiles = statistics.quantiles(timings, n=100)
+            lines.append(
+                f"| {label} | {percentiles[49]:.3f} | {percentiles[94]:.3f} | "
+                f"{percentiles[98]:.3f} | {len(outputs[label])} |"
+            )
+
+        legacy, fast = outputs.values()
+        envelope = b'{"status_code": 200, "object": '
+        lines += [
+            "",
+            f"Envelope prefix identical: "
+            f"{legacy.startswith(envelope) and fast.startswith(envelope)}",
+            f"Decoded payloads equal: {json.loads(legacy) == json.loads(fast)}",
+        ]
+
+        report = "\n".join(lines) + "\n"
+        self.stdout.write(report)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+
+    def build_page(self, rows):
+        # Unsaved instances keep the benchmark off the database, so only
+        # serialization and rendering are measured.
+        users = [
+            User(id=uuid.uuid4(), first_name="Bench", last_name=f"User {n}")
+            for n in range(2)
+        ]
+        accounts = [
+            BankAccount(id=uuid.uuid4(), user=user, account_number=f"{n:016d}")
+            for n, user in enumerate(users)
+        ]
+        now = timezone.now()
+        transactions = [
+            Transaction(
+                id=uuid.uuid4(),
+                created_at=now - timedelta(minutes=n),
+                updated_at=now - timedelta(minutes=n),
+                user=users[0],
+                amount=Decimal(n) + Decimal("0.25"),
+                description=f"Benchmark transfer {n}",
+                sender=users[n % 2],
+                receiver=users[(n + 1) % 2],
+                sender_account=accounts[n % 2],
+                receiver_account=accounts[(n + 1) % 2],
+                status=Transaction.TransactionStatus.COMPLETED,
+                transaction_type=Transaction.TransactionType.TRANSFER,
+            )
+            for n in range(rows)
+        ]
+        return {
+            "next": None,
+            "previous": None,
+            "results": TransactionSerializer(transactions, many=True).data,
+        }
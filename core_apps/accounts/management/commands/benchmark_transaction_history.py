@@ -0,0 +1,181 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from core_apps.accounts.models import BankAccount, Transaction
+from core_apps.accounts.pagination import KeysetCursorPagination
+from core_apps.user_auth.models import User
+
+USER_TABLE = User._meta.db_table
+ACCOUNT_TABLE = BankAccount._meta.db_table
+TRANSACTION_TABLE = Transaction._meta.db_table
+
+CREATE_USERS_SQL = f"""
+INSERT INTO {USER_TABLE} (
+    id, password, is_superuser, username, first_name, last_name, email,
+    is_staff, is_active, date_joined, security_question, security_answer,
+    id_no, account_status, role, failed_login_attempts, otp
+)
+SELECT gen_random_uuid(), '!', false, 'BENCH' || lpad(n::text, 7, '0'),
+    'Bench', 'User ' || n, 'bench' || n || '@example.com', false, true, NOW(),
+    'maiden_name', 'bench', 900000000 + n, 'active', 'customer', 0, ''
+FROM generate_series(1, %(users)s) AS n
+ON CONFLICT DO NOTHING
+"""
+
+CREATE_ACCOUNTS_SQL = f"""
+INSERT INTO {ACCOUNT_TABLE} (
+    id, created_at, updated_at, user_id, account_number, account_balance,
+    currency, account_status, account_type, is_primary, kyc_submitted,
+    kyc_verified, verification_notes, fully_activated
+)
+SELECT gen_random_uuid(), NOW(), NOW(), id, 'BENCH' || substr(username, 6),
+    0, 'mexican_peso', 'active', 'current', true, true, true, '', true
+FROM {USER_TABLE}
+WHERE username LIKE 'BENCH%%'
+ON CONFLICT DO NOTHING
+"""
+
+NUMBER_ACCOUNTS_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS bench_accounts AS
+SELECT row_number() OVER (ORDER BY account_number) AS n, id, user_id
+FROM {ACCOUNT_TABLE}
+WHERE account_number LIKE 'BENCH%%';
+CREATE INDEX IF NOT EXISTS bench_accounts_n_idx ON bench_accounts (n);
+"""
+
+# power(random(), 3) skews traffic towards a small set of very busy accounts,
+# which is where the OR + sort plan hurts the most.
+CREATE_TRANSACTIONS_SQL = f"""
+INSERT INTO {TRANSACTION_TABLE} (
+    id, created_at, updated_at, user_id, amount, description, sender_id,
+    sender_account_id, receiver_id, receiver_account_id, status,
+    transaction_type
+)
+SELECT gen_random_uuid(), g.ts, g.ts, s.user_id,
+    round((random() * 1000)::numeric, 2), 'benchmark', s.user_id, s.id,
+    r.user_id, r.id, 'completed', 'transfer'
+FROM (
+    SELECT NOW() - random() * interval '5 years' AS ts,
+        1 + floor(power(random(), 3) * %(accounts)s)::bigint AS sender_n,
+        1 + floor(random() * %(accounts)s)::bigint AS receiver_n
+    FROM generate_series(1, %(rows)s)
+) AS g
+JOIN bench_accounts s ON s.n = g.sender_n
+JOIN bench_accounts r ON r.n = g.receiver_n
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic transaction history and report EXPLAIN plans and "
+        "latency percentiles for the legacy OR query versus the indexed UNION query"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000_000)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--batch-size", type=int, default=1_000_000)
+        parser.add_argument("--samples", type=int, default=200)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--skip-generate", action="store_true")
+        parser.add_argument("--output", help="Write the markdown report to a file")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            if not options["skip_generate"]:
+                self.generate(cursor, options)
+            cursor.execute(NUMBER_ACCOUNTS_SQL)
+            cursor.execute("SELECT user_id FROM bench_accounts ORDER BY n")
+            user_ids = [row[0] for row in cursor.fetchall()]
+
+        if not user_ids:
+            self.stderr.write(
+                "No benchmark accounts found, run without --skip-generate"
+            )
+            return
+
+        report = self.measure(user_ids, options)
+        self.stdout.write(report)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+
+    def generate(self, cursor, options):
+        cursor.execute(CREATE_USERS_SQL, {"users": options["users"]})
+        cursor.execute(CREATE_ACCOUNTS_SQL)
+        cursor.execute(NUMBER_ACCOUNTS_SQL)
+        cursor.execute("SELECT count(*) FROM bench_accounts")
+        accounts = cursor.fetchone()[0]
+
+        remaining = options["rows"]
+        while remaining > 0:
+            batch = min(options["batch_size"], remaining)
+            cursor.execute(
+                CREATE_TRANSACTIONS_SQL, {"accounts": accounts, "rows": batch}
+            )
+            remaining -= batch
+            self.stdout.write(f"Generated {options['rows'] - remaining} transactions")
+
+        cursor.execute(f"ANALYZE {TRANSACTION_TABLE}")
+
+    def legacy_page(self, user_id, page_size):
+        queryset = Transaction.objects.filter(
+            Q(sender_id=user_id) | Q(receiver_id=user_id)
+        ).order_by("-created_at", "-id")
+        queryset.count()
+        return queryset[:page_size]
+
+    def keyset_page(self, user_id, page_size):
+        paginator = KeysetCursorPagination()
+        return paginator._slice_queryset(
+            Transaction.objects.history(User(pk=user_id)),
+            ("-created_at", "-id"),
+            None,
+            page_size + 1,
+        )
+
+    def measure(self, user_ids, options):
+        page_size = options["page_size"]
+        sample = [
+            user_ids[int(random.random() ** 3 * len(user_ids))]
+            for _ in range(options["samples"])
+        ]
+        lines = [
+            "# Transaction history benchmark",
+            "",
+            f"Transactions: {Transaction.objects.count()}, "
+            f"benchmark users: {len(user_ids)}, samples: {len(sample)}",
+            "",
+            "| Query | p50 (ms) | p95 (ms) | p99 (ms) |",
+            "| --- | --- | --- | --- |",
+        ]
+
+        for label, build in [
+            ("OR + COUNT (legacy)", self.legacy_page),
+            ("UNION keyset", self.keyset_page),
+        ]:
+            timings = []
+            for user_id in sample:
+                started = time.perf_counter()
+                list(build(user_id, page_size))
+                timings.append((time.perf_counter() - started) * 1000)
+            percentiles = statistics.quantiles(timings, n=100)
+            lines.append(
+                f"| {label} | {percentiles[49]:.2f} | "
+                f"{percentiles[94]:.2f} | {percentiles[98]:.2f} |"
+            )
+
+        hottest_user = user_ids[0]
+        for label, build in [
+            ("OR + COUNT (legacy)", self.legacy_page),
+            ("UNION keyset", self.keyset_page),
+        ]:
+            plan = build(hottest_user, page_size).explain(analyze=True, buffers=True)
+            lines += ["", f"## EXPLAIN {label} (busiest user)", "", "```", plan, "```"]
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.db import models
+
+
+class TransactionQuerySet(models.QuerySet):
+    def history(
+        self, user, account=None, start_date=None, end_date=None, transaction_type=None
+    ):
+        # One branch per party so each side is served by its own
+        # (party, created_at) index instead of an OR over two foreign keys.
+        filters = {}
+        if start_date:
+            filters["created_at__gte"] = start_date
+        if end_date:
+            filters["created_at__lte"] = end_date
+        if transaction_type:
+            filters["transaction_type"] = transaction_type
+
+        if account is not None:
+            sent = self.filter(sender_account=account, **filters)
+            received = self.filter(receiver_account=account, **filters)
+        else:
+            sent = self.filter(sender=user, **filters)
+            received = self.filter(receiver=user, **filters)
+
+        return sent.union(received)
+
+
+class LedgerEntryQuerySet(models.QuerySet):
+    def balance_at(self, account, moment) -> Decimal:
+        balance = (
+            self.filter(account=account, created_at__lte=moment)
+            .order_by("-created_at", "-sequence")
+            .values_list("balance_after", flat=True)
+            .first()
+        )
+        return balance if balance is not None else Decimal("0.00")
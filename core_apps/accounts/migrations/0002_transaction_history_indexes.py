@@ -0,0 +1,41 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["sender", "-created_at", "-id"], name="txn_sender_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["receiver", "-created_at", "-id"],
+                name="txn_receiver_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["sender_account", "-created_at", "-id"],
+                name="txn_sender_acct_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["receiver_account", "-created_at", "-id"],
+                name="txn_receiver_acct_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,124 @@
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def post_opening_balances(apps, schema_editor):
+    BankAccount = apps.get_model("accounts", "BankAccount")
+    LedgerEntry = apps.get_model("accounts", "LedgerEntry")
+
+    entries = []
+    for account in BankAccount.objects.exclude(account_balance=0).iterator():
+        entries.append(
+            LedgerEntry(
+                id=uuid.uuid4(),
+                account=account,
+                entry_type="credit",
+                amount=account.account_balance,
+                balance_after=account.account_balance,
+                sequence=1,
+            )
+        )
+    LedgerEntry.objects.bulk_create(entries, batch_size=1000)
+    BankAccount.objects.exclude(account_balance=0).update(ledger_sequence=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_transaction_history_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bankaccount",
+            name="ledger_sequence",
+            field=models.PositiveBigIntegerField(
+                default=0, editable=False, verbose_name="Ledger Sequence"
+            ),
+        ),
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.UUID("03f7541c-b114-44b3-9dd9-93542bf75ba4"),
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "entry_type",
+                    models.CharField(
+                        choices=[("debit", "Debit"), ("credit", "Credit")],
+                        max_length=10,
+                        verbose_name="Entry Type",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Amount"
+                    ),
+                ),
+                (
+                    "balance_after",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="Balance After",
+                    ),
+                ),
+                (
+                    "sequence",
+                    models.PositiveBigIntegerField(
+                        blank=True, null=True, verbose_name="Sequence"
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="ledger_entries",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="ledger_entries",
+                        to="accounts.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ledger Entry",
+                "verbose_name_plural": "Ledger Entries",
+                "ordering": ["-created_at", "-sequence"],
+                "indexes": [
+                    models.Index(
+                        fields=["account", "-created_at", "-sequence"],
+                        name="ledger_account_created_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "sequence"),
+                        name="unique_ledger_account_sequence",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(post_opening_balances, migrations.RunPython.noop),
+    ]
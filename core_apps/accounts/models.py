@@ -4,6 +4,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from core_apps.common.models import TimeStampedModel
+from .managers import LedgerEntryQuerySet, TransactionQuerySet
 
 User = get_user_model()
 
@@ -54,6 +55,9 @@ class BankAccount(TimeStampedModel):
     verified_date = models.DateTimeField(_("Verified Date"), null=True, blank=True)
     verification_notes = models.TextField(_("Verification Notes"), blank=True)
     fully_activated = models.BooleanField(_("Fully activated"), default=False)
+    ledger_sequence = models.PositiveBigIntegerField(
+        _("Ledger Sequence"), default=0, editable=False
+    )
 
     def __str__(self):
         return (
@@ -74,7 +78,24 @@ class BankAccount(TimeStampedModel):
 class Transaction(TimeStampedModel):
     class Meta:
         ordering = ["-created_at"]
-        indexes = [models.Index(fields=["created_at"])]
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(
+                fields=["sender", "-created_at", "-id"], name="txn_sender_created_idx"
+            ),
+            models.Index(
+                fields=["receiver", "-created_at", "-id"],
+                name="txn_receiver_created_idx",
+            ),
+            models.Index(
+                fields=["sender_account", "-created_at", "-id"],
+                name="txn_sender_acct_created_idx",
+            ),
+            models.Index(
+                fields=["receiver_account", "-created_at", "-id"],
+                name="txn_receiver_acct_created_idx",
+            ),
+        ]
 
     class TransactionStatus(models.TextChoices):
         PENDING = ("pending", _("Pending"))
@@ -123,5 +144,65 @@ class Transaction(TimeStampedModel):
         max_length=20,
     )
 
+    objects = TransactionQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.transaction_type} - {self.amount} - {self.status}"
+
+
+class LedgerEntry(TimeStampedModel):
+    class Meta:
+        verbose_name = _("Ledger Entry")
+        verbose_name_plural = _("Ledger Entries")
+        ordering = ["-created_at", "-sequence"]
+        indexes = [
+            models.Index(
+                fields=["account", "-created_at", "-sequence"],
+                name="ledger_account_created_idx",
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "sequence"], name="unique_ledger_account_sequence"
+            )
+        ]
+
+    class EntryType(models.TextChoices):
+        DEBIT = ("debit", _("Debit"))
+        CREDIT = ("credit", _("Credit"))
+
+    account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="ledger_entries",
+    )
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="ledger_entries",
+    )
+    entry_type = models.CharField(
+        _("Entry Type"), max_length=10, choices=EntryType.choices
+    )
+    amount = models.DecimalField(_("Amount"), max_digits=10, decimal_places=2)
+    balance_after = models.DecimalField(
+        _("Balance After"), max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    sequence = models.PositiveBigIntegerField(_("Sequence"), null=True, blank=True)
+
+    objects = LedgerEntryQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError(_("Ledger entries are append-only"))
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError(_("Ledger entries are append-only"))
+
+    def __str__(self):
+        return f"{self.entry_type} - {self.amount} - {self.sequence}"
@@ -1,7 +1,119 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetCursorPagination(CursorPagination):
+    # Pages on (ordering field, id) so every position is unique and the next
+    # page is a single indexed range scan, with no OFFSET or COUNT query.
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-created_at"
+
+    def get_ordering(self, request, queryset, view):
+        field = super().get_ordering(request, queryset, view)[0]
+        tiebreaker = "-id" if field.startswith("-") else "id"
+        return (field, tiebreaker)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+
+        ordering = self._reverse_ordering() if reverse else self.ordering
+        keyset = None
+        if self.cursor and self.cursor.position is not None:
+            keyset = self._keyset_filter(queryset.model, self.cursor.position, reverse)
+
+        results = list(
+            self._slice_queryset(queryset, ordering, keyset, self.page_size + 1)
+        )
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _slice_queryset(self, queryset, ordering, keyset, limit):
+        # UNION querysets cannot be filtered, so the keyset range and the
+        # limit are pushed into every branch and the branches merged again.
+        if queryset.query.combinator:
+            branches = []
+            for query in queryset.query.combined_queries:
+                branch = queryset.model._default_manager.all()
+                branch.query = query.clone()
+                branches.append(self._slice_queryset(branch, ordering, keyset, limit))
+            first, *rest = branches
+            merged = first.union(*rest, all=queryset.query.combinator_all)
+            merged._prefetch_related_lookups = queryset._prefetch_related_lookups
+            return merged.order_by(*ordering)[:limit]
+
+        if keyset is not None:
+            queryset = queryset.filter(keyset)
+        return queryset.order_by(*ordering)[:limit]
+
+    def _get_position_from_instance(self, instance, ordering):
+        field_name = ordering[0].lstrip("-")
+        value = getattr(instance, field_name)
+        value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+        return json.dumps([value, str(instance.pk)])
+
+    def _reverse_ordering(self):
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def _keyset_filter(self, model, position, reverse):
+        field = self.ordering[0]
+        field_name = field.lstrip("-")
+        try:
+            value, pk = json.loads(position)
+            value = model._meta.get_field(field_name).to_python(value)
+            pk = model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        lookup = "lt" if field.startswith("-") != reverse else "gt"
+        return Q(**{f"{field_name}__{lookup}": value}) | Q(
+            **{field_name: value, f"id__{lookup}": pk}
+        )
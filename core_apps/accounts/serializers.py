@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from .models import BankAccount, Transaction
+from core_apps.user_auth.otp import BATCH_TRANSFER_OTP, TRANSFER_OTP, otp_store
+from .utils import is_known_account_number
 from decimal import Decimal
 
 
@@ -58,6 +61,8 @@ class DepositSerializer(serializers.ModelSerializer):
         fields = ["account_number", "amount"]
 
     def validate_account_number(self, value):
+        if not is_known_account_number(value):
+            raise serializers.ValidationError(_("Invalid account number."))
         try:
             account = BankAccount.objects.get(account_number=value)
             self.context["account"] = account
@@ -100,10 +105,17 @@ class UUIDField(serializers.Field):
         return str(value)
 
 
+class AccountNumberField(serializers.CharField):
+    # Renders the account number directly, since BankAccount.__str__ reads
+    # the owner's name and would query for every account on a page.
+    def to_representation(self, value) -> str:
+        return getattr(value, "account_number", value)
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     id = UUIDField(read_only=True)
-    sender_account = serializers.CharField(max_length=20, required=False)
-    receiver_account = serializers.CharField(max_length=20, required=False)
+    sender_account = AccountNumberField(max_length=20, required=False)
+    receiver_account = AccountNumberField(max_length=20, required=False)
     amount = serializers.DecimalField(
         max_digits=10, decimal_places=2, min_value=Decimal("0.1")
     )
@@ -133,14 +145,6 @@ class TransactionSerializer(serializers.ModelSerializer):
         representation["receiver"] = (
             instance.receiver.full_name if instance.receiver else None
         )
-        representation["sender_account"] = (
-            instance.sender_account.account_number if instance.sender_account else None
-        )
-        representation["receiver_account"] = (
-            instance.receiver_account.account_number
-            if instance.receiver_account
-            else None
-        )
         return representation
 
     def validate(self, data):
@@ -149,6 +153,17 @@ class TransactionSerializer(serializers.ModelSerializer):
         receiver_account_number = data.get("receiver_account")
         amount = data.get("amount")
 
+        if transaction_type == Transaction.TransactionType.WITHDRAWAL:
+            account_numbers = [sender_account_number]
+        elif transaction_type == Transaction.TransactionType.DEPOSIT:
+            account_numbers = [receiver_account_number]
+        else:
+            account_numbers = [sender_account_number, receiver_account_number]
+        if not all(
+            number and is_known_account_number(number) for number in account_numbers
+        ):
+            raise serializers.ValidationError("One or both accounts not found")
+
         try:
             if transaction_type == Transaction.TransactionType.WITHDRAWAL:
                 account = BankAccount.objects.get(account_number=sender_account_number)
@@ -203,14 +218,19 @@ class SecurityQuestionSerializer(serializers.Serializer):
 
 class OTPVerificationSerializer(serializers.Serializer):
     otp = serializers.CharField(max_length=6)
+    otp_purpose = TRANSFER_OTP
 
     def validate(self, data):
         user = self.context["request"].user
-        if not user.verify_otp(data["otp"]):
+        if not otp_store.verify(self.otp_purpose, user.pk, data["otp"]):
             raise serializers.ValidationError("Invalid or expired OTP")
         return data
 
 
+class BatchTransferOTPVerificationSerializer(OTPVerificationSerializer):
+    otp_purpose = BATCH_TRANSFER_OTP
+
+
 class UsernameVerificationSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=12)
 
@@ -219,3 +239,70 @@ class UsernameVerificationSerializer(serializers.Serializer):
         if user.username != value:
             raise serializers.ValidationError("Invalid username")
         return value
+
+
+class BatchTransferItemSerializer(serializers.Serializer):
+    receiver_account = serializers.CharField(max_length=20)
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0.1")
+    )
+    description = serializers.CharField(
+        max_length=500, required=False, allow_blank=True, default=""
+    )
+
+
+class BatchTransferSerializer(serializers.Serializer):
+    sender_account = serializers.CharField(max_length=20)
+    security_answer = serializers.CharField(max_length=30)
+    transfers = BatchTransferItemSerializer(
+        many=True, allow_empty=False, max_length=settings.BATCH_TRANSFER_MAX_ITEMS
+    )
+
+    def validate(self, data):
+        user = self.context["request"].user
+        if data["security_answer"] != user.security_answer:
+            raise serializers.ValidationError("Incorrect security answer")
+
+        try:
+            sender_account = BankAccount.objects.get(
+                account_number=data["sender_account"], user=user
+            )
+        except BankAccount.DoesNotExist:
+            raise serializers.ValidationError(
+                "Sender account number not found or you are not authorized "
+                "to transfer from this account."
+            )
+        if not (sender_account.fully_activated and sender_account.kyc_verified):
+            raise serializers.ValidationError(
+                "This account is not fully verified. "
+                "Please complete the verification process."
+            )
+
+        receiver_numbers = {item["receiver_account"] for item in data["transfers"]}
+        receivers = BankAccount.objects.in_bulk(
+            receiver_numbers, field_name="account_number"
+        )
+        missing = receiver_numbers - receivers.keys()
+        if missing:
+            raise serializers.ValidationError(
+                f"Receiver accounts not found: {', '.join(sorted(missing))}"
+            )
+        if sender_account.account_number in receivers:
+            raise serializers.ValidationError(
+                "Sender and receiver accounts must be differents"
+            )
+        if any(
+            account.currency != sender_account.currency
+            for account in receivers.values()
+        ):
+            raise serializers.ValidationError(
+                "Transfers are only allowed between accounts with the same currency"
+            )
+
+        total_amount = sum(item["amount"] for item in data["transfers"])
+        if sender_account.account_balance < total_amount:
+            raise serializers.ValidationError("Insufficient funds for transfer")
+
+        data["sender_account"] = sender_account
+        data["total_amount"] = total_amount
+        return data
@@ -0,0 +1,414 @@
+import uuid
+from decimal import Decimal
+from typing import Optional
+
+from django.db import connection, transaction
+
+from .models import BankAccount, LedgerEntry, Transaction
+
+ACCOUNT_TABLE = BankAccount._meta.db_table
+TRANSACTION_TABLE = Transaction._meta.db_table
+LEDGER_TABLE = LedgerEntry._meta.db_table
+
+TRANSACTION_COLUMNS = (
+    "id, created_at, updated_at, user_id, amount, description, sender_id, "
+    "sender_account_id, receiver_id, receiver_account_id, status, transaction_type"
+)
+
+LEDGER_COLUMNS = (
+    "id, created_at, updated_at, account_id, transaction_id, entry_type, amount, "
+    "balance_after, sequence"
+)
+
+# Every statement below moves the balance, records the Transaction and posts
+# both ledger legs in a single round trip. A NULL ledger account is the bank's
+# own cash ledger, the other side of deposits and withdrawals.
+CREDIT_SQL = f"""
+WITH credited AS (
+    UPDATE {ACCOUNT_TABLE}
+    SET account_balance = account_balance + %(amount)s,
+        ledger_sequence = ledger_sequence + 1, updated_at = NOW()
+    WHERE id = %(account_id)s
+    RETURNING id, user_id, account_balance, ledger_sequence
+), recorded AS (
+    INSERT INTO {TRANSACTION_TABLE} ({TRANSACTION_COLUMNS})
+    SELECT %(transaction_id)s, NOW(), NOW(), %(user_id)s, %(amount)s,
+        %(description)s, NULL, NULL, credited.user_id, credited.id,
+        %(status)s, %(transaction_type)s
+    FROM credited
+    RETURNING id, created_at
+), posted AS (
+    INSERT INTO {LEDGER_TABLE} ({LEDGER_COLUMNS})
+    SELECT %(credit_entry_id)s, NOW(), NOW(), credited.id, recorded.id,
+        %(credit)s, %(amount)s, credited.account_balance, credited.ledger_sequence
+    FROM credited, recorded
+    UNION ALL
+    SELECT %(debit_entry_id)s, NOW(), NOW(), NULL, recorded.id,
+        %(debit)s, %(amount)s, NULL, NULL
+    FROM recorded
+)
+SELECT credited.account_balance, recorded.created_at FROM credited, recorded
+"""
+
+DEBIT_SQL = f"""
+WITH debited AS (
+    UPDATE {ACCOUNT_TABLE}
+    SET account_balance = account_balance - %(amount)s,
+        ledger_sequence = ledger_sequence + 1, updated_at = NOW()
+    WHERE id = %(account_id)s AND account_balance >= %(amount)s
+    RETURNING id, user_id, account_balance, ledger_sequence
+), recorded AS (
+    INSERT INTO {TRANSACTION_TABLE} ({TRANSACTION_COLUMNS})
+    SELECT %(transaction_id)s, NOW(), NOW(), %(user_id)s, %(amount)s,
+        %(description)s, debited.user_id, debited.id, NULL, NULL,
+        %(status)s, %(transaction_type)s
+    FROM debited
+    RETURNING id, created_at
+), posted AS (
+    INSERT INTO {LEDGER_TABLE} ({LEDGER_COLUMNS})
+    SELECT %(debit_entry_id)s, NOW(), NOW(), debited.id, recorded.id,
+        %(debit)s, %(amount)s, debited.account_balance, debited.ledger_sequence
+    FROM debited, recorded
+    UNION ALL
+    SELECT %(credit_entry_id)s, NOW(), NOW(), NULL, recorded.id,
+        %(credit)s, %(amount)s, NULL, NULL
+    FROM recorded
+)
+SELECT debited.account_balance, recorded.created_at FROM debited, recorded
+"""
+
+TRANSFER_SQL = f"""
+WITH debited AS (
+    UPDATE {ACCOUNT_TABLE}
+    SET account_balance = account_balance - %(amount)s,
+        ledger_sequence = ledger_sequence + 1, updated_at = NOW()
+    WHERE id = %(sender_account_id)s AND account_balance >= %(amount)s
+    RETURNING id, user_id, account_balance, ledger_sequence
+), credited AS (
+    UPDATE {ACCOUNT_TABLE}
+    SET account_balance = account_balance + %(amount)s,
+        ledger_sequence = ledger_sequence + 1, updated_at = NOW()
+    WHERE id = %(receiver_account_id)s AND EXISTS (SELECT 1 FROM debited)
+    RETURNING id, user_id, account_balance, ledger_sequence
+), recorded AS (
+    INSERT INTO {TRANSACTION_TABLE} ({TRANSACTION_COLUMNS})
+    SELECT %(transaction_id)s, NOW(), NOW(), %(user_id)s, %(amount)s,
+        %(description)s, debited.user_id, debited.id, credited.user_id,
+        credited.id, %(status)s, %(transaction_type)s
+    FROM debited, credited
+    RETURNING id, created_at
+), posted AS (
+    INSERT INTO {LEDGER_TABLE} ({LEDGER_COLUMNS})
+    SELECT %(debit_entry_id)s, NOW(), NOW(), debited.id, recorded.id,
+        %(debit)s, %(amount)s, debited.account_balance, debited.ledger_sequence
+    FROM debited, recorded
+    UNION ALL
+    SELECT %(credit_entry_id)s, NOW(), NOW(), credited.id, recorded.id,
+        %(credit)s, %(amount)s, credited.account_balance, credited.ledger_sequence
+    FROM credited, recorded
+)
+SELECT debited.account_balance, credited.account_balance, recorded.created_at
+FROM debited, credited, recorded
+"""
+
+BATCH_DEBIT_SQL = f"""
+UPDATE {ACCOUNT_TABLE}
+SET account_balance = account_balance - %(amount)s,
+    ledger_sequence = ledger_sequence + %(entries)s, updated_at = NOW()
+WHERE id = %(account_id)s AND account_balance >= %(amount)s
+RETURNING account_balance, ledger_sequence
+"""
+
+BATCH_CREDIT_SQL = f"""
+UPDATE {ACCOUNT_TABLE} AS account
+SET account_balance = account.account_balance + credit.amount,
+    ledger_sequence = account.ledger_sequence + credit.entries, updated_at = NOW()
+FROM (VALUES {{values}}) AS credit (id, amount, entries)
+WHERE account.id = credit.id
+RETURNING account.id, account.account_balance, account.ledger_sequence
+"""
+
+
+class InsufficientFundsError(Exception):
+    pass
+
+
+def _execute(sql: str, params: dict) -> Optional[tuple]:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
+
+
+def _ledger_params() -> dict:
+    return {
+        "debit_entry_id": uuid.uuid4(),
+        "credit_entry_id": uuid.uuid4(),
+        "debit": LedgerEntry.EntryType.DEBIT,
+        "credit": LedgerEntry.EntryType.CREDIT,
+    }
+
+
+def _build_transaction(transaction_id, created_at, **fields) -> Transaction:
+    instance = Transaction(
+        id=transaction_id,
+        created_at=created_at,
+        updated_at=created_at,
+        status=Transaction.TransactionStatus.COMPLETED,
+        **fields,
+    )
+    instance._state.adding = False
+    instance._state.db = connection.alias
+    return instance
+
+
+def lock_accounts(*accounts: BankAccount) -> None:
+    # Always lock in account number order so two opposite transfers between
+    # the same pair of accounts cannot deadlock each other.
+    list(
+        BankAccount.objects.select_for_update()
+        .filter(pk__in=[account.pk for account in accounts])
+        .order_by("account_number")
+        .values_list("pk", flat=True)
+    )
+
+
+def deposit(
+    account: BankAccount, amount: Decimal, user, description: str = ""
+) -> Transaction:
+    transaction_id = uuid.uuid4()
+    row = _execute(
+        CREDIT_SQL,
+        {
+            "amount": amount,
+            "account_id": account.pk,
+            "transaction_id": transaction_id,
+            "user_id": user.pk,
+            "description": description,
+            "status": Transaction.TransactionStatus.COMPLETED,
+            "transaction_type": Transaction.TransactionType.DEPOSIT,
+            **_ledger_params(),
+        },
+    )
+    if row is None:
+        raise BankAccount.DoesNotExist("Account not found")
+
+    new_balance, created_at = row
+    account.account_balance = new_balance
+    return _build_transaction(
+        transaction_id,
+        created_at,
+        user=user,
+        amount=amount,
+        description=description,
+        receiver_id=account.user_id,
+        receiver_account=account,
+        transaction_type=Transaction.TransactionType.DEPOSIT,
+    )
+
+
+def withdraw(
+    account: BankAccount, amount: Decimal, user, description: str = ""
+) -> Transaction:
+    transaction_id = uuid.uuid4()
+    row = _execute(
+        DEBIT_SQL,
+        {
+            "amount": amount,
+            "account_id": account.pk,
+            "transaction_id": transaction_id,
+            "user_id": user.pk,
+            "description": description,
+            "status": Transaction.TransactionStatus.COMPLETED,
+            "transaction_type": Transaction.TransactionType.WITHDRAWAL,
+            **_ledger_params(),
+        },
+    )
+    if row is None:
+        raise InsufficientFundsError("Insufficient funds for withdrawal")
+
+    new_balance, created_at = row
+    account.account_balance = new_balance
+    return _build_transaction(
+        transaction_id,
+        created_at,
+        user=user,
+        amount=amount,
+        description=description,
+        sender_id=account.user_id,
+        sender_account=account,
+        transaction_type=Transaction.TransactionType.WITHDRAWAL,
+    )
+
+
+def transfer(
+    sender_account: BankAccount,
+    receiver_account: BankAccount,
+    amount: Decimal,
+    user,
+    description: str = "",
+) -> Transaction:
+    if sender_account.pk == receiver_account.pk:
+        raise ValueError("Sender and receiver accounts must be different")
+
+    transaction_id = uuid.uuid4()
+    # A real savepoint, so failing here rolls back only this transfer and a
+    # caller's surrounding transaction stays usable.
+    with transaction.atomic():
+        lock_accounts(sender_account, receiver_account)
+        row = _execute(
+            TRANSFER_SQL,
+            {
+                "amount": amount,
+                "sender_account_id": sender_account.pk,
+                "receiver_account_id": receiver_account.pk,
+                "transaction_id": transaction_id,
+                "user_id": user.pk,
+                "description": description,
+                "status": Transaction.TransactionStatus.COMPLETED,
+                "transaction_type": Transaction.TransactionType.TRANSFER,
+                **_ledger_params(),
+            },
+        )
+        if row is None:
+            raise InsufficientFundsError("Insufficient funds for transfer")
+
+    sender_balance, receiver_balance, created_at = row
+    sender_account.account_balance = sender_balance
+    receiver_account.account_balance = receiver_balance
+    return _build_transaction(
+        transaction_id,
+        created_at,
+        user=user,
+        amount=amount,
+        description=description,
+        sender_id=sender_account.user_id,
+        sender_account=sender_account,
+        receiver_id=receiver_account.user_id,
+        receiver_account=receiver_account,
+        transaction_type=Transaction.TransactionType.TRANSFER,
+    )
+
+
+def batch_transfer(
+    sender_account: BankAccount,
+    credits: list[tuple[BankAccount, Decimal, str]],
+    user,
+) -> list[Transaction]:
+    if not credits:
+        raise ValueError("At least one transfer is required")
+
+    total_amount = sum((amount for _, amount, _ in credits), Decimal("0"))
+    credited: dict = {}
+    for receiver_account, amount, _ in credits:
+        if receiver_account.pk == sender_account.pk:
+            raise ValueError("Sender and receiver accounts must be different")
+        credited_amount, entries = credited.get(receiver_account.pk, (Decimal("0"), 0))
+        credited[receiver_account.pk] = (credited_amount + amount, entries + 1)
+
+    # The debit lands before the credits, so a failing credit leg must roll
+    # back to this savepoint rather than leave the sender debited.
+    with transaction.atomic():
+        lock_accounts(sender_account, *(account for account, _, _ in credits))
+
+        debited = _execute(
+            BATCH_DEBIT_SQL,
+            {
+                "amount": total_amount,
+                "entries": len(credits),
+                "account_id": sender_account.pk,
+            },
+        )
+        if debited is None:
+            raise InsufficientFundsError("Insufficient funds for batch transfer")
+
+        values = ", ".join(["(%s::uuid, %s::numeric, %s::bigint)"] * len(credited))
+        params = [
+            item
+            for pk, (amount, entries) in credited.items()
+            for item in (pk, amount, entries)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(BATCH_CREDIT_SQL.format(values=values), params)
+            receiver_states = {
+                pk: (balance, sequence) for pk, balance, sequence in cursor.fetchall()
+            }
+        if len(receiver_states) != len(credited):
+            raise BankAccount.DoesNotExist("Receiver account not found")
+
+        transactions = Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    id=uuid.uuid4(),
+                    user=user,
+                    sender_id=sender_account.user_id,
+                    sender_account=sender_account,
+                    receiver_id=receiver_account.user_id,
+                    receiver_account=receiver_account,
+                    amount=amount,
+                    description=description,
+                    transaction_type=Transaction.TransactionType.TRANSFER,
+                    status=Transaction.TransactionStatus.COMPLETED,
+                )
+                for receiver_account, amount, description in credits
+            ]
+        )
+        LedgerEntry.objects.bulk_create(
+            _batch_ledger_entries(
+                sender_account, debited, total_amount, transactions, receiver_states
+            )
+        )
+
+    sender_account.account_balance = debited[0]
+    for receiver_account, _, _ in credits:
+        receiver_account.account_balance = receiver_states[receiver_account.pk][0]
+    return transactions
+
+
+def _batch_ledger_entries(
+    sender_account, debited, total_amount, transactions, receiver_states
+) -> list[LedgerEntry]:
+    # The balance statements only return the final state of every account, so
+    # the running balance and sequence of each leg are replayed from the start.
+    final_balance, final_sequence = debited
+    sender_balance = final_balance + total_amount
+    sender_sequence = final_sequence - len(transactions)
+
+    receiver_running = {}
+    for transfer in transactions:
+        pk = transfer.receiver_account_id
+        balance, sequence = receiver_running.get(pk, receiver_states[pk])
+        receiver_running[pk] = (balance - transfer.amount, sequence - 1)
+
+    entries = []
+    for transfer in transactions:
+        sender_balance -= transfer.amount
+        sender_sequence += 1
+        entries.append(
+            LedgerEntry(
+                id=uuid.uuid4(),
+                account=sender_account,
+                transaction=transfer,
+                entry_type=LedgerEntry.EntryType.DEBIT,
+                amount=transfer.amount,
+                balance_after=sender_balance,
+                sequence=sender_sequence,
+            )
+        )
+
+        pk = transfer.receiver_account_id
+        balance, sequence = receiver_running[pk]
+        balance += transfer.amount
+        sequence += 1
+        receiver_running[pk] = (balance, sequence)
+        entries.append(
+            LedgerEntry(
+                id=uuid.uuid4(),
+                account_id=pk,
+                transaction=transfer,
+                entry_type=LedgerEntry.EntryType.CREDIT,
+                amount=transfer.amount,
+                balance_after=balance,
+                sequence=sequence,
+            )
+        )
+    return entries
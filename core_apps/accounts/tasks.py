@@ -0,0 +1,152 @@
+from decimal import Decimal
+
+from celery import shared_task
+from django.conf import settings
+from loguru import logger
+
+from .emails import (
+    send_account_creation_email,
+    send_batch_transfer_emails,
+    send_deposit_email,
+    send_full_activation_email,
+    send_transfer_email,
+    send_withdrawal_email,
+)
+from .models import BankAccount, LedgerEntry, Transaction
+
+
+def _get_account(account_id: str) -> BankAccount | None:
+    try:
+        return BankAccount.objects.select_related("user").get(id=account_id)
+    except BankAccount.DoesNotExist:
+        logger.error(f"Bank account {account_id} not found for email notification")
+        return None
+
+
+@shared_task(name="send_account_creation_email")
+def send_account_creation_email_task(account_id: str) -> None:
+    account = _get_account(account_id)
+    if account:
+        send_account_creation_email(account.user, account)
+
+
+@shared_task(name="send_full_activation_email")
+def send_full_activation_email_task(account_id: str) -> None:
+    account = _get_account(account_id)
+    if account:
+        send_full_activation_email(account)
+
+
+@shared_task(name="send_deposit_email")
+def send_deposit_email_task(account_id: str, amount: str, new_balance: str) -> None:
+    account = _get_account(account_id)
+    if account:
+        send_deposit_email(
+            user=account.user,
+            user_email=account.user.email,
+            amount=Decimal(amount),
+            currency=account.currency,
+            new_balance=Decimal(new_balance),
+            account_number=account.account_number,
+        )
+
+
+@shared_task(name="send_withdrawal_email")
+def send_withdrawal_email_task(account_id: str, amount: str, new_balance: str) -> None:
+    account = _get_account(account_id)
+    if account:
+        send_withdrawal_email(
+            user=account.user,
+            user_email=account.user.email,
+            amount=Decimal(amount),
+            currency=account.currency,
+            new_balance=Decimal(new_balance),
+            account_number=account.account_number,
+        )
+
+
+@shared_task(name="send_transfer_email")
+def send_transfer_email_task(
+    sender_account_id: str,
+    receiver_account_id: str,
+    amount: str,
+    sender_new_balance: str,
+    receiver_new_balance: str,
+) -> None:
+    sender_account = _get_account(sender_account_id)
+    receiver_account = _get_account(receiver_account_id)
+    if sender_account and receiver_account:
+        send_transfer_email(
+            sender_name=sender_account.user.full_name,
+            sender_email=sender_account.user.email,
+            receiver_name=receiver_account.user.full_name,
+            receiver_email=receiver_account.user.email,
+            amount=Decimal(amount),
+            currency=sender_account.currency,
+            sender_new_balance=Decimal(sender_new_balance),
+            receiver_new_balance=Decimal(receiver_new_balance),
+            sender_account_number=sender_account.account_number,
+            receiver_account_number=receiver_account.account_number,
+        )
+
+
+@shared_task(name="send_batch_transfer_emails")
+def send_batch_transfer_emails_task(
+    sender_account_id: str, transaction_ids: list[str]
+) -> None:
+    sender_account = _get_account(sender_account_id)
+    if not sender_account:
+        return
+
+    transactions = list(
+        Transaction.objects.filter(id__in=transaction_ids)
+        .select_related("receiver_account__user")
+        .order_by("created_at")
+    )
+    # Balances are read back from the ledger so every notification shows the
+    # balance right after its own credit, not the balance at send time.
+    credits = dict(
+        LedgerEntry.objects.filter(
+            transaction_id__in=transaction_ids,
+            entry_type=LedgerEntry.EntryType.CREDIT,
+        ).values_list("transaction_id", "balance_after")
+    )
+    for transfer in transactions:
+        transfer.receiver_account.account_balance = credits.get(
+            transfer.id, transfer.receiver_account.account_balance
+        )
+    sender_balance = (
+        LedgerEntry.objects.filter(
+            transaction_id__in=transaction_ids,
+            entry_type=LedgerEntry.EntryType.DEBIT,
+            account=sender_account,
+        )
+        .order_by("-sequence")
+        .values_list("balance_after", flat=True)
+        .first()
+    )
+    if sender_balance is not None:
+        sender_account.account_balance = sender_balance
+    send_batch_transfer_emails(sender_account, transactions)
+
+
+@shared_task(name="replenish_account_number_pool")
+def replenish_account_number_pool_task() -> int:
+    from .utils import replenish_account_number_pool
+
+    reserved = 0
+    for currency in BankAccount.AccountCurrency.values:
+        reserved += replenish_account_number_pool(
+            currency, settings.IDENTIFIER_POOL_SIZE
+        )
+    logger.info(f"Reserved {reserved} account numbers")
+    return reserved
+
+
+@shared_task(name="rebuild_account_number_filter")
+def rebuild_account_number_filter_task() -> int:
+    from .account_filter import rebuild_account_number_filter
+
+    count = rebuild_account_number_filter()
+    logger.info(f"Rebuilt account number filter with {count} accounts")
+    return count
@@ -1,3 +1,667 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import DatabaseError, connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django_redis import get_redis_connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core_apps.common.models import ReservedIdentifier
+from core_apps.common.testing import create_user
+from core_apps.user_auth.otp import BATCH_TRANSFER_OTP, TRANSFER_OTP, otp_store
+
+from . import account_filter, services, tasks, utils
+from .account_filter import AccountNumberFilter
+from .models import BankAccount, LedgerEntry, Transaction
+from .serializers import (
+    BatchTransferOTPVerificationSerializer,
+    OTPVerificationSerializer,
+    TransactionSerializer,
+)
+from .utils import calculate_luhn_check_digit, has_valid_check_digit
+
+User = get_user_model()
+
+
+def create_account(user: User, index: int, **fields) -> BankAccount:
+    fields.setdefault("currency", BankAccount.AccountCurrency.MEXICAN_PESO)
+    fields.setdefault("account_type", BankAccount.AccountType.CURRENT)
+    return BankAccount.objects.create(
+        user=user, account_number=f"{index:016d}", **fields
+    )
+
+
+class TransactionListQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(0)
+        self.account = create_account(self.user, 1)
+        # Every transfer goes to a different counterparty, so any per-account
+        # or per-user lookup would show up as extra queries.
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user=self.user,
+                    sender=self.user,
+                    sender_account=self.account,
+                    receiver=counterparty,
+                    receiver_account=create_account(counterparty, 100 + index),
+                    amount=Decimal("10.00"),
+                    transaction_type=Transaction.TransactionType.TRANSFER,
+                    status=Transaction.TransactionStatus.COMPLETED,
+                )
+                for index, counterparty in enumerate(
+                    create_user(index) for index in range(1, 31)
+                )
+            ]
+        )
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("transaction_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_page_with_distinct_counterparties_uses_fixed_queries(self):
+        # One page query plus one prefetch each for sender, receiver and
+        # both accounts.
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("transaction_list"), {"page_size": 25})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual(len(results), 25)
+        self.assertEqual(len({item["receiver_account"] for item in results}), 25)
+        self.assertEqual(results[0]["sender_account"], self.account.account_number)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        small_count, small_response = self.count_queries(page_size=5)
+        large_count, large_response = self.count_queries(page_size=25)
+
+        self.assertEqual(len(small_response.data["results"]), 5)
+        self.assertEqual(len(large_response.data["results"]), 25)
+        self.assertEqual(small_count, large_count)
+
+    def test_query_count_does_not_grow_with_account_filter(self):
+        unfiltered_count, _ = self.count_queries(page_size=25)
+        filtered_count, response = self.count_queries(
+            page_size=25, account_number=self.account.account_number
+        )
+
+        self.assertEqual(len(response.data["results"]), 25)
+        self.assertEqual(filtered_count, unfiltered_count + 1)
+
+
+class TransferServiceTests(TestCase):
+    def setUp(self):
+        self.sender = create_user(1)
+        self.receiver = create_user(2)
+        self.sender_account = create_account(
+            self.sender, 1, account_balance=Decimal("100.00")
+        )
+        self.receiver_account = create_account(self.receiver, 2)
+
+    def test_transfer_moves_balances_and_posts_both_legs(self):
+        transfer = services.transfer(
+            self.sender_account,
+            self.receiver_account,
+            Decimal("40.00"),
+            user=self.sender,
+        )
+
+        self.sender_account.refresh_from_db()
+        self.receiver_account.refresh_from_db()
+        self.assertEqual(self.sender_account.account_balance, Decimal("60.00"))
+        self.assertEqual(self.receiver_account.account_balance, Decimal("40.00"))
+        self.assertTrue(Transaction.objects.filter(pk=transfer.pk).exists())
+        self.assertEqual(
+            set(
+                LedgerEntry.objects.filter(transaction_id=transfer.pk).values_list(
+                    "entry_type", "balance_after"
+                )
+            ),
+            {
+                (LedgerEntry.EntryType.DEBIT, Decimal("60.00")),
+                (LedgerEntry.EntryType.CREDIT, Decimal("40.00")),
+            },
+        )
+
+    def test_insufficient_funds_leaves_the_outer_transaction_usable(self):
+        with self.assertRaises(services.InsufficientFundsError):
+            services.transfer(
+                self.sender_account,
+                self.receiver_account,
+                Decimal("500.00"),
+                user=self.sender,
+            )
+
+        # TestCase wraps every test in a transaction, so this query would
+        # raise TransactionManagementError if the failure had broken it.
+        self.sender_account.refresh_from_db()
+        self.assertEqual(self.sender_account.account_balance, Decimal("100.00"))
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(LedgerEntry.objects.exists())
+
+    def test_transfer_to_the_same_account_is_rejected(self):
+        with self.assertRaises(ValueError):
+            services.transfer(
+                self.sender_account,
+                self.sender_account,
+                Decimal("10.00"),
+                user=self.sender,
+            )
+
+        self.sender_account.refresh_from_db()
+        self.assertEqual(self.sender_account.account_balance, Decimal("100.00"))
+        self.assertFalse(Transaction.objects.exists())
+
+
+class TransferOTPPurposeTests(TestCase):
+    def setUp(self):
+        self.user = create_user(1)
+        self.context = {"request": SimpleNamespace(user=self.user)}
+
+    def tearDown(self):
+        otp_store.discard(TRANSFER_OTP, self.user.pk)
+        otp_store.discard(BATCH_TRANSFER_OTP, self.user.pk)
+
+    def test_batch_code_does_not_settle_a_single_transfer(self):
+        otp = otp_store.issue(BATCH_TRANSFER_OTP, self.user.pk)
+
+        single = OTPVerificationSerializer(data={"otp": otp}, context=self.context)
+        self.assertFalse(single.is_valid())
+
+        batch = BatchTransferOTPVerificationSerializer(
+            data={"otp": otp}, context=self.context
+        )
+        self.assertTrue(batch.is_valid())
+
+    def test_issuing_a_batch_code_keeps_the_single_transfer_code(self):
+        single_otp = otp_store.issue(TRANSFER_OTP, self.user.pk)
+        otp_store.issue(BATCH_TRANSFER_OTP, self.user.pk)
+
+        single = OTPVerificationSerializer(
+            data={"otp": single_otp}, context=self.context
+        )
+        self.assertTrue(single.is_valid())
+
+
+class TransactionKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(0)
+        self.account = create_account(self.user, 1)
+        counterparty = create_user(1)
+        other_account = create_account(counterparty, 2)
+        # Sent and received transfers come from separate UNION branches and
+        # share timestamps, so only the id tiebreaker keeps pages stable.
+        transactions = []
+        for index in range(23):
+            sent = index % 2
+            transactions.append(
+                Transaction(
+                    user=self.user,
+                    sender=self.user if sent else counterparty,
+                    sender_account=self.account if sent else other_account,
+                    receiver=counterparty if sent else self.user,
+                    receiver_account=other_account if sent else self.account,
+                    amount=Decimal(index + 1),
+                    transaction_type=Transaction.TransactionType.TRANSFER,
+                    status=Transaction.TransactionStatus.COMPLETED,
+                )
+            )
+        Transaction.objects.bulk_create(transactions)
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params=None, link="next"):
+        pages = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([item["id"] for item in response.data["results"]])
+            url, params = response.data[link], None
+        return pages
+
+    def test_pages_cover_both_branches_once_in_order(self):
+        pages = self.walk(reverse("transaction_list"), {"page_size": 5})
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        ids = [pk for page in pages for pk in page]
+        expected = [
+            str(pk)
+            for pk in Transaction.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_the_earlier_page(self):
+        first = self.client.get(reverse("transaction_list"), {"page_size": 5})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(
+            [item["id"] for item in back.data["results"]],
+            [item["id"] for item in first.data["results"]],
+        )
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(reverse("transaction_list"), {"cursor": "bogus"})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class BatchTransferServiceTests(TestCase):
+    def setUp(self):
+        self.sender = create_user(1)
+        self.sender_account = create_account(
+            self.sender, 1, account_balance=Decimal("100.00")
+        )
+        self.receivers = [create_account(create_user(index), index) for index in (2, 3)]
+
+    def assert_nothing_moved(self):
+        self.sender_account.refresh_from_db()
+        self.assertEqual(self.sender_account.account_balance, Decimal("100.00"))
+        for account in self.receivers:
+            account.refresh_from_db()
+            self.assertEqual(account.account_balance, Decimal("0.00"))
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(LedgerEntry.objects.exists())
+
+    def test_batch_posts_running_balances_for_every_leg(self):
+        first, second = self.receivers
+        transactions = services.batch_transfer(
+            self.sender_account,
+            [
+                (first, Decimal("10.00"), "one"),
+                (second, Decimal("20.00"), "two"),
+                (first, Decimal("5.00"), "three"),
+            ],
+            user=self.sender,
+        )
+
+        self.assertEqual(len(transactions), 3)
+        self.sender_account.refresh_from_db()
+        first.refresh_from_db()
+        self.assertEqual(self.sender_account.account_balance, Decimal("65.00"))
+        self.assertEqual(first.account_balance, Decimal("15.00"))
+        self.assertEqual(
+            list(
+                LedgerEntry.objects.filter(account=self.sender_account)
+                .order_by("sequence")
+                .values_list("balance_after", flat=True)
+            ),
+            [Decimal("90.00"), Decimal("70.00"), Decimal("65.00")],
+        )
+        self.assertEqual(
+            list(
+                LedgerEntry.objects.filter(account=first)
+                .order_by("sequence")
+                .values_list("balance_after", flat=True)
+            ),
+            [Decimal("10.00"), Decimal("15.00")],
+        )
+
+    def test_insufficient_funds_rolls_back_the_whole_batch(self):
+        with self.assertRaises(services.InsufficientFundsError):
+            services.batch_transfer(
+                self.sender_account,
+                [
+                    (self.receivers[0], Decimal("60.00"), "one"),
+                    (self.receivers[1], Decimal("60.00"), "two"),
+                ],
+                user=self.sender,
+            )
+
+        self.assert_nothing_moved()
+
+    def test_failed_credit_leg_rolls_back_the_debit(self):
+        missing = BankAccount(
+            user=self.sender,
+            account_number="9" * 16,
+            currency=BankAccount.AccountCurrency.MEXICAN_PESO,
+            account_type=BankAccount.AccountType.SAVINGS,
+        )
+
+        with self.assertRaises(BankAccount.DoesNotExist):
+            services.batch_transfer(
+                self.sender_account,
+                [
+                    (self.receivers[0], Decimal("10.00"), "one"),
+                    (missing, Decimal("10.00"), "two"),
+                ],
+                user=self.sender,
+            )
+
+        self.assert_nothing_moved()
+
+
+class AccountNumberCheckDigitTests(SimpleTestCase):
+    def test_check_digit_completes_a_valid_number(self):
+        check_digit = calculate_luhn_check_digit("411111111111111")
+
+        self.assertEqual(check_digit, 5)
+        self.assertTrue(has_valid_check_digit("4111111111111115"))
+
+    def test_malformed_numbers_are_rejected(self):
+        self.assertFalse(has_valid_check_digit("4111111111111116"))
+        self.assertFalse(has_valid_check_digit("411111111111115"))
+        self.assertFalse(has_valid_check_digit("41111111111111a5"))
+
+
+class AccountNumberFilterTests(SimpleTestCase):
+    def setUp(self):
+        # The filter runs against dedicated keys so the shared bitmap is
+        # left alone.
+        for name, key in [
+            ("BLOOM_KEY", "test:account_numbers:bloom"),
+            ("BLOOM_READY_KEY", "test:account_numbers:bloom:ready"),
+        ]:
+            patcher = mock.patch.object(account_filter, name, key)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(
+            get_redis_connection("default").delete,
+            "test:account_numbers:bloom",
+            "test:account_numbers:bloom:ready",
+        )
+        self.filter = AccountNumberFilter(size=2**20, hashes=7, refresh=3600)
+
+    def test_unknown_numbers_are_rejected_after_a_rebuild(self):
+        self.assertEqual(self.filter.rebuild(["4111111111111111"]), 1)
+
+        self.assertTrue(self.filter.might_contain("4111111111111111"))
+        self.assertFalse(self.filter.might_contain("5500000000000004"))
+
+    def test_numbers_added_after_the_local_copy_was_loaded_are_found(self):
+        self.filter.rebuild([])
+        self.assertFalse(self.filter.might_contain("5500000000000004"))
+
+        self.filter.add("5500000000000004")
+
+        self.assertTrue(self.filter.might_contain("5500000000000004"))
+
+    def test_filter_is_permissive_until_first_built(self):
+        self.assertTrue(self.filter.might_contain("5500000000000004"))
+
+
+class AccountNumberPoolTests(TestCase):
+    kind = utils.account_number_pool_kind(BankAccount.AccountCurrency.MEXICAN_PESO)
+
+    def setUp(self):
+        patcher = mock.patch.dict(
+            os.environ,
+            {
+                "BANK_CODE": "123",
+                "BANK_BRANCH_CODE": "4567",
+                "CURRENCY_CODE_MXN": "01",
+                "CURRENCY_CODE_USD": "02",
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        utils.get_account_number_prefix.cache_clear()
+        self.addCleanup(utils.get_account_number_prefix.cache_clear)
+
+    def test_prefix_includes_the_branch_code(self):
+        self.assertEqual(
+            utils.get_account_number_prefix(BankAccount.AccountCurrency.DOLLAR),
+            "123456702",
+        )
+
+    def test_replenish_tops_the_pool_up_to_its_target(self):
+        reserved = utils.replenish_account_number_pool(
+            BankAccount.AccountCurrency.MEXICAN_PESO, 5
+        )
+
+        self.assertEqual(reserved, 5)
+        self.assertEqual(ReservedIdentifier.available(self.kind), 5)
+        self.assertEqual(
+            utils.replenish_account_number_pool(
+                BankAccount.AccountCurrency.MEXICAN_PESO, 5
+            ),
+            0,
+        )
+
+    def test_replenish_skips_numbers_already_issued(self):
+        issued = create_account(create_user(0), 1).account_number
+
+        with mock.patch.object(
+            utils,
+            "generate_account_number",
+            side_effect=[issued, "1234567010000008"],
+        ):
+            reserved = utils.replenish_account_number_pool(
+                BankAccount.AccountCurrency.MEXICAN_PESO, 2
+            )
+
+        self.assertEqual(reserved, 1)
+        self.assertQuerySetEqual(
+            ReservedIdentifier.objects.filter(kind=self.kind).values_list(
+                "value", flat=True
+            ),
+            ["1234567010000008"],
+        )
+
+    def test_allocate_claims_a_pooled_number_once(self):
+        ReservedIdentifier.reserve(self.kind, ["1234567010000008"])
+
+        account_number = utils.allocate_account_number(
+            BankAccount.AccountCurrency.MEXICAN_PESO
+        )
+
+        self.assertEqual(account_number, "1234567010000008")
+        self.assertEqual(ReservedIdentifier.available(self.kind), 0)
+        self.assertIsNotNone(
+            ReservedIdentifier.objects.get(kind=self.kind).allocated_at
+        )
+
+    def test_allocate_generates_a_number_when_the_pool_is_empty(self):
+        issued = create_account(create_user(0), 1).account_number
+
+        with mock.patch.object(
+            utils,
+            "generate_account_number",
+            side_effect=[issued, "1234567010000008"],
+        ) as generate:
+            account_number = utils.allocate_account_number(
+                BankAccount.AccountCurrency.MEXICAN_PESO
+            )
+
+        self.assertEqual(account_number, "1234567010000008")
+        self.assertEqual(generate.call_count, 2)
+
+    @override_settings(IDENTIFIER_POOL_SIZE=3)
+    def test_task_replenishes_every_currency(self):
+        self.assertEqual(tasks.replenish_account_number_pool_task(), 6)
+
+        for currency in BankAccount.AccountCurrency.values:
+            self.assertEqual(
+                ReservedIdentifier.available(utils.account_number_pool_kind(currency)),
+                3,
+            )
+
+
+class StatementExportTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(0)
+        self.account = create_account(self.user, 1)
+        self.other = create_user(1)
+        self.other_account = create_account(self.other, 2)
+        third = create_user(2)
+        third_account = create_account(third, 3)
+
+        self.sent = self.create_transaction(
+            self.user, self.account, self.other, self.other_account, "2024-01-10"
+        )
+        self.received = self.create_transaction(
+            self.other, self.other_account, self.user, self.account, "2024-02-10"
+        )
+        self.deposit = self.create_transaction(
+            None,
+            None,
+            self.user,
+            self.account,
+            "2024-03-10",
+            transaction_type=Transaction.TransactionType.DEPOSIT,
+        )
+        self.foreign = self.create_transaction(
+            self.other, self.other_account, third, third_account, "2024-02-20"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_transaction(
+        self,
+        sender,
+        sender_account,
+        receiver,
+        receiver_account,
+        created_at,
+        transaction_type=Transaction.TransactionType.TRANSFER,
+    ):
+        transaction = Transaction.objects.create(
+            user=sender or receiver,
+            sender=sender,
+            sender_account=sender_account,
+            receiver=receiver,
+            receiver_account=receiver_account,
+            amount=Decimal("10.00"),
+            transaction_type=transaction_type,
+            status=Transaction.TransactionStatus.COMPLETED,
+        )
+        # created_at is auto_now_add, so the statement date is set afterwards.
+        Transaction.objects.filter(pk=transaction.pk).update(
+            created_at=datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc)
+        )
+        return transaction
+
+    def export(self, **params):
+        response = self.client.get(reverse("statement_export"), params)
+        content = b"".join(response.streaming_content).decode()
+        return response, content
+
+    def exported_ids(self, **params):
+        response, content = self.export(**params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in csv.DictReader(io.StringIO(content))]
+
+    def test_csv_has_a_header_and_one_row_per_transaction(self):
+        response, content = self.export()
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        reader = csv.DictReader(io.StringIO(content))
+        self.assertEqual(reader.fieldnames, list(TransactionSerializer().fields))
+        rows = list(reader)
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [str(self.deposit.pk), str(self.received.pk), str(self.sent.pk)],
+        )
+        self.assertEqual(rows[2]["sender_account"], self.account.account_number)
+        self.assertEqual(rows[2]["receiver_account"], self.other_account.account_number)
+
+    def test_ndjson_has_one_record_per_line(self):
+        response, content = self.export(export_format="ndjson")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 3)
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(records[0]["id"], str(self.deposit.pk))
+        self.assertEqual(records[0]["amount"], "10.00")
+
+    def test_date_filters_bound_the_statement(self):
+        self.assertEqual(
+            self.exported_ids(start_date="2024-02-01"),
+            [str(self.deposit.pk), str(self.received.pk)],
+        )
+        self.assertEqual(
+            self.exported_ids(start_date="2024-02-01", end_date="2024-02-28"),
+            [str(self.received.pk)],
+        )
+
+    def test_transaction_type_filter(self):
+        self.assertEqual(
+            self.exported_ids(transaction_type=Transaction.TransactionType.DEPOSIT),
+            [str(self.deposit.pk)],
+        )
+
+    def test_other_customers_accounts_are_not_exported(self):
+        self.assertEqual(
+            self.exported_ids(account_number=self.other_account.account_number), []
+        )
+        self.assertNotIn(str(self.foreign.pk), self.exported_ids())
+
+    def test_unsupported_format_is_rejected(self):
+        response = self.client.get(
+            reverse("statement_export"), {"export_format": "xml"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+@mock.patch("core_apps.accounts.serializers.is_known_account_number", return_value=True)
+class DepositEmailTests(APITestCase):
+    def setUp(self):
+        self.customer = create_user(0)
+        self.account = create_account(self.customer, 1)
+        self.client.force_authenticate(create_user(1, role=User.RoleChoices.TELLER))
+        # The task runs inline when it is queued, so mail.outbox shows exactly
+        # what a worker would have sent.
+        patcher = mock.patch.object(
+            tasks.send_deposit_email_task,
+            "delay",
+            side_effect=tasks.send_deposit_email_task,
+        )
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def deposit(self):
+        return self.client.post(
+            reverse("account_deposit"),
+            {"account_number": self.account.account_number, "amount": "25.00"},
+            format="json",
+        )
+
+    def test_email_is_queued_only_after_commit(self, _):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.deposit()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(callbacks), 1)
+        self.delay.assert_not_called()
+        self.assertEqual(mail.outbox, [])
+
+        callbacks[0]()
+
+        self.delay.assert_called_once_with(str(self.account.pk), "25.00", "25.00")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.customer.email])
+
+    def test_rolled_back_deposit_sends_nothing(self, _):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    self.assertEqual(self.deposit().status_code, 200)
+                    raise DatabaseError("rolled back after the deposit")
+
+        self.assertEqual(callbacks, [])
+        self.delay.assert_not_called()
+        self.assertEqual(mail.outbox, [])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.account_balance, Decimal("0.00"))
+
+    def test_task_skips_accounts_that_no_longer_exist(self, _):
+        tasks.send_deposit_email_task(str(uuid.uuid4()), "25.00", "25.00")
+
+        self.assertEqual(mail.outbox, [])
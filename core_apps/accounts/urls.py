@@ -8,6 +8,9 @@ from .views import (
     VerifySecurityQuestionView,
     InitiateTransferView,
     TransactionListAPIView,
+    InitiateBatchTransferView,
+    VerifyBatchTransferOTPView,
+    StatementExportAPIView,
 )
 
 urlpatterns = [
@@ -36,5 +39,20 @@ urlpatterns = [
         name="verify_security_question",
     ),
     path("transfer/verify-otp/", VerifyOTPView.as_view(), name="verify_otp"),
+    path(
+        "transfer/batch/initiate/",
+        InitiateBatchTransferView.as_view(),
+        name="initiate_batch_transfer",
+    ),
+    path(
+        "transfer/batch/verify-otp/",
+        VerifyBatchTransferOTPView.as_view(),
+        name="verify_batch_transfer_otp",
+    ),
     path("transactions/", TransactionListAPIView.as_view(), name="transaction_list"),
+    path(
+        "transactions/export/",
+        StatementExportAPIView.as_view(),
+        name="statement_export",
+    ),
 ]
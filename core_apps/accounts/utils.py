@@ -1,27 +1,36 @@
 import secrets
+from functools import lru_cache, partial
 from os import getenv
 from django.db import transaction
-from .emails import send_account_creation_email
+from core_apps.common.models import ReservedIdentifier
+from .account_filter import account_number_filter
+from .tasks import send_account_creation_email_task
 from .models import BankAccount
 
 
-def generate_account_number(currency):
+LUHN_DOUBLED_DIGITS = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+
+@lru_cache(maxsize=None)
+def get_account_number_prefix(currency):
     bank_code = getenv("BANK_CODE")
-    branch_code = getenv("BANL_BRANCH_CODE")
+    branch_code = getenv("BANK_BRANCH_CODE")
 
     currency_codes = {
         "mexican_peso": getenv("CURRENCY_CODE_MXN"),
-        "us_dolar": getenv("us_dollar"),
+        "us_dollar": getenv("CURRENCY_CODE_USD"),
     }
     currency_code = currency_codes.get(currency)
     if not currency_code:
         raise ValueError(f"Invalid currency_code: {currency}")
 
-    prefix = f"{bank_code}{branch_code}{currency_code}"
+    return f"{bank_code}{branch_code}{currency_code}"
+
+
+def generate_account_number(currency):
+    prefix = get_account_number_prefix(currency)
     remaining_digits = 16 - len(prefix) - 1
-    random_digits = "".join(
-        secrets.choice("0123456789") for _ in range(remaining_digits)
-    )
+    random_digits = f"{secrets.randbelow(10**remaining_digits):0{remaining_digits}d}"
     partial_account_number = f"{prefix}{random_digits}"
     check_digit = calculate_luhn_check_digit(partial_account_number)
 
@@ -29,28 +38,62 @@ def generate_account_number(currency):
 
 
 def calculate_luhn_check_digit(number):
-    def split_into_digits(n):
-        return [int(digit) for digit in str(n)]
+    total = 0
+    for index, digit in enumerate(reversed(str(number))):
+        digit = ord(digit) - 48
+        total += LUHN_DOUBLED_DIGITS[digit] if index % 2 else digit
 
-    digits = split_into_digits(number)
-    odd_digits = digits[-1::-2]
-    even_digits = digits[-2::-2]
+    return (10 - (total % 10)) % 10
 
-    total = sum(odd_digits)
 
-    for d in even_digits:
-        doubled = d * 2
-        total += sum(split_into_digits(doubled))
+def has_valid_check_digit(account_number):
+    if len(account_number) != 16 or not account_number.isdigit():
+        return False
+    return calculate_luhn_check_digit(account_number[:-1]) == int(account_number[-1])
 
-    return (10 - (total % 10)) % 10
+
+def is_known_account_number(account_number):
+    # Rejects typos and unissued numbers without a database round trip. A
+    # True result only means the number may exist and still needs a lookup.
+    return has_valid_check_digit(account_number) and (
+        account_number_filter.might_contain(account_number)
+    )
+
+
+def account_number_pool_kind(currency):
+    return f"account_number:{currency}"
+
+
+def replenish_account_number_pool(currency, target_size):
+    kind = account_number_pool_kind(currency)
+    missing = target_size - ReservedIdentifier.available(kind)
+    if missing <= 0:
+        return 0
+
+    candidates = {generate_account_number(currency) for _ in range(missing)}
+    issued = set(
+        BankAccount.objects.filter(account_number__in=candidates).values_list(
+            "account_number", flat=True
+        )
+    )
+    ReservedIdentifier.reserve(kind, list(candidates - issued))
+    return len(candidates - issued)
+
+
+def allocate_account_number(currency):
+    account_number = ReservedIdentifier.allocate(account_number_pool_kind(currency))
+    if account_number:
+        return account_number
+
+    while True:
+        account_number = generate_account_number(currency)
+        if not BankAccount.objects.filter(account_number=account_number).exists():
+            return account_number
 
 
 def create_bank_account(user, currency, account_type):
     with transaction.atomic():
-        while True:
-            account_number = generate_account_number(currency)
-            if not BankAccount.objects.filter(account_number=account_number).exists():
-                break
+        account_number = allocate_account_number(currency)
 
         is_primary = not BankAccount.objects.filter(user=user).exists()
 
@@ -61,7 +104,10 @@ def create_bank_account(user, currency, account_type):
             account_type=account_type,
             is_primary=is_primary,
         )
+        account_number_filter.add(account_number)
 
-        send_account_creation_email(user, bank_account)
+        transaction.on_commit(
+            partial(send_account_creation_email_task.delay, str(bank_account.pk))
+        )
 
     return bank_account
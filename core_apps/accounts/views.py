@@ -1,22 +1,33 @@
-import random
+import csv
+import json
+from functools import partial
 from typing import Any
 
-from celery.worker.control import query_task
-from django.dispatch import receiver
 from django.utils import timezone
 from rest_framework import generics, status, serializers
 from rest_framework.response import Response
 from rest_framework.request import Request
+from core_apps.common.flow_state import (
+    batch_transfer_state,
+    transfer_state,
+    withdrawal_state,
+)
+from core_apps.common.idempotency import idempotent
 from core_apps.common.permissions import IsAccountExecutive, IsTeller
 from core_apps.common.renderers import GenericJSONRenderer
-from .emails import (
-    send_full_activation_email,
-    send_deposit_email,
-    send_withdrawal_email,
-    send_tranfer_otp_email,
-    send_transfer_email,
+from core_apps.user_auth.otp import BATCH_TRANSFER_OTP, TRANSFER_OTP, otp_store
+from .emails import send_tranfer_otp_email
+from .tasks import (
+    send_batch_transfer_emails_task,
+    send_deposit_email_task,
+    send_full_activation_email_task,
+    send_transfer_email_task,
+    send_withdrawal_email_task,
 )
 from .models import BankAccount, Transaction
+from . import services
+from .services import InsufficientFundsError
+from .utils import is_known_account_number
 from decimal import Decimal
 from .serializers import (
     AccountVerificationSerializer,
@@ -25,16 +36,24 @@ from .serializers import (
     TransactionSerializer,
     UsernameVerificationSerializer,
     SecurityQuestionSerializer,
+    BatchTransferOTPVerificationSerializer,
     OTPVerificationSerializer,
+    BatchTransferSerializer,
 )
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Prefetch
 from loguru import logger
-from .pagination import StandardResultsSetPagination
+from .pagination import KeysetCursorPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from dateutil import parser
-from django.db.models import Q
 from rest_framework.filters import OrderingFilter
 
+User = get_user_model()
+
 
 class AccountVerificationView(generics.UpdateAPIView):
     queryset = BankAccount.objects.all()
@@ -84,7 +103,9 @@ class AccountVerificationView(generics.UpdateAPIView):
                 instance.account_status = BankAccount.AccountStatus.ACTIVE
                 instance.save()
 
-                send_full_activation_email(instance)
+                transaction.on_commit(
+                    partial(send_full_activation_email_task.delay, str(instance.pk))
+                )
 
             return Response(
                 {
@@ -109,8 +130,15 @@ class DepositView(generics.CreateAPIView):
                 {"error": "Account number is required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if not is_known_account_number(account_number):
+            return Response(
+                {"error": "Account number doesn't exists"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
         try:
-            account = BankAccount.objects.get(account_number=account_number)
+            account = BankAccount.objects.select_related("user__profile").get(
+                account_number=account_number
+            )
             serializer = CustomerInfoSerializer(account)
             return Response(serializer.data)
         except BankAccount.DoesNotExist:
@@ -119,6 +147,7 @@ class DepositView(generics.CreateAPIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+    @idempotent
     @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -128,22 +157,25 @@ class DepositView(generics.CreateAPIView):
         amount = serializer.validated_data["amount"]
 
         try:
-            account.account_balance += amount
-            account.full_clean()
-            account.save()
+            services.deposit(
+                account,
+                amount,
+                user=request.user,
+                description=f"Deposit to account {account.account_number}",
+            )
 
             logger.info(
                 f"Deposit of {amount} made to account {account.account_number} "
                 f"By teller {request.user.email}"
             )
 
-            send_deposit_email(
-                user=account.user,
-                user_email=account.user.email,
-                amount=amount,
-                currency=account.currency,
-                new_balance=account.account_balance,
-                account_number=account.account_number,
+            transaction.on_commit(
+                partial(
+                    send_deposit_email_task.delay,
+                    str(account.pk),
+                    str(amount),
+                    str(account.account_balance),
+                )
             )
 
             return Response(
@@ -212,11 +244,14 @@ class InitiateWithdrawalView(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        request.session["withdrawal_data"] = {
-            "account_number": account_number,
-            "amount": str(amount),
-        }
-        logger.info("Withdrawal data stored in session")
+        withdrawal_state.set(
+            request.user.pk,
+            {
+                "account_number": account_number,
+                "amount": str(amount),
+            },
+        )
+        logger.info("Withdrawal data stored in flow state")
 
         return Response(
             {
@@ -232,6 +267,7 @@ class VerifyUsernameAndWithdrawAPIView(generics.CreateAPIView):
     renderer_classes = [GenericJSONRenderer]
     object_label = "verify_username_and_withdraw"
 
+    @idempotent
     @transaction.atomic()
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
@@ -239,7 +275,7 @@ class VerifyUsernameAndWithdrawAPIView(generics.CreateAPIView):
         )
         serializer.is_valid(raise_exception=True)
 
-        withdrawal_data = request.session.get("withdrawal_data")
+        withdrawal_data = withdrawal_state.get(request.user.pk)
         if not withdrawal_data:
             return Response(
                 {"error": "No pending withdrawal found. Please initiate a withdrawal."},
@@ -259,35 +295,30 @@ class VerifyUsernameAndWithdrawAPIView(generics.CreateAPIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        if account.account_balance < amount:
+        try:
+            withdrawal_transaction = services.withdraw(
+                account,
+                amount,
+                user=request.user,
+                description=f"Withdrawal from account {account_number}",
+            )
+        except InsufficientFundsError:
             return Response(
                 {"error": "Insufficient funds for withdrawal."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        account.account_balance -= amount
-        account.save()
-
-        withdrawal_transaction = Transaction.objects.create(
-            user=request.user,
-            sender=request.user,
-            sender_account=account,
-            amount=amount,
-            description=f"Withdrawal from account {account_number}",
-            transaction_type=Transaction.TransactionType.WITHDRAWAL,
-            status=Transaction.TransactionStatus.COMPLETED,
-        )
         logger.info(f"Withdrawal of amount {amount} made from account {account_number}")
 
-        send_withdrawal_email(
-            user=account.user,
-            user_email=account.user.email,
-            amount=amount,
-            currency=account.currency,
-            new_balance=account.account_balance,
-            account_number=account.account_number,
+        transaction.on_commit(
+            partial(
+                send_withdrawal_email_task.delay,
+                str(account.pk),
+                str(amount),
+                str(account.account_balance),
+            )
         )
 
-        del request.session["withdrawal_data"]
+        withdrawal_state.delete(request.user.pk)
 
         return Response(
             {
@@ -333,12 +364,15 @@ class InitiateTransferView(generics.CreateAPIView):
         serializer = self.get_serializer(data=data)
 
         if serializer.is_valid():
-            request.session["transfer_data"] = {
-                "sender_account": sender_account_number,
-                "receiver_account": receiver_account_number,
-                "amount": str(serializer.validated_data["amount"]),
-                "description": serializer.validated_data.get("description", ""),
-            }
+            transfer_state.set(
+                request.user.pk,
+                {
+                    "sender_account": sender_account_number,
+                    "receiver_account": receiver_account_number,
+                    "amount": str(serializer.validated_data["amount"]),
+                    "description": serializer.validated_data.get("description", ""),
+                },
+            )
 
             return Response(
                 {
@@ -361,8 +395,8 @@ class VerifySecurityQuestionView(generics.CreateAPIView):
             data=request.data, context={"request": request}
         )
         if serializer.is_valid():
-            otp = "".join([str(random.randint(0, 9)) for _ in range(6)])
-            request.user.set_otp(otp)
+            otp = otp_store.issue(TRANSFER_OTP, request.user.pk)
+            transfer_state.touch(request.user.pk)
             send_tranfer_otp_email(request.user.email, otp)
 
             return Response(
@@ -381,6 +415,7 @@ class VerifyOTPView(generics.CreateAPIView):
     renderer_classes = [GenericJSONRenderer]
     object_label = "verify_otp"
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             data=request.data, context={"request": request}
@@ -391,7 +426,7 @@ class VerifyOTPView(generics.CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def process_transfer(self, request):
-        transfer_data = request.session.get("transfer_data")
+        transfer_data = transfer_state.get(request.user.pk)
         if not transfer_data:
             return Response(
                 {"error": "Transfer data not found. Please start the process again"},
@@ -413,42 +448,31 @@ class VerifyOTPView(generics.CreateAPIView):
 
         amount = Decimal(transfer_data["amount"])
 
-        if sender_account.account_balance < amount:
+        try:
+            transfer_transaction = services.transfer(
+                sender_account,
+                receiver_account,
+                amount,
+                user=request.user,
+                description=transfer_data.get("description", ""),
+            )
+        except InsufficientFundsError:
             return Response(
                 {"error": "Insufficient funds for transfer"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        sender_account.account_balance -= amount
-        receiver_account.account_balance += amount
-        sender_account.save()
-        receiver_account.save()
-
-        transfer_transaction = Transaction.objects.create(
-            user=request.user,
-            sender=request.user,
-            sender_account=sender_account,
-            receiver=receiver_account.user,
-            receiver_account=receiver_account,
-            amount=amount,
-            description=transfer_data.get("description", ""),
-            transaction_type=Transaction.TransactionType.TRANSFER,
-            status=Transaction.TransactionStatus.COMPLETED,
-        )
+        transfer_state.delete(request.user.pk)
 
-        del request.session["transfer_data"]
-
-        send_transfer_email(
-            sender_name=sender_account.user.full_name,
-            sender_email=sender_account.user.email,
-            receiver_name=receiver_account.user.full_name,
-            receiver_email=receiver_account.user.email,
-            amount=amount,
-            currency=sender_account.currency,
-            sender_new_balance=sender_account.account_balance,
-            receiver_new_balance=receiver_account.account_balance,
-            sender_account_number=sender_account.account_number,
-            receiver_account_number=receiver_account.account_number,
+        transaction.on_commit(
+            partial(
+                send_transfer_email_task.delay,
+                str(sender_account.pk),
+                str(receiver_account.pk),
+                str(amount),
+                str(sender_account.account_balance),
+                str(receiver_account.account_balance),
+            )
         )
 
         logger.info(
@@ -462,46 +486,193 @@ class VerifyOTPView(generics.CreateAPIView):
         )
 
 
-class TransactionListAPIView(generics.ListAPIView):
+class InitiateBatchTransferView(generics.CreateAPIView):
+    serializer_class = BatchTransferSerializer
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "initiate_batch_transfer"
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, context={"request": request}
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        transfers = serializer.validated_data["transfers"]
+        batch_transfer_state.set(
+            request.user.pk,
+            {
+                "sender_account": serializer.validated_data[
+                    "sender_account"
+                ].account_number,
+                "transfers": [
+                    {
+                        "receiver_account": item["receiver_account"],
+                        "amount": str(item["amount"]),
+                        "description": item["description"],
+                    }
+                    for item in transfers
+                ],
+            },
+        )
+
+        otp = otp_store.issue(BATCH_TRANSFER_OTP, request.user.pk)
+        send_tranfer_otp_email(request.user.email, otp)
+
+        return Response(
+            {
+                "message": "Batch transfer initiated. OTP email has been sent",
+                "transfer_count": len(transfers),
+                "total_amount": str(serializer.validated_data["total_amount"]),
+                "next_steps": "Verify OTP",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class VerifyBatchTransferOTPView(generics.CreateAPIView):
+    serializer_class = BatchTransferOTPVerificationSerializer
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "verify_batch_transfer_otp"
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, context={"request": request}
+        )
+        if serializer.is_valid():
+            return self.process_batch_transfer(request)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def process_batch_transfer(self, request):
+        batch_data = batch_transfer_state.get(request.user.pk)
+        if not batch_data:
+            return Response(
+                {
+                    "error": "Batch transfer data not found. Please start the process again"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        accounts = BankAccount.objects.in_bulk(
+            {batch_data["sender_account"]}
+            | {item["receiver_account"] for item in batch_data["transfers"]},
+            field_name="account_number",
+        )
+        sender_account = accounts.get(batch_data["sender_account"])
+        if (
+            sender_account is None
+            or sender_account.user_id != request.user.pk
+            or any(
+                item["receiver_account"] not in accounts
+                for item in batch_data["transfers"]
+            )
+        ):
+            return Response(
+                {"error": "One or more accounts not found"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        credits = [
+            (
+                accounts[item["receiver_account"]],
+                Decimal(item["amount"]),
+                item["description"],
+            )
+            for item in batch_data["transfers"]
+        ]
+
+        try:
+            transactions = services.batch_transfer(
+                sender_account, credits, user=request.user
+            )
+        except InsufficientFundsError:
+            return Response(
+                {"error": "Insufficient funds for transfer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        batch_transfer_state.delete(request.user.pk)
+
+        transaction.on_commit(
+            partial(
+                send_batch_transfer_emails_task.delay,
+                str(sender_account.pk),
+                [str(transfer.pk) for transfer in transactions],
+            )
+        )
+
+        logger.info(
+            f"Batch transfer of {len(transactions)} credits made from account "
+            f"{sender_account.account_number}"
+        )
+
+        return Response(
+            {
+                "message": "Batch transfer completed successfully.",
+                "transfer_count": len(transactions),
+                "new_balance": str(sender_account.account_balance),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class TransactionHistoryMixin:
     serializer_class = TransactionSerializer
-    pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     ordering_fields = ["created_at", "amount"]
     ordering = ["-created_at"]
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Transaction.objects.filter(Q(sender=user) | Q(receiver=user))
         start_date = self.request.query_params.get("start_date")
         end_date = self.request.query_params.get("end_date")
         account_number = self.request.query_params.get("account_number")
+        transaction_type = self.request.query_params.get("transaction_type")
+        account = None
 
         if start_date:
             try:
                 start_date = parser.parse(start_date)
-                queryset = queryset.filter(created_at__gte=start_date)
             except ValueError:
-                pass
+                start_date = None
 
         if end_date:
             try:
                 end_date = parser.parse(end_date)
-                queryset = queryset.filter(created_at__lte=end_date)
             except ValueError:
-                pass
+                end_date = None
 
         if account_number:
             try:
                 account = BankAccount.objects.get(
                     account_number=account_number, user=user
                 )
-                queryset = queryset.filter(
-                    Q(sender_account=account) | Q(receiver_account=account)
-                )
             except BankAccount.DoesNotExist:
-                queryset = Transaction.objects.none()
+                return Transaction.objects.none()
+
+        return Transaction.objects.prefetch_related(
+            Prefetch("sender", queryset=User.objects.only("first_name", "last_name")),
+            Prefetch("receiver", queryset=User.objects.only("first_name", "last_name")),
+            Prefetch(
+                "sender_account", queryset=BankAccount.objects.only("account_number")
+            ),
+            Prefetch(
+                "receiver_account",
+                queryset=BankAccount.objects.only("account_number"),
+            ),
+        ).history(
+            user,
+            account=account,
+            start_date=start_date,
+            end_date=end_date,
+            transaction_type=transaction_type,
+        )
+
 
-        return queryset
+class TransactionListAPIView(TransactionHistoryMixin, generics.ListAPIView):
+    pagination_class = KeysetCursorPagination
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -517,3 +688,57 @@ class TransactionListAPIView(generics.ListAPIView):
             )
 
         return response
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class StatementExportAPIView(TransactionHistoryMixin, generics.GenericAPIView):
+    export_formats = {
+        "csv": "text/csv",
+        "ndjson": "application/x-ndjson",
+    }
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in self.export_formats:
+            return Response(
+                {"error": f"Unsupported export format: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = (
+            self.get_serializer(instance).data
+            for instance in queryset.iterator(
+                chunk_size=settings.STATEMENT_EXPORT_CHUNK_SIZE
+            )
+        )
+        if export_format == "csv":
+            content = self.stream_csv(rows)
+        else:
+            content = self.stream_ndjson(rows)
+
+        response = StreamingHttpResponse(
+            content, content_type=self.export_formats[export_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="statement-{timezone.now():%Y%m%d}.{export_format}"'
+        )
+        logger.info(
+            f"User {request.user.email} started a {export_format} statement export"
+        )
+        return response
+
+    def stream_csv(self, rows):
+        fields = list(self.get_serializer().fields)
+        writer = csv.DictWriter(Echo(), fieldnames=fields)
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(row)
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
@@ -1,10 +1,14 @@
+from django.apps import apps
 from django.contrib import admin
 from typing import Any
 from django.contrib.contenttypes.admin import GenericTabularInline
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.db.models import QuerySet
 from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
 
 from .models import ContentView
+from .paginators import EstimatedCountPaginator
 
 
 @admin.register(ContentView)
@@ -17,8 +21,10 @@ class ContentViewAdmin(admin.ModelAdmin):
         "last_viewed",
         "created_at",
     ]
+    list_select_related = ["content_type", "user"]
     list_filter = ["content_type", "last_viewed", "created_at"]
-    date_hierarchy = "last_viewed"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = [
         "content_type",
         "object_id",
@@ -52,6 +58,20 @@ class ContentViewAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        # Viewed objects are fetched once per content type rather than once
+        # per row, with the user their __str__ reads.
+        Profile = apps.get_model("user_profile", "Profile")
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                GenericPrefetch(
+                    "content_object", [Profile.objects.select_related("user")]
+                )
+            )
+        )
+
     def has_add_permission(self, request: HttpRequest) -> bool:
         return False
 
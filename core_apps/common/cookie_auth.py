@@ -1,11 +1,18 @@
 from typing import Optional, Tuple
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from loguru import logger
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.request import Request
 from rest_framework_simplejwt.authentication import AuthUser, JWTAuthentication
-from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import Token
 
+from core_apps.user_auth.tokens import PERMISSIONS_VERSION_CLAIM
+
+from .user_cache import get_cached_user
+
 
 class CookieAuthentication(JWTAuthentication):
     def authenticate(self, request: Request) -> Optional[Tuple[AuthUser, Token]]:
@@ -24,3 +31,23 @@ class CookieAuthentication(JWTAuthentication):
             except TokenError as e:
                 logger.error(f"Token validation error: {str(e)}")
         return None
+
+    def get_user(self, validated_token: Token) -> AuthUser:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        token_version = validated_token.get(PERMISSIONS_VERSION_CLAIM)
+        if token_version is not None and token_version != user.permissions_version:
+            raise AuthenticationFailed(
+                _("Token permissions are outdated, please refresh your token"),
+                code="token_outdated",
+            )
+        return user
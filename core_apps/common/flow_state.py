@@ -0,0 +1,56 @@
+import json
+from typing import Any, Optional
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+WITHDRAWAL_FLOW = "withdrawal"
+TRANSFER_FLOW = "transfer"
+BATCH_TRANSFER_FLOW = "batch_transfer"
+
+
+class FlowStateStore:
+    """Per-user state for multi-step flows, kept in one Redis hash per flow.
+
+    Entries expire after ``FLOW_STATE_TTL`` so an abandoned flow cleans
+    itself up, and ``touch`` restarts the clock whenever a fresh OTP is
+    issued for the flow.
+    """
+
+    def __init__(self, flow: str) -> None:
+        self.flow = flow
+
+    def _key(self, user_id: Any) -> str:
+        return f"flow_state:{self.flow}:{user_id}"
+
+    @staticmethod
+    def _ttl() -> int:
+        return int(settings.FLOW_STATE_TTL.total_seconds())
+
+    def set(self, user_id: Any, data: dict[str, Any]) -> None:
+        key = self._key(user_id)
+        pipeline = get_redis_connection("default").pipeline(transaction=True)
+        pipeline.delete(key)
+        pipeline.hset(
+            key, mapping={field: json.dumps(value) for field, value in data.items()}
+        )
+        pipeline.expire(key, self._ttl())
+        pipeline.execute()
+
+    def get(self, user_id: Any) -> Optional[dict[str, Any]]:
+        stored = get_redis_connection("default").hgetall(self._key(user_id))
+        if not stored:
+            return None
+        return {field.decode(): json.loads(value) for field, value in stored.items()}
+
+    def touch(self, user_id: Any) -> bool:
+        connection = get_redis_connection("default")
+        return bool(connection.expire(self._key(user_id), self._ttl()))
+
+    def delete(self, user_id: Any) -> None:
+        get_redis_connection("default").delete(self._key(user_id))
+
+
+withdrawal_state = FlowStateStore(WITHDRAWAL_FLOW)
+transfer_state = FlowStateStore(TRANSFER_FLOW)
+batch_transfer_state = FlowStateStore(BATCH_TRANSFER_FLOW)
@@ -0,0 +1,67 @@
+import hashlib
+import json
+from functools import wraps
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def _request_fingerprint(request: Request) -> str:
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent(view_method: Callable) -> Callable:
+    @wraps(view_method)
+    def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(view, request, *args, **kwargs)
+
+        cache_key = f"idempotency:{type(view).__name__}:{request.user.pk}:{key}"
+        fingerprint = _request_fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is not None:
+            if stored["fingerprint"] != fingerprint:
+                return Response(
+                    {
+                        "error": "Idempotency-Key was already used with a "
+                        "different request"
+                    },
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            response = Response(stored["data"], status=stored["status_code"])
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        lock_key = f"{cache_key}:lock"
+        if not cache.add(lock_key, 1, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            return Response(
+                {"error": "A request with this Idempotency-Key is already in progress"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status_code": response.status_code,
+                        "data": response.data,
+                    },
+                    timeout=settings.IDEMPOTENCY_KEY_TTL,
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
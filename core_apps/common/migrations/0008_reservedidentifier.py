@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0007_alter_contentview_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservedIdentifier",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=50, verbose_name="Kind")),
+                ("value", models.CharField(max_length=20, verbose_name="Value")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "allocated_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Allocated At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Reserved Identifier",
+                "verbose_name_plural": "Reserved Identifiers",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "value"), name="unique_reserved_identifier"
+                    )
+                ],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("allocated_at__isnull", True)),
+                        fields=["kind", "id"],
+                        name="reserved_identifier_free_idx",
+                    )
+                ],
+            },
+        ),
+    ]
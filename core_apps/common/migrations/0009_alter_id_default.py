@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 06:59
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0008_reservedidentifier"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contentview",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+    ]
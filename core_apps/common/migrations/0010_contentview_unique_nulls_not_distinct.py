@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-17 07:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def delete_duplicate_views(apps, schema_editor):
+    # unique_together let rows with a NULL user or IP repeat, so only the
+    # latest of each is kept before NULLs start comparing equal.
+    ContentView = apps.get_model("common", "ContentView")
+    table = ContentView._meta.db_table
+    schema_editor.execute(
+        f"""
+        DELETE FROM {table} AS a
+        USING {table} AS b
+        WHERE a.content_type_id = b.content_type_id
+        AND a.object_id = b.object_id
+        AND a.user_id IS NOT DISTINCT FROM b.user_id
+        AND a.viewer_ip IS NOT DISTINCT FROM b.viewer_ip
+        AND (a.last_viewed, a.id) < (b.last_viewed, b.id)
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0009_alter_id_default"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="contentview",
+            unique_together=set(),
+        ),
+        migrations.RunPython(delete_duplicate_views, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="contentview",
+            constraint=models.UniqueConstraint(
+                fields=("content_type", "object_id", "user", "viewer_ip"),
+                name="unique_content_view",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
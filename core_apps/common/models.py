@@ -3,7 +3,7 @@ from typing import Any, Optional
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models, IntegrityError
+from django.db import connection, models, IntegrityError
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -11,7 +11,7 @@ User = get_user_model()
 
 
 class TimeStampedModel(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4(), editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -41,11 +41,14 @@ class ContentView(TimeStampedModel):
     class Meta:
         verbose_name = _("Content View")
         verbose_name_plural = _("Content Views")
-        unique_together = [
-            "content_type",
-            "object_id",
-            "user",
-            "viewer_ip",
+        # Anonymous views have no user and logged-in ones may have no IP, so
+        # NULLs must compare equal for the upsert to find the existing row.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "user", "viewer_ip"],
+                name="unique_content_view",
+                nulls_distinct=False,
+            )
         ]
 
     def __str__(self):
@@ -74,3 +77,57 @@ class ContentView(TimeStampedModel):
                 view.save()
         except IntegrityError:
             pass
+
+
+class ReservedIdentifier(models.Model):
+    # Allocated rows are kept rather than deleted so the unique constraint
+    # keeps a handed-out identifier from ever being generated again.
+    kind = models.CharField(_("Kind"), max_length=50)
+    value = models.CharField(_("Value"), max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+    allocated_at = models.DateTimeField(_("Allocated At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Reserved Identifier")
+        verbose_name_plural = _("Reserved Identifiers")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "value"], name="unique_reserved_identifier"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["kind", "id"],
+                condition=models.Q(allocated_at__isnull=True),
+                name="reserved_identifier_free_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.kind} - {self.value}"
+
+    @classmethod
+    def allocate(cls, kind: str) -> Optional[str]:
+        table = cls._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET allocated_at = NOW() "
+                f"WHERE id = (SELECT id FROM {table} "
+                "WHERE kind = %s AND allocated_at IS NULL "
+                "ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED) "
+                "RETURNING value",
+                [kind],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def reserve(cls, kind: str, values: list[str]) -> None:
+        cls.objects.bulk_create(
+            [cls(kind=kind, value=value) for value in values],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def available(cls, kind: str) -> int:
+        return cls.objects.filter(kind=kind, allocated_at__isnull=True).count()
@@ -0,0 +1,51 @@
+import json
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Admin paginator that counts large tables from planner statistics.
+
+    Unfiltered changelists read ``pg_class.reltuples`` and filtered ones read
+    the row estimate from ``EXPLAIN``. Only estimates under
+    ``exact_count_threshold`` fall back to a real ``COUNT(*)``, so totals on
+    big tables are approximate and the last page can come back short.
+    """
+
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self.estimated_count()
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    def estimated_count(self) -> Optional[int]:
+        queryset = self.object_list
+        if not hasattr(queryset, "query"):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # Tables that were never analysed report -1.
+                return row[0] if row and row[0] >= 0 else None
+
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
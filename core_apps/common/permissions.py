@@ -2,29 +2,39 @@ from rest_framework import permissions
 from rest_framework.request import Request
 from rest_framework.views import View
 
+from core_apps.user_auth.tokens import ROLE_CLAIM
+
+
+def get_request_role(request: Request):
+    # The role claim is signed into the access token, so reading it here
+    # avoids touching the user row. Older tokens fall back to the user.
+    token = request.auth
+    if token is not None and hasattr(token, "get"):
+        role = token.get(ROLE_CLAIM)
+        if role is not None:
+            return role
+    return getattr(request.user, "role", None)
+
 
 class IsAccountExecutive(permissions.BasePermission):
     def has_permission(self, request: Request, view: View) -> bool:
         is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        user_role = request.user.role == "account_executive"
+        user_role = get_request_role(request) == "account_executive"
 
-        return is_authenticated and has_role_attr and user_role
+        return is_authenticated and user_role
 
 
 class IsTeller(permissions.BasePermission):
     def has_permission(self, request: Request, view: View) -> bool:
         is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        user_role = request.user.role == "teller"
+        user_role = get_request_role(request) == "teller"
 
-        return is_authenticated and has_role_attr and user_role
+        return is_authenticated and user_role
 
 
 class IsBranchManager(permissions.BasePermission):
     def has_permission(self, request: Request, view: View) -> bool:
         is_authenticated = request.user.is_authenticated
-        has_role_attr = hasattr(request.user, "role")
-        user_role = request.user.role == "branch_manager"
+        user_role = get_request_role(request) == "branch_manager"
 
-        return is_authenticated and has_role_attr and user_role
+        return is_authenticated and user_role
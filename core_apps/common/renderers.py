@@ -1,8 +1,26 @@
 import json
+from decimal import Decimal
 from typing import Any, Optional, Union
+from django.conf import settings
+from django.utils.functional import Promise
 from django.utils.translation import gettext_lazy as _
 from rest_framework.renderers import JSONRenderer
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _orjson_default(obj: Any) -> str:
+    # Decimals keep their exact digits, the same as the str() the
+    # serializers apply, and lazy translations render as plain text.
+    if isinstance(obj, (Decimal, Promise)):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
 
 class GenericJSONRenderer(JSONRenderer):
     charset = "utf-8"
@@ -33,6 +51,24 @@ class GenericJSONRenderer(JSONRenderer):
         if errors:
             return super(GenericJSONRenderer, self).render(data)
 
+        if orjson is not None and settings.FAST_JSON_RENDERER:
+            return self.render_fast(status_code, object_label, data)
+
         return json.dumps({"status_code": status_code, object_label: data}).encode(
             self.charset
         )
+
+    def render_fast(self, status_code: int, object_label: str, data: Any) -> bytes:
+        # The envelope is written with the same separators json.dumps uses, so
+        # it stays byte-identical and only the payload is encoded by orjson.
+        return b"".join(
+            (
+                b'{"status_code": ',
+                str(status_code).encode(self.charset),
+                b", ",
+                json.dumps(object_label).encode(self.charset),
+                b": ",
+                orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS),
+                b"}",
+            )
+        )
@@ -0,0 +1,13 @@
+from celery import shared_task
+from django.conf import settings
+from loguru import logger
+
+from .view_counter import flush_pending_views
+
+
+@shared_task(name="flush_content_views")
+def flush_content_views_task() -> int:
+    flushed = flush_pending_views(settings.CONTENT_VIEW_FLUSH_BATCH_SIZE)
+    if flushed:
+        logger.info(f"Flushed {flushed} content views")
+    return flushed
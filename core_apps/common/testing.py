@@ -0,0 +1,20 @@
+from typing import Any
+
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def create_user(index: int, **fields: Any) -> User:
+    """Create a customer whose unique fields are derived from ``index``."""
+    fields = {
+        "username": f"DB-USER{index:05d}",
+        "email": f"customer{index}@example.com",
+        "first_name": "Jane",
+        "last_name": f"Doe {index}",
+        "id_no": 1000 + index,
+        "security_question": User.SecurityQuestions.FAVORITE_COLOR,
+        "security_answer": "blue",
+        **fields,
+    }
+    return User.objects.create(**fields)
@@ -1,3 +1,346 @@
-from django.test import TestCase
+import json
+import time
+import unittest
+import uuid
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy as _
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from . import renderers, view_counter
+from .flow_state import transfer_state, withdrawal_state
+from .idempotency import IDEMPOTENCY_HEADER, idempotent
+from .models import ContentView
+from .paginators import EstimatedCountPaginator
+from .renderers import GenericJSONRenderer
+from .testing import create_user
+from .user_cache import _LocalSnapshotCache, _snapshot_key, get_cached_user
+
+User = get_user_model()
+
+
+class CountingView(APIView):
+    calls = 0
+    status_code = status.HTTP_201_CREATED
+
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        type(self).calls += 1
+        return Response({"call": type(self).calls}, status=self.status_code)
+
+
+class FailingView(CountingView):
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.user = create_user(1)
+        self.factory = APIRequestFactory()
+        self.key = uuid.uuid4().hex
+        CountingView.calls = 0
+        FailingView.calls = 0
+
+    def post(self, view_class, data, key=None):
+        headers = {IDEMPOTENCY_HEADER: key or self.key}
+        request = self.factory.post("/", data, format="json", headers=headers)
+        force_authenticate(request, user=self.user)
+        return view_class.as_view()(request)
+
+    def test_replay_returns_the_stored_response_without_running_again(self):
+        first = self.post(CountingView, {"amount": "10.00"})
+        replay = self.post(CountingView, {"amount": "10.00"})
+
+        self.assertEqual(CountingView.calls, 1)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+
+    def test_reusing_a_key_with_a_different_body_is_rejected(self):
+        self.post(CountingView, {"amount": "10.00"})
+        response = self.post(CountingView, {"amount": "99.00"})
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(CountingView.calls, 1)
+
+    def test_distinct_keys_run_separately(self):
+        self.post(CountingView, {"amount": "10.00"})
+        self.post(CountingView, {"amount": "10.00"}, key=uuid.uuid4().hex)
+
+        self.assertEqual(CountingView.calls, 2)
+
+    def test_server_errors_are_not_stored(self):
+        self.post(FailingView, {"amount": "10.00"})
+        response = self.post(FailingView, {"amount": "10.00"})
+
+        self.assertEqual(FailingView.calls, 2)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+
+
+class GenericJSONRendererTests(SimpleTestCase):
+    def render(self, data, status_code=status.HTTP_200_OK):
+        context = {"response": Response(status=status_code)}
+        return GenericJSONRenderer().render(data, renderer_context=context)
+
+    @unittest.skipIf(renderers.orjson is None, "orjson is not installed")
+    def test_fast_output_decodes_like_the_json_module(self):
+        data = {
+            "id": "a1b2",
+            "name": "Zoë",
+            "balance": "1500.25",
+            "tags": ["savings", None, True, 3],
+        }
+
+        with override_settings(FAST_JSON_RENDERER=True):
+            fast = self.render(data)
+        with override_settings(FAST_JSON_RENDERER=False):
+            slow = self.render(data)
+
+        self.assertEqual(json.loads(fast), json.loads(slow))
+        self.assertTrue(fast.startswith(b'{"status_code": 200, "object": '))
+
+    @unittest.skipIf(renderers.orjson is None, "orjson is not installed")
+    @override_settings(FAST_JSON_RENDERER=True)
+    def test_fast_path_keeps_decimals_and_lazy_text_as_strings(self):
+        rendered = json.loads(
+            self.render({"amount": Decimal("10.10"), "label": _("Active")})
+        )
+
+        self.assertEqual(rendered["object"], {"amount": "10.10", "label": "Active"})
+
+    def test_errors_are_not_wrapped(self):
+        rendered = json.loads(
+            self.render({"errors": ["bad"]}, status.HTTP_400_BAD_REQUEST)
+        )
+
+        self.assertEqual(rendered, {"errors": ["bad"]})
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.viewed = create_user(1)
+        self.viewer = create_user(2)
+        target = view_counter._target(self.viewed)
+        connection = get_redis_connection("default")
+        self.addCleanup(connection.srem, view_counter.DIRTY_KEY, target)
+        self.addCleanup(
+            connection.delete,
+            view_counter._unique_key(target),
+            view_counter._pending_key(target),
+            view_counter._seeded_key(target),
+        )
+
+    def views(self):
+        return ContentView.objects.filter(object_id=self.viewed.pk)
+
+    def test_flush_stores_one_row_per_viewer(self):
+        view_counter.record_view(self.viewed, None, "10.0.0.1")
+        view_counter.record_view(self.viewed, self.viewer.pk, None)
+        view_counter.record_view(self.viewed, None, "10.0.0.1")
+
+        view_counter.flush_pending_views(batch_size=10)
+
+        self.assertEqual(self.views().count(), 2)
+        self.assertEqual(view_counter.get_view_count(self.viewed), 2)
+
+    def test_repeat_views_update_the_row_with_null_columns(self):
+        view_counter.record_view(self.viewed, None, "10.0.0.1")
+        view_counter.flush_pending_views(batch_size=10)
+        first_seen = self.views().get().last_viewed
+
+        view_counter.record_view(self.viewed, None, "10.0.0.1")
+        view_counter.flush_pending_views(batch_size=10)
+
+        view = self.views().get()
+        self.assertIsNone(view.user_id)
+        self.assertGreater(view.last_viewed, first_seen)
+
+    def test_failed_flush_keeps_the_pending_views(self):
+        view_counter.record_view(self.viewed, self.viewer.pk, "10.0.0.1")
+
+        with mock.patch.object(
+            ContentView.objects, "bulk_create", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                view_counter.flush_pending_views(batch_size=10)
+
+        view_counter.flush_pending_views(batch_size=10)
+
+        self.assertEqual(self.views().count(), 1)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for index in range(3):
+            create_user(index)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}")
+
+    def test_unfiltered_estimate_reads_table_statistics(self):
+        paginator = EstimatedCountPaginator(User.objects.all(), 10)
+
+        self.assertEqual(paginator.estimated_count(), 3)
+
+    def test_filtered_estimate_reads_the_query_plan(self):
+        queryset = User.objects.filter(first_name="Jane")
+
+        estimate = EstimatedCountPaginator(queryset, 10).estimated_count()
+
+        self.assertIsInstance(estimate, int)
+        self.assertGreaterEqual(estimate, 1)
+
+    def test_small_estimates_fall_back_to_an_exact_count(self):
+        paginator = EstimatedCountPaginator(User.objects.all(), 10)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 3)
+
+        self.assertTrue(any("COUNT(*)" in query["sql"] for query in queries))
+
+    def test_large_estimates_skip_the_exact_count(self):
+        paginator = EstimatedCountPaginator(User.objects.all(), 10)
+
+        with (
+            mock.patch.object(paginator, "estimated_count", return_value=250000),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            self.assertEqual(paginator.count, 250000)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(paginator.num_pages, 25000)
+
+    def test_plain_lists_are_counted_exactly(self):
+        paginator = EstimatedCountPaginator(list(range(25)), 10)
+
+        self.assertIsNone(paginator.estimated_count())
+        self.assertEqual(paginator.count, 25)
+
+
+class FlowStateStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.connection = get_redis_connection("default")
+        for store in (transfer_state, withdrawal_state):
+            self.addCleanup(store.delete, self.user_id)
+
+    def expire_now(self):
+        self.connection.pexpire(transfer_state._key(self.user_id), 1)
+        time.sleep(0.01)
+
+    def test_state_round_trips(self):
+        data = {
+            "account_number": "1234567010000008",
+            "amount": "25.00",
+            "entries": [{"account_number": "1234567010000008", "amount": "5.00"}],
+        }
+        transfer_state.set(self.user_id, data)
+
+        self.assertEqual(transfer_state.get(self.user_id), data)
+        self.assertLessEqual(
+            self.connection.ttl(transfer_state._key(self.user_id)),
+            settings.FLOW_STATE_TTL.total_seconds(),
+        )
+
+    def test_new_state_replaces_every_old_field(self):
+        transfer_state.set(self.user_id, {"amount": "25.00", "description": "rent"})
+        transfer_state.set(self.user_id, {"amount": "10.00"})
+
+        self.assertEqual(transfer_state.get(self.user_id), {"amount": "10.00"})
+
+    def test_state_is_scoped_to_its_user_and_flow(self):
+        transfer_state.set(self.user_id, {"amount": "25.00"})
+
+        self.assertIsNone(transfer_state.get(uuid.uuid4()))
+        self.assertIsNone(withdrawal_state.get(self.user_id))
+
+    def test_expired_state_is_gone(self):
+        transfer_state.set(self.user_id, {"amount": "25.00"})
+        self.expire_now()
+
+        self.assertIsNone(transfer_state.get(self.user_id))
+        self.assertFalse(transfer_state.touch(self.user_id))
+
+    def test_touch_restarts_the_clock(self):
+        transfer_state.set(self.user_id, {"amount": "25.00"})
+        key = transfer_state._key(self.user_id)
+        self.connection.expire(key, 1)
+
+        self.assertTrue(transfer_state.touch(self.user_id))
+        self.assertGreater(self.connection.ttl(key), 1)
+
+    def test_consumed_state_cannot_be_replayed(self):
+        transfer_state.set(self.user_id, {"amount": "25.00"})
+        transfer_state.delete(self.user_id)
+
+        self.assertIsNone(transfer_state.get(self.user_id))
+        self.assertFalse(transfer_state.touch(self.user_id))
+
+
+class UserSnapshotCacheTests(TestCase):
+    def setUp(self):
+        self.user = create_user(1)
+
+    def test_second_lookup_is_served_from_the_cache(self):
+        first = get_cached_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            second = get_cached_user(self.user.pk)
+
+        self.assertEqual(first.pk, self.user.pk)
+        self.assertEqual(second.email, self.user.email)
+        self.assertEqual(second.role, self.user.role)
+
+    def test_unknown_user_is_not_cached(self):
+        user_id = uuid.uuid4()
+
+        self.assertIsNone(get_cached_user(user_id))
+        self.assertIsNone(cache.get(_snapshot_key(user_id)))
+
+    def test_saving_the_user_invalidates_the_snapshot(self):
+        get_cached_user(self.user.pk)
+        self.user.role = User.RoleChoices.TELLER
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.save()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(cache.get(_snapshot_key(self.user.pk)))
+        self.assertEqual(get_cached_user(self.user.pk).role, User.RoleChoices.TELLER)
+
+
+@override_settings(USER_SNAPSHOT_LOCAL_SIZE=2, USER_SNAPSHOT_LOCAL_TTL=5)
+class LocalSnapshotCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.snapshots = _LocalSnapshotCache()
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.snapshots.set("a", {"id": "a"})
+        self.snapshots.set("b", {"id": "b"})
+        self.snapshots.get("a")
+        self.snapshots.set("c", {"id": "c"})
+
+        self.assertEqual(self.snapshots.get("a"), {"id": "a"})
+        self.assertIsNone(self.snapshots.get("b"))
+        self.assertEqual(self.snapshots.get("c"), {"id": "c"})
+
+    @mock.patch("core_apps.common.user_cache.time.monotonic")
+    def test_entry_expires_after_the_ttl(self, monotonic):
+        monotonic.return_value = 100
+        self.snapshots.set("a", {"id": "a"})
+
+        monotonic.return_value = 105
+        self.assertEqual(self.snapshots.get("a"), {"id": "a"})
+
+        monotonic.return_value = 106
+        self.assertIsNone(self.snapshots.get("a"))
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+SNAPSHOT_FIELDS = (
+    "id",
+    "email",
+    "role",
+    "account_status",
+    "is_active",
+    "permissions_version",
+)
+
+
+class _LocalSnapshotCache:
+    """Bounded LRU of user snapshots kept in the current process.
+
+    Entries live for ``USER_SNAPSHOT_LOCAL_TTL`` seconds so that a save
+    made in another process is picked up shortly after Redis is cleared.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, snapshot = entry
+            if time.monotonic() - stored_at > settings.USER_SNAPSHOT_LOCAL_TTL:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def set(self, key: str, snapshot: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.USER_SNAPSHOT_LOCAL_SIZE:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_local_snapshots = _LocalSnapshotCache()
+
+
+def _snapshot_key(user_id: Any) -> str:
+    return f"user_snapshot:{user_id}"
+
+
+def _build_user(snapshot: dict[str, Any]):
+    # A real User instance with every other column deferred, so it can be
+    # assigned to foreign keys and lazily loads anything outside the snapshot.
+    user_model = get_user_model()
+    field_names = list(snapshot)
+    values = [
+        snapshot[field.attname]
+        for field in user_model._meta.concrete_fields
+        if field.attname in snapshot
+    ]
+    return user_model.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+
+def get_cached_user(user_id: Any):
+    key = _snapshot_key(user_id)
+    snapshot = _local_snapshots.get(key)
+    if snapshot is None:
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = (
+                get_user_model()
+                .objects.filter(pk=user_id)
+                .values(*SNAPSHOT_FIELDS)
+                .first()
+            )
+            if snapshot is None:
+                return None
+            cache.set(key, snapshot, settings.USER_SNAPSHOT_TTL)
+        _local_snapshots.set(key, snapshot)
+    return _build_user(snapshot)
+
+
+def _delete_user_snapshot(key: str) -> None:
+    _local_snapshots.delete(key)
+    cache.delete(key)
+
+
+def invalidate_user_snapshot(user_id: Any) -> None:
+    # Cleared again after commit so a request that re-cached the old row
+    # while the transaction was open does not keep it around.
+    key = _snapshot_key(user_id)
+    _delete_user_snapshot(key)
+    transaction.on_commit(partial(_delete_user_snapshot, key))
@@ -0,0 +1,128 @@
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .models import ContentView
+
+DIRTY_KEY = "content_views:dirty"
+
+# Clears the viewers a flush has written, unless they were seen again since
+# it read them, and drops the target from the dirty set once nothing is left.
+# Nothing is removed before the rows are stored, so a failed flush loses no
+# views and the next run picks them up again.
+ACK_PENDING_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    if redis.call("HGET", KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        redis.call("HDEL", KEYS[1], ARGV[i])
+    end
+end
+if redis.call("HLEN", KEYS[1]) == 0 then
+    redis.call("SREM", KEYS[2], ARGV[1])
+end
+"""
+
+
+def _target(content_object: Any) -> str:
+    opts = content_object._meta
+    return f"{opts.app_label}.{opts.model_name}:{content_object.pk}"
+
+
+def _unique_key(target: str) -> str:
+    return f"content_views:unique:{target}"
+
+
+def _pending_key(target: str) -> str:
+    return f"content_views:pending:{target}"
+
+
+def _seeded_key(target: str) -> str:
+    return f"content_views:seeded:{target}"
+
+
+def _viewer(user_id: Any, viewer_ip: Optional[str]) -> str:
+    return f"{user_id or ''}|{viewer_ip or ''}"
+
+
+def record_view(content_object: Any, user_id: Any, viewer_ip: Optional[str]) -> None:
+    target = _target(content_object)
+    viewer = _viewer(user_id, viewer_ip)
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    pipeline.pfadd(_unique_key(target), viewer)
+    pipeline.hset(_pending_key(target), viewer, timezone.now().isoformat())
+    pipeline.sadd(DIRTY_KEY, target)
+    pipeline.execute()
+
+
+def get_view_count(content_object: Any) -> int:
+    target = _target(content_object)
+    connection = get_redis_connection("default")
+
+    # Viewers stored before the counter existed are folded into the
+    # HyperLogLog once per object, the only time this reads Postgres.
+    if connection.set(_seeded_key(target), 1, nx=True):
+        viewers = [
+            _viewer(user_id, viewer_ip)
+            for user_id, viewer_ip in ContentView.objects.filter(
+                content_type=ContentType.objects.get_for_model(content_object),
+                object_id=content_object.pk,
+            ).values_list("user_id", "viewer_ip")
+        ]
+        if viewers:
+            connection.pfadd(_unique_key(target), *viewers)
+
+    return connection.pfcount(_unique_key(target))
+
+
+def flush_pending_views(batch_size: int) -> int:
+    connection = get_redis_connection("default")
+    ack_pending = connection.register_script(ACK_PENDING_SCRIPT)
+    flushed = 0
+
+    while True:
+        targets = [
+            target.decode() for target in connection.srandmember(DIRTY_KEY, batch_size)
+        ]
+        if not targets:
+            return flushed
+
+        pipeline = connection.pipeline(transaction=False)
+        for target in targets:
+            pipeline.hgetall(_pending_key(target))
+        pending_by_target = dict(zip(targets, pipeline.execute()))
+
+        views = []
+        for target, pending in pending_by_target.items():
+            label, object_id = target.split(":", 1)
+            app_label, model_name = label.split(".", 1)
+            content_type = ContentType.objects.get_by_natural_key(app_label, model_name)
+
+            for viewer, last_viewed in pending.items():
+                user_id, viewer_ip = viewer.decode().split("|", 1)
+                views.append(
+                    ContentView(
+                        id=uuid.uuid4(),
+                        content_type=content_type,
+                        object_id=object_id,
+                        user_id=user_id or None,
+                        viewer_ip=viewer_ip or None,
+                        last_viewed=datetime.fromisoformat(last_viewed.decode()),
+                    )
+                )
+
+        ContentView.objects.bulk_create(
+            views,
+            update_conflicts=True,
+            unique_fields=["content_type", "object_id", "user", "viewer_ip"],
+            update_fields=["last_viewed", "updated_at"],
+        )
+        flushed += len(views)
+
+        for target, pending in pending_by_target.items():
+            ack_pending(
+                keys=[_pending_key(target), DIRTY_KEY],
+                args=[target, *(item for pair in pending.items() for item in pair)],
+            )
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
+from core_apps.common.paginators import EstimatedCountPaginator
 from .models import User
 from .forms import UserChangeForm, UserCreationForm
 
@@ -20,7 +21,11 @@ class CustomUserAdmin(UserAdmin):
         "is_active",
         "role",
     ]
-    list_filter = ["email", "is_staff", "is_active", "role"]
+    # Filtering on email listed every distinct address, so it is left to
+    # search instead.
+    list_filter = ["is_staff", "is_active", "role"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (
             _("Login Credentials"),
@@ -87,3 +92,16 @@ class CustomUserAdmin(UserAdmin):
     )
     search_fields = ["email", "username", "first_name", "last_name"]
     ordering = ["email"]
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        # Bank account verifiers are picked through autocomplete, which
+        # should only offer staff like the old dropdown did.
+        if (
+            request.GET.get("model_name") == "bankaccount"
+            and request.GET.get("field_name") == "verified_by"
+        ):
+            queryset = queryset.filter(is_staff=True)
+        return queryset, may_have_duplicates
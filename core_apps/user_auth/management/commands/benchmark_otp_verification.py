@@ -0,0 +1,120 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core_apps.user_auth.models import User
+from core_apps.user_auth.otp import LOGIN_OTP, otp_store
+
+USER_TABLE = User._meta.db_table
+
+CREATE_USERS_SQL = f"""
+INSERT INTO {USER_TABLE} (
+    id, password, is_superuser, username, first_name, last_name, email,
+    is_staff, is_active, date_joined, security_question, security_answer,
+    id_no, account_status, role, failed_login_attempts
+)
+SELECT gen_random_uuid(), '!', false, 'OTPB' || lpad(n::text, 8, '0'),
+    'Bench', 'User ' || n, 'otpbench' || n || '@example.com', false, true,
+    NOW(), 'maiden_name', 'bench', 800000000 + n, 'active', 'customer', 0
+FROM generate_series(%(start)s, %(stop)s) AS n
+ON CONFLICT DO NOTHING
+"""
+
+COUNT_USERS_SQL = f"SELECT count(*) FROM {USER_TABLE} WHERE username LIKE 'OTPB%%'"
+
+DELETE_USERS_SQL = f"DELETE FROM {USER_TABLE} WHERE username LIKE 'OTPB%%'"
+
+SAMPLE_USERS_SQL = f"""
+SELECT id FROM {USER_TABLE} TABLESAMPLE SYSTEM (1)
+WHERE username LIKE 'OTPB%%'
+LIMIT %(limit)s
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Grow a synthetic users table through several sizes and report login "
+        "OTP verification latency for the challenge id lookup"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000, 1_000_000, 10_000_000],
+        )
+        parser.add_argument("--batch-size", type=int, default=1_000_000)
+        parser.add_argument("--samples", type=int, default=200)
+        parser.add_argument("--output", help="Write the markdown report to a file")
+        parser.add_argument(
+            "--cleanup",
+            action="store_true",
+            help="Delete the generated users when the run ends, even if it fails",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            self.run(options)
+        finally:
+            if options["cleanup"]:
+                self.cleanup()
+
+    def run(self, options):
+        lines = [
+            "# Login OTP verification benchmark",
+            "",
+            f"Samples per size: {options['samples']}",
+            "",
+            "| Users | p50 (ms) | p95 (ms) | p99 (ms) |",
+            "| --- | --- | --- | --- |",
+        ]
+
+        for size in sorted(options["sizes"]):
+            self.grow(size, options["batch_size"])
+            user_ids = self.sample_users(options["samples"])
+            timings = [self.challenge_lookup(user_id) for user_id in user_ids]
+            percentiles = statistics.quantiles(timings, n=100)
+            lines.append(
+                f"| {size} | {percentiles[49]:.2f} | "
+                f"{percentiles[94]:.2f} | {percentiles[98]:.2f} |"
+            )
+            self.stdout.write(f"Measured {size} users")
+
+        report = "\n".join(lines) + "\n"
+        self.stdout.write(report)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+
+    def grow(self, size, batch_size):
+        with connection.cursor() as cursor:
+            cursor.execute(COUNT_USERS_SQL)
+            current = cursor.fetchone()[0]
+            while current < size:
+                stop = min(current + batch_size, size)
+                cursor.execute(CREATE_USERS_SQL, {"start": current + 1, "stop": stop})
+                current = stop
+                self.stdout.write(f"Generated {current} users")
+            cursor.execute(f"ANALYZE {USER_TABLE}")
+
+    def cleanup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_USERS_SQL)
+            self.stdout.write(f"Deleted {cursor.rowcount} generated users")
+
+    def sample_users(self, samples):
+        with connection.cursor() as cursor:
+            cursor.execute(SAMPLE_USERS_SQL, {"limit": samples})
+            user_ids = [row[0] for row in cursor.fetchall()]
+        return [random.choice(user_ids) for _ in range(samples)]
+
+    def challenge_lookup(self, user_id):
+        challenge_id, otp = otp_store.issue_challenge(LOGIN_OTP, user_id)
+        started = time.perf_counter()
+        redeemed_id, _ = otp_store.redeem_challenge(LOGIN_OTP, challenge_id, otp)
+        User.objects.filter(pk=redeemed_id).first()
+        return (time.perf_counter() - started) * 1000
@@ -1,19 +1,33 @@
 import random
 import string
+from functools import lru_cache
 from os import getenv
 from typing import Optional, Any
 
+from django.apps import apps
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import UserManager as DjangoUserManager
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 
+from core_apps.common.user_cache import invalidate_user_snapshot
 
-def generate_username() -> str:
+
+USERNAME_POOL_KIND = "username"
+
+
+@lru_cache(maxsize=None)
+def get_username_prefix() -> str:
     bank_name = getenv("BANK_NAME")
     words = bank_name.split()
-    prefix = "".join([word[0] for word in words]).upper()
+    return "".join([word[0] for word in words]).upper()
+
+
+def generate_username() -> str:
+    prefix = get_username_prefix()
     remaining_length = 12 - len(prefix) - 1
     random_chars = "".join(
         random.choices(string.ascii_uppercase + string.digits, k=remaining_length)
@@ -29,7 +43,48 @@ def validate_email_address(email: str) -> None:
         raise ValidationError(_("Enter a valid email address."))
 
 
-class UserManager(DjangoUserManager):
+class UserQuerySet(models.QuerySet):
+    def update_permissions(self, **fields: Any) -> int:
+        """Bulk-update users and return how many had their claims changed.
+
+        ``update()`` skips ``User.save``, so this bumps ``permissions_version``
+        itself and drops the cached snapshots, but only for rows whose role or
+        status claims actually change. Any other fields are written to every
+        row without touching the version.
+        """
+        claims = {
+            field: fields.pop(field)
+            for field in self.model.PERMISSION_FIELDS
+            if field in fields
+        }
+        with transaction.atomic(using=self.db):
+            user_ids = (
+                list(self.exclude(**claims).values_list("pk", flat=True))
+                if claims
+                else []
+            )
+            if fields:
+                self.update(**fields)
+            updated = self.model._default_manager.filter(pk__in=user_ids).update(
+                permissions_version=F("permissions_version") + 1, **claims
+            )
+        for user_id in user_ids:
+            invalidate_user_snapshot(user_id)
+        return updated
+
+
+class UserManager(DjangoUserManager.from_queryset(UserQuerySet)):
+    def allocate_username(self) -> str:
+        reserved_identifier = apps.get_model("common", "ReservedIdentifier")
+        username = reserved_identifier.allocate(USERNAME_POOL_KIND)
+        if username:
+            return username
+
+        while True:
+            username = generate_username()
+            if not self.filter(username=username).exists():
+                return username
+
     def _create_user(self, email: str, password: str, **extra_fields: Any):
         if not email:
             raise ValueError(_("An email address must be provided."))
@@ -37,7 +92,7 @@ class UserManager(DjangoUserManager):
         if not password:
             raise ValueError(_("A password must be provided."))
 
-        username = generate_username()
+        username = self.allocate_username()
         email = self.normalize_email(email)
         validate_email_address(email)
 
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_auth", "0008_alter_user_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="permissions_version",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Permissions Version"
+            ),
+        ),
+    ]
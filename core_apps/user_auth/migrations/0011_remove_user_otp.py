@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 07:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_auth", "0010_alter_id_default"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="user",
+            name="otp",
+        ),
+        migrations.RemoveField(
+            model_name="user",
+            name="otp_expiry",
+        ),
+    ]
@@ -5,6 +5,8 @@ from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from core_apps.common.user_cache import invalidate_user_snapshot
+
 from .emails import send_account_blocked
 from .managers import UserManager
 
@@ -32,7 +34,7 @@ class User(AbstractUser):
         TELLER = "teller", _("Teller")
         BRANCH_MANAGER = "branch_manager", _("Branch Manager")
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4(), editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     username = models.CharField(_("Username"), max_length=12, unique=True)
     security_question = models.CharField(
         _("Security Question"), max_length=35, choices=SecurityQuestions.choices
@@ -59,8 +61,9 @@ class User(AbstractUser):
     )
     failed_login_attempts = models.PositiveSmallIntegerField(default=0)
     last_failed_login = models.DateTimeField(null=True, blank=True)
-    otp = models.CharField(_("OTP"), max_length=6, blank=True)
-    otp_expiry = models.DateTimeField(_("OTP Expiry Time"), null=True, blank=True)
+    permissions_version = models.PositiveIntegerField(
+        _("Permissions Version"), default=0, editable=False
+    )
 
     objects = UserManager()
     USERNAME_FIELD = "email"
@@ -72,40 +75,87 @@ class User(AbstractUser):
         "id_no",
     ]
 
-    def set_otp(self, otp: str) -> None:
-        self.otp = otp
-        self.otp_expiry = timezone.now() + settings.OTP_EXPIRATION
-        self.save()
-
-    def verify_otp(self, otp: str) -> bool:
-        if self.otp == otp and timezone.now() < self.otp_expiry:
-            self.otp = ""
-            self.otp_expiry = None
-            self.save()
-            return True
-        return False
+    PERMISSION_FIELDS = ("role", "account_status", "is_active")
+    LOCKOUT_FIELDS = ("failed_login_attempts", "last_failed_login", "account_status")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_permissions = instance._permission_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None) -> None:
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # Deferred fields load through here, so they join the snapshot with
+        # their database values instead of looking like changes.
+        loaded = getattr(self, "_loaded_permissions", {})
+        for field, value in self._permission_state().items():
+            if fields is None or field in fields:
+                loaded[field] = value
+        self._loaded_permissions = loaded
+
+    def _permission_state(self) -> dict:
+        deferred = self.get_deferred_fields()
+        return {
+            field: getattr(self, field)
+            for field in self.PERMISSION_FIELDS
+            if field not in deferred
+        }
+
+    def _changed_permissions(self, loaded: dict, update_fields=None) -> dict:
+        return {
+            field: value
+            for field, value in self._permission_state().items()
+            if (update_fields is None or field in update_fields)
+            and (field not in loaded or loaded[field] != value)
+        }
+
+    def save(self, *args, **kwargs) -> None:
+        # Tokens carry role and status claims, so changing either bumps the
+        # version and makes previously issued access tokens stale.
+        update_fields = kwargs.get("update_fields")
+        loaded = getattr(self, "_loaded_permissions", None)
+        tracked = not self._state.adding and loaded is not None
+        changed = self._changed_permissions(loaded, update_fields) if tracked else {}
+        if changed:
+            self.permissions_version += 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "permissions_version"}
+        super().save(*args, **kwargs)
+        if tracked:
+            loaded.update(changed)
+        else:
+            self._loaded_permissions = self._permission_state()
+        invalidate_user_snapshot(self.pk)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        deleted = super().delete(*args, **kwargs)
+        invalidate_user_snapshot(user_id)
+        return deleted
 
     def handle_failed_login_attempts(self) -> None:
         self.failed_login_attempts += 1
         self.last_failed_login = timezone.now()
-        if self.failed_login_attempts >= settings.LOGIN_ATTEMPTS:
+        blocked = self.failed_login_attempts >= settings.LOGIN_ATTEMPTS
+        if blocked:
             self.account_status = self.AccountStatus.BLOCKED
-            self.save()
+        self.save(update_fields=self.LOCKOUT_FIELDS)
+        if blocked:
             send_account_blocked(self)
-        self.save()
 
     def reset_failed_login_attempts(self) -> None:
         self.failed_login_attempts = 0
         self.last_failed_login = None
         self.account_status = self.AccountStatus.ACTIVE
-        self.save()
+        self.save(update_fields=self.LOCKOUT_FIELDS)
 
     def unlock_account(self) -> None:
         if self.account_status == self.AccountStatus.BLOCKED:
             self.account_status = self.AccountStatus.ACTIVE
             self.failed_login_attempts = 0
             self.last_failed_login = None
-            self.save()
+            self.save(update_fields=self.LOCKOUT_FIELDS)
 
     @property
     def is_blocked_out(self) -> bool:
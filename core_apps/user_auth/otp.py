@@ -0,0 +1,169 @@
+import hashlib
+import hmac
+import secrets
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+from .utils import generate_otp
+
+LOGIN_OTP = "login"
+TRANSFER_OTP = "transfer"
+BATCH_TRANSFER_OTP = "batch_transfer"
+
+# Deletes the stored digest when it matches, so a code can be redeemed once.
+# Wrong guesses are counted next to the digest and the code is burned once
+# they reach the limit, so it cannot be brute-forced within its lifetime.
+VERIFY_AND_DELETE_SCRIPT = """
+local digest = redis.call("HGET", KEYS[1], "digest")
+if not digest then
+    return 0
+end
+if digest == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+if redis.call("HINCRBY", KEYS[1], "attempts", 1) >= tonumber(ARGV[2]) then
+    redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Challenges carry the subject they were issued for, so redeeming one is a
+# single keyed lookup that hands back whose code it was. Failed guesses also
+# return the subject, so the caller can record them against the user, and
+# burn the challenge once they reach the limit.
+REDEEM_CHALLENGE_SCRIPT = """
+local stored = redis.call("HMGET", KEYS[1], "digest", "subject")
+if not stored[1] then
+    return false
+end
+if stored[1] == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    return {1, stored[2]}
+end
+if redis.call("HINCRBY", KEYS[1], "attempts", 1) >= tonumber(ARGV[2]) then
+    redis.call("DEL", KEYS[1])
+end
+return {0, stored[2]}
+"""
+
+
+class BaseOTPStore(ABC):
+    @staticmethod
+    def hash_otp(purpose: str, subject: Any, otp: str) -> str:
+        message = f"{purpose}:{subject}:{otp}".encode()
+        return hmac.new(
+            settings.SECRET_KEY.encode(), message, hashlib.sha256
+        ).hexdigest()
+
+    def issue(self, purpose: str, subject: Any) -> str:
+        otp = generate_otp()
+        self.set(purpose, subject, otp)
+        return otp
+
+    def issue_challenge(self, purpose: str, subject: Any) -> tuple[str, str]:
+        challenge_id = secrets.token_urlsafe(24)
+        otp = generate_otp()
+        self.set_challenge(purpose, challenge_id, subject, otp)
+        return challenge_id, otp
+
+    @abstractmethod
+    def set(self, purpose: str, subject: Any, otp: str) -> None: ...
+
+    @abstractmethod
+    def verify(self, purpose: str, subject: Any, otp: str) -> bool: ...
+
+    @abstractmethod
+    def discard(self, purpose: str, subject: Any) -> None: ...
+
+    @abstractmethod
+    def set_challenge(
+        self, purpose: str, challenge_id: str, subject: Any, otp: str
+    ) -> None: ...
+
+    @abstractmethod
+    def redeem_challenge(
+        self, purpose: str, challenge_id: str, otp: str
+    ) -> tuple[Optional[str], bool]:
+        """Return the challenge's subject and whether ``otp`` redeemed it.
+
+        The subject is ``None`` when the challenge is unknown or expired.
+        """
+
+
+class RedisOTPStore(BaseOTPStore):
+    def __init__(self) -> None:
+        self._verify_script = None
+        self._redeem_script = None
+
+    @staticmethod
+    def _key(purpose: str, subject: Any) -> str:
+        return f"otp:{purpose}:{subject}"
+
+    @staticmethod
+    def _challenge_key(purpose: str, challenge_id: str) -> str:
+        return f"otp:{purpose}:challenge:{challenge_id}"
+
+    def set(self, purpose: str, subject: Any, otp: str) -> None:
+        key = self._key(purpose, subject)
+        pipeline = get_redis_connection("default").pipeline(transaction=True)
+        pipeline.delete(key)
+        pipeline.hset(key, "digest", self.hash_otp(purpose, subject, otp))
+        pipeline.expire(key, int(settings.OTP_EXPIRATION.total_seconds()))
+        pipeline.execute()
+
+    def verify(self, purpose: str, subject: Any, otp: str) -> bool:
+        if not otp:
+            return False
+        if self._verify_script is None:
+            self._verify_script = get_redis_connection("default").register_script(
+                VERIFY_AND_DELETE_SCRIPT
+            )
+        return bool(
+            self._verify_script(
+                keys=[self._key(purpose, subject)],
+                args=[self.hash_otp(purpose, subject, otp), settings.OTP_MAX_ATTEMPTS],
+            )
+        )
+
+    def discard(self, purpose: str, subject: Any) -> None:
+        get_redis_connection("default").delete(self._key(purpose, subject))
+
+    def set_challenge(
+        self, purpose: str, challenge_id: str, subject: Any, otp: str
+    ) -> None:
+        key = self._challenge_key(purpose, challenge_id)
+        pipeline = get_redis_connection("default").pipeline(transaction=True)
+        pipeline.hset(
+            key,
+            mapping={
+                "digest": self.hash_otp(purpose, challenge_id, otp),
+                "subject": str(subject),
+            },
+        )
+        pipeline.expire(key, int(settings.OTP_EXPIRATION.total_seconds()))
+        pipeline.execute()
+
+    def redeem_challenge(
+        self, purpose: str, challenge_id: str, otp: str
+    ) -> tuple[Optional[str], bool]:
+        if not challenge_id or not otp:
+            return None, False
+        if self._redeem_script is None:
+            self._redeem_script = get_redis_connection("default").register_script(
+                REDEEM_CHALLENGE_SCRIPT
+            )
+        result = self._redeem_script(
+            keys=[self._challenge_key(purpose, challenge_id)],
+            args=[self.hash_otp(purpose, challenge_id, otp), settings.OTP_MAX_ATTEMPTS],
+        )
+        if not result:
+            return None, False
+        redeemed, subject = result
+        return subject.decode(), bool(redeemed)
+
+
+otp_store: BaseOTPStore = import_string(settings.OTP_STORE_BACKEND)()
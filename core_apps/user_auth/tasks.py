@@ -0,0 +1,27 @@
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from loguru import logger
+
+from core_apps.common.models import ReservedIdentifier
+
+from .managers import USERNAME_POOL_KIND, generate_username
+
+User = get_user_model()
+
+
+@shared_task(name="replenish_username_pool")
+def replenish_username_pool_task() -> int:
+    missing = settings.IDENTIFIER_POOL_SIZE - ReservedIdentifier.available(
+        USERNAME_POOL_KIND
+    )
+    if missing <= 0:
+        return 0
+
+    candidates = {generate_username() for _ in range(missing)}
+    taken = set(
+        User.objects.filter(username__in=candidates).values_list("username", flat=True)
+    )
+    ReservedIdentifier.reserve(USERNAME_POOL_KIND, list(candidates - taken))
+    logger.info(f"Reserved {len(candidates - taken)} usernames")
+    return len(candidates - taken)
@@ -1,3 +1,275 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core_apps.common.cookie_auth import CookieAuthentication
+from core_apps.common.testing import create_user
+
+from .otp import LOGIN_OTP, TRANSFER_OTP, RedisOTPStore, otp_store
+from .tokens import (
+    ACCOUNT_STATUS_CLAIM,
+    PERMISSIONS_VERSION_CLAIM,
+    ROLE_CLAIM,
+    CustomTokenRefreshSerializer,
+    tokens_for_user,
+)
+
+User = get_user_model()
+
+
+def wrong_code(otp: str) -> str:
+    return f"{(int(otp) + 1) % 1000000:06d}"
+
+
+@override_settings(OTP_MAX_ATTEMPTS=3)
+class RedisOTPStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.store = RedisOTPStore()
+        self.subject = uuid.uuid4()
+        self.addCleanup(self.store.discard, TRANSFER_OTP, self.subject)
+
+    def test_code_verifies_once(self):
+        otp = self.store.issue(TRANSFER_OTP, self.subject)
+
+        self.assertTrue(self.store.verify(TRANSFER_OTP, self.subject, otp))
+        self.assertFalse(self.store.verify(TRANSFER_OTP, self.subject, otp))
+
+    def test_wrong_code_keeps_the_real_code_valid(self):
+        otp = self.store.issue(TRANSFER_OTP, self.subject)
+
+        self.assertFalse(self.store.verify(TRANSFER_OTP, self.subject, wrong_code(otp)))
+        self.assertTrue(self.store.verify(TRANSFER_OTP, self.subject, otp))
+
+    def test_code_is_burned_after_too_many_wrong_guesses(self):
+        otp = self.store.issue(TRANSFER_OTP, self.subject)
+        for _ in range(3):
+            self.assertFalse(
+                self.store.verify(TRANSFER_OTP, self.subject, wrong_code(otp))
+            )
+
+        self.assertFalse(self.store.verify(TRANSFER_OTP, self.subject, otp))
+
+    def test_issuing_a_new_code_resets_the_attempts(self):
+        otp = self.store.issue(TRANSFER_OTP, self.subject)
+        for _ in range(2):
+            self.store.verify(TRANSFER_OTP, self.subject, wrong_code(otp))
+
+        otp = self.store.issue(TRANSFER_OTP, self.subject)
+        self.store.verify(TRANSFER_OTP, self.subject, wrong_code(otp))
+
+        self.assertTrue(self.store.verify(TRANSFER_OTP, self.subject, otp))
+
+    def test_challenge_redeems_once(self):
+        challenge_id, otp = self.store.issue_challenge(LOGIN_OTP, self.subject)
+
+        self.assertEqual(
+            self.store.redeem_challenge(LOGIN_OTP, challenge_id, otp),
+            (str(self.subject), True),
+        )
+        self.assertEqual(
+            self.store.redeem_challenge(LOGIN_OTP, challenge_id, otp), (None, False)
+        )
+
+    def test_wrong_challenge_code_reports_the_subject(self):
+        challenge_id, otp = self.store.issue_challenge(LOGIN_OTP, self.subject)
+
+        self.assertEqual(
+            self.store.redeem_challenge(LOGIN_OTP, challenge_id, wrong_code(otp)),
+            (str(self.subject), False),
+        )
+        self.assertEqual(
+            self.store.redeem_challenge(LOGIN_OTP, challenge_id, otp),
+            (str(self.subject), True),
+        )
+
+    def test_challenge_is_burned_after_too_many_wrong_guesses(self):
+        challenge_id, otp = self.store.issue_challenge(LOGIN_OTP, self.subject)
+        for _ in range(3):
+            self.store.redeem_challenge(LOGIN_OTP, challenge_id, wrong_code(otp))
+
+        self.assertEqual(
+            self.store.redeem_challenge(LOGIN_OTP, challenge_id, otp), (None, False)
+        )
+
+
+@override_settings(OTP_MAX_ATTEMPTS=3, LOGIN_ATTEMPTS=5)
+class OTPVerifyViewTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(1)
+        self.url = reverse("login_verify_otp")
+
+    def verify(self, challenge_id, otp):
+        return self.client.post(
+            self.url, {"challenge_id": challenge_id, "otp": otp}, format="json"
+        )
+
+    def test_valid_code_logs_in(self):
+        challenge_id, otp = otp_store.issue_challenge(LOGIN_OTP, self.user.pk)
+
+        response = self.verify(challenge_id, otp)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.cookies)
+
+    def test_wrong_code_counts_as_a_failed_login(self):
+        challenge_id, otp = otp_store.issue_challenge(LOGIN_OTP, self.user.pk)
+
+        response = self.verify(challenge_id, wrong_code(otp))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_login_attempts, 1)
+
+    def test_challenge_is_burned_after_too_many_wrong_guesses(self):
+        challenge_id, otp = otp_store.issue_challenge(LOGIN_OTP, self.user.pk)
+        for _ in range(3):
+            self.verify(challenge_id, wrong_code(otp))
+
+        response = self.verify(challenge_id, otp)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.failed_login_attempts, 3)
+
+
+class PermissionsVersionTests(TestCase):
+    def setUp(self):
+        self.user = create_user(1)
+
+    def test_role_change_bumps_the_version(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.role = User.RoleChoices.TELLER
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.permissions_version, 1)
+
+    def test_loading_a_deferred_field_is_not_a_change(self):
+        user = User.objects.only("id", "email").get(pk=self.user.pk)
+        self.assertEqual(user.role, User.RoleChoices.CUSTOMER)
+        user.first_name = "Janet"
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.permissions_version, 0)
+
+    def test_setting_a_deferred_field_bumps_the_version(self):
+        user = User.objects.only("id", "email").get(pk=self.user.pk)
+        user.account_status = User.AccountStatus.BLOCKED
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.permissions_version, 1)
+
+    def test_unrelated_update_fields_do_not_bump(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.failed_login_attempts = 1
+        user.save(update_fields=["failed_login_attempts"])
+
+        user.refresh_from_db()
+        self.assertEqual(user.permissions_version, 0)
+
+    def test_bulk_update_bumps_only_changed_users(self):
+        other = create_user(2)
+        User.objects.filter(pk=other.pk).update(
+            account_status=User.AccountStatus.BLOCKED
+        )
+
+        updated = User.objects.filter(
+            pk__in=[self.user.pk, other.pk]
+        ).update_permissions(account_status=User.AccountStatus.BLOCKED)
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(
+            dict(User.objects.values_list("pk", "permissions_version")),
+            {self.user.pk: 1, other.pk: 0},
+        )
+
+    def test_bulk_update_applies_other_fields_without_bumping(self):
+        blocked = create_user(2)
+        User.objects.filter(pk=self.user.pk).update(failed_login_attempts=2)
+        User.objects.filter(pk=blocked.pk).update(
+            account_status=User.AccountStatus.BLOCKED, failed_login_attempts=3
+        )
+
+        updated = User.objects.filter(
+            pk__in=[self.user.pk, blocked.pk]
+        ).update_permissions(
+            account_status=User.AccountStatus.ACTIVE, failed_login_attempts=0
+        )
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(
+            {
+                pk: (version, attempts)
+                for pk, version, attempts in User.objects.values_list(
+                    "pk", "permissions_version", "failed_login_attempts"
+                )
+            },
+            {self.user.pk: (0, 0), blocked.pk: (1, 0)},
+        )
+
+
+class TokenClaimTests(TestCase):
+    def setUp(self):
+        self.user = create_user(1)
+        self.refresh = tokens_for_user(self.user)
+
+    def refresh_tokens(self, refresh):
+        serializer = CustomTokenRefreshSerializer(data={"refresh": str(refresh)})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def change_role(self, role):
+        user = User.objects.get(pk=self.user.pk)
+        user.role = role
+        user.save()
+        return user
+
+    def test_tokens_carry_permission_claims(self):
+        access = self.refresh.access_token
+
+        self.assertEqual(access[ROLE_CLAIM], User.RoleChoices.CUSTOMER)
+        self.assertEqual(access[ACCOUNT_STATUS_CLAIM], User.AccountStatus.ACTIVE)
+        self.assertEqual(access[PERMISSIONS_VERSION_CLAIM], 0)
+
+    def test_outdated_access_token_is_rejected(self):
+        access = AccessToken(str(self.refresh.access_token))
+        self.change_role(User.RoleChoices.TELLER)
+
+        with self.assertRaises(AuthenticationFailed):
+            CookieAuthentication().get_user(access)
+
+    def test_refresh_issues_current_claims(self):
+        self.change_role(User.RoleChoices.TELLER)
+
+        access = AccessToken(self.refresh_tokens(self.refresh)["access"])
+
+        self.assertEqual(access[ROLE_CLAIM], User.RoleChoices.TELLER)
+        self.assertEqual(access[PERMISSIONS_VERSION_CLAIM], 1)
+        self.assertEqual(CookieAuthentication().get_user(access).pk, self.user.pk)
+
+    def test_refresh_rotates_the_refresh_token(self):
+        data = self.refresh_tokens(self.refresh)
+
+        self.assertIn("refresh", data)
+        self.assertNotEqual(data["refresh"], str(self.refresh))
+
+    def test_rotated_refresh_token_is_blacklisted(self):
+        self.refresh_tokens(self.refresh)
+
+        with self.assertRaises(TokenError):
+            self.refresh_tokens(self.refresh)
+
+    def test_inactive_user_cannot_refresh(self):
+        User.objects.filter(pk=self.user.pk).update_permissions(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.refresh_tokens(self.refresh)
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+
+User = get_user_model()
+
+ROLE_CLAIM = "role"
+ACCOUNT_STATUS_CLAIM = "account_status"
+PERMISSIONS_VERSION_CLAIM = "permissions_version"
+
+
+def add_permission_claims(token: Token, user) -> None:
+    token[ROLE_CLAIM] = user.role
+    token[ACCOUNT_STATUS_CLAIM] = user.account_status
+    token[PERMISSIONS_VERSION_CLAIM] = user.permissions_version
+
+
+def tokens_for_user(user) -> RefreshToken:
+    refresh = RefreshToken.for_user(user)
+    add_permission_claims(refresh, user)
+    return refresh
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = (
+            User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM])
+            .only("id", "is_active", "role", "account_status", "permissions_version")
+            .first()
+        )
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                _("No active account found for the given token."),
+                code="no_active_account",
+            )
+
+        # simplejwt handles rotation and blacklisting. Claims are then re-read
+        # so a role change reaches the new access token instead of being
+        # copied from the old refresh token.
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        add_permission_claims(access, user)
+        data["access"] = str(access)
+        return data
@@ -1,7 +1,6 @@
 from typing import Any, Optional
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 from djoser.views import TokenCreateView
 from djoser.views import User
 from loguru import logger
@@ -9,11 +8,11 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 
 from .emails import send_otp
-from .utils import generate_otp
+from .otp import LOGIN_OTP, otp_store
+from .tokens import CustomTokenRefreshSerializer, tokens_for_user
 
 User = get_user_model()
 
@@ -57,14 +56,17 @@ class CustomTokenCreateView(TokenCreateView):
             )
         user.reset_failed_login_attempts()
 
-        otp = generate_otp()
-        user.set_otp(otp)
+        challenge_id, otp = otp_store.issue_challenge(LOGIN_OTP, user.pk)
         send_otp(user.email, otp)
 
         logger.info(f"OTP sent to {user.email}")
 
         return Response(
-            {"success": "OTP sent to your email", "email": user.email},
+            {
+                "success": "OTP sent to your email",
+                "email": user.email,
+                "challenge_id": challenge_id,
+            },
             status=status.HTTP_200_OK,
         )
 
@@ -101,6 +103,8 @@ class CustomTokenCreateView(TokenCreateView):
 
 
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         refresh_token = request.COOKIES.get("refresh")
         if refresh_token:
@@ -139,14 +143,22 @@ class OTPVerifyView(APIView):
 
     def post(self, request: Request) -> Response:
         otp = request.data.get("otp")
+        challenge_id = request.data.get("challenge_id")
 
-        if not otp:
+        if not otp or not challenge_id:
             return Response(
-                {"error": "OTP is required."}, status=status.HTTP_400_BAD_REQUEST
+                {"error": "Challenge id and OTP are required."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = User.objects.filter(otp=otp, otp_expiry__gt=timezone.now()).first()
-        if not user:
+        user_id, redeemed = otp_store.redeem_challenge(
+            LOGIN_OTP, str(challenge_id), str(otp)
+        )
+        user = User.objects.filter(pk=user_id).first() if user_id else None
+        if user and not redeemed:
+            user.handle_failed_login_attempts()
+            logger.warning(f"Failed login OTP attempt for user: {user.email}")
+        if not (user and redeemed):
             return Response(
                 {"error": "Invalid or expired OTP."}, status=status.HTTP_400_BAD_REQUEST
             )
@@ -160,8 +172,7 @@ class OTPVerifyView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        user.verify_otp(otp)
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         access_token = str(refresh.access_token)
         refresh_token = str(refresh)
 
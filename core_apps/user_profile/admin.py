@@ -4,6 +4,7 @@ from django import forms
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+from core_apps.common.paginators import EstimatedCountPaginator
 from .models import NextOfKin, Profile
 
 
@@ -36,6 +37,9 @@ class ProfileAdmin(admin.ModelAdmin):
         "photo_preview",
     ]
     list_display_links = ["user"]
+    list_select_related = ["user"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = ["gender", "marital_status", "employment_status", "country"]
     search_fields = [
         "user__email",
@@ -113,7 +117,7 @@ class ProfileAdmin(admin.ModelAdmin):
         if obj.photo:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit:cover;"/>',
-                obj.photo.url,
+                obj.photo_thumbnail_url or obj.photo.url,
             )
         return "No Photo Yet"
 
@@ -128,6 +132,7 @@ class NextOfKinAdmin(admin.ModelAdmin):
         "profile",
         "is_primary",
     ]
+    list_select_related = ["profile__user"]
     list_filter = ["relationship", "is_primary"]
     search_fields = ["first_name", "last_name", "profile__user__email"]
 
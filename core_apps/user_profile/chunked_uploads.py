@@ -0,0 +1,149 @@
+import hashlib
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .uploads import upload_storage
+
+PART_SUFFIX = ".part"
+
+
+class ChunkOffsetMismatch(Exception):
+    def __init__(self, offset: int) -> None:
+        super().__init__(f"Expected a chunk at offset {offset}")
+        self.offset = offset
+
+
+class ChunkedUploadBusy(Exception):
+    pass
+
+
+def _key(upload_id: Any) -> str:
+    return f"chunked_upload:{upload_id}"
+
+
+def _lock_key(upload_id: Any) -> str:
+    return f"chunked_upload:{upload_id}:lock"
+
+
+@contextmanager
+def _upload_lock(connection, upload_id: Any):
+    # A short-lived lock keeps two requests for the same upload from
+    # touching its part file at the same time.
+    if not connection.set(_lock_key(upload_id), 1, nx=True, ex=60):
+        raise ChunkedUploadBusy()
+    try:
+        yield
+    finally:
+        connection.delete(_lock_key(upload_id))
+
+
+def create_upload(user_id: Any, profile_id: Any, field_name: str, size: int) -> dict:
+    upload_id = uuid.uuid4()
+    name = f"{profile_id}/{field_name}_{upload_id.hex}{PART_SUFFIX}"
+    name = upload_storage.save(name, ContentFile(b""))
+
+    upload = {
+        "user_id": str(user_id),
+        "profile_id": str(profile_id),
+        "field": field_name,
+        "size": size,
+        "offset": 0,
+        "name": name,
+    }
+    pipeline = get_redis_connection("default").pipeline(transaction=True)
+    pipeline.hset(_key(upload_id), mapping=upload)
+    pipeline.expire(_key(upload_id), settings.CHUNKED_UPLOAD_TTL)
+    pipeline.execute()
+    return {"upload_id": str(upload_id), **upload}
+
+
+def get_upload(upload_id: Any, user_id: Any) -> Optional[dict]:
+    stored = get_redis_connection("default").hgetall(_key(upload_id))
+    upload = {field.decode(): value.decode() for field, value in stored.items()}
+    if not upload or upload["user_id"] != str(user_id):
+        return None
+    upload["size"] = int(upload["size"])
+    upload["offset"] = int(upload["offset"])
+    upload["upload_id"] = str(upload_id)
+    return upload
+
+
+def write_chunk(upload: dict, offset: int, chunk: bytes) -> int:
+    """Append ``chunk`` at ``offset`` and return the new offset.
+
+    The offset must be exactly where the previous chunk ended, so a client
+    that lost a response can resume by asking for the current offset.
+    """
+    connection = get_redis_connection("default")
+    upload_id = upload["upload_id"]
+    with _upload_lock(connection, upload_id):
+        current = int(connection.hget(_key(upload_id), "offset") or 0)
+        if offset != current:
+            raise ChunkOffsetMismatch(current)
+
+        with open(upload_storage.path(upload["name"]), "r+b") as part:
+            part.seek(offset)
+            part.write(chunk)
+            part.truncate()
+
+        new_offset = offset + len(chunk)
+        pipeline = connection.pipeline(transaction=True)
+        pipeline.hset(_key(upload_id), "offset", new_offset)
+        pipeline.expire(_key(upload_id), settings.CHUNKED_UPLOAD_TTL)
+        pipeline.execute()
+        return new_offset
+
+
+def finish_upload(upload: dict) -> Optional[tuple[str, str]]:
+    """Seal a fully received upload and return its staged name and hash.
+
+    Returns ``None`` when a concurrent request already sealed it.
+    """
+    connection = get_redis_connection("default")
+    with _upload_lock(connection, upload["upload_id"]):
+        if not connection.exists(_key(upload["upload_id"])):
+            return None
+
+        digest = hashlib.sha256()
+        with upload_storage.open(upload["name"], "rb") as part:
+            for chunk in iter(lambda: part.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        name = upload["name"][: -len(PART_SUFFIX)]
+        os.replace(upload_storage.path(upload["name"]), upload_storage.path(name))
+        connection.delete(_key(upload["upload_id"]))
+        return name, digest.hexdigest()
+
+
+def discard_upload(upload: dict) -> None:
+    if upload_storage.exists(upload["name"]):
+        upload_storage.delete(upload["name"])
+    get_redis_connection("default").delete(_key(upload["upload_id"]))
+
+
+def purge_stale_parts() -> int:
+    cutoff = timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_TTL)
+    purged = 0
+    if not os.path.isdir(upload_storage.location):
+        return purged
+
+    directories, _ = upload_storage.listdir("")
+    for directory in directories:
+        _, files = upload_storage.listdir(directory)
+        for file_name in files:
+            name = f"{directory}/{file_name}"
+            if (
+                file_name.endswith(PART_SUFFIX)
+                and upload_storage.get_modified_time(name) < cutoff
+            ):
+                upload_storage.delete(name)
+                purged += 1
+    return purged
@@ -0,0 +1,35 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_TERM_PATTERN = re.compile(r"[\w@.+-]+")
+
+
+class ProfileSearchFilter(BaseFilterBackend):
+    """Ranked prefix search over the profile ``search_vector`` column.
+
+    Every term is matched as a prefix and all terms must match, so the
+    GIN index answers the query without scanning the profile table.
+    """
+
+    search_param = "search"
+
+    def build_query(self, search: str):
+        terms = SEARCH_TERM_PATTERN.findall(search)[:10]
+        if not terms:
+            return None
+        raw_query = " & ".join(f"'{term}':*" for term in terms)
+        return SearchQuery(raw_query, search_type="raw", config="simple")
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.build_query(request.query_params.get(self.search_param, ""))
+        if query is None:
+            return queryset
+
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "-created_at")
+        )
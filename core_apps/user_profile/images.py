@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import BinaryIO
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+
+@dataclass
+class ProcessedPhoto:
+    image: bytes
+    thumbnail: bytes
+    format: str
+
+
+def _encode(image: Image.Image, quality: int) -> bytes:
+    output_format = settings.PHOTO_OUTPUT_FORMAT
+    if output_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format=output_format, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def is_valid_photo(source: BinaryIO) -> bool:
+    # The same check Django's ImageField runs on multipart uploads, for
+    # photos that were assembled from chunks instead.
+    try:
+        with Image.open(source) as image:
+            image.verify()
+    except Exception:
+        return False
+    return True
+
+
+def preprocess_photo(source: BinaryIO) -> ProcessedPhoto:
+    """Normalise an uploaded photo before it leaves the server.
+
+    Phone cameras store rotation in EXIF, so it is applied to the pixels
+    first. The image is then bounded to ``PHOTO_MAX_DIMENSIONS``, re-encoded
+    as ``PHOTO_OUTPUT_FORMAT`` and paired with a small thumbnail.
+    """
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail(settings.PHOTO_MAX_DIMENSIONS, Image.Resampling.LANCZOS)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail(
+            settings.PHOTO_THUMBNAIL_DIMENSIONS, Image.Resampling.LANCZOS
+        )
+
+        return ProcessedPhoto(
+            image=_encode(image, settings.PHOTO_QUALITY),
+            thumbnail=_encode(thumbnail, settings.PHOTO_THUMBNAIL_QUALITY),
+            format=settings.PHOTO_OUTPUT_FORMAT.lower(),
+        )
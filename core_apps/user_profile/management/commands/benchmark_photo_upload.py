@@ -0,0 +1,124 @@
+import statistics
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from io import BytesIO
+
+import cloudinary
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from core_apps.user_profile.management.commands.fake_upload_server import (
+    build_handler,
+)
+from core_apps.user_profile.uploads import (
+    PHOTO_FIELDS,
+    discard_staged_photos,
+    stage_photo,
+    upload_staged_photo,
+    upload_staged_photos,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Upload staged profile photos to an in-process fake upload server and "
+        "compare sequential uploads with the thread pool pipeline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=20)
+        parser.add_argument("--width", type=int, default=4000)
+        parser.add_argument("--height", type=int, default=3000)
+        parser.add_argument("--latency", type=float, default=0.25)
+        parser.add_argument("--output", help="Write the markdown report to a file")
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), build_handler(options["latency"])
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        cloudinary.config(
+            cloud_name="benchmark",
+            api_key="benchmark",
+            api_secret="benchmark",
+            upload_prefix=f"http://{host}:{port}",
+        )
+
+        photo = self.build_photo(options["width"], options["height"])
+        lines = [
+            "# Photo upload benchmark",
+            "",
+            f"Photos per profile: {len(PHOTO_FIELDS)}, photo: "
+            f"{options['width']}x{options['height']} JPEG of {len(photo)} bytes, "
+            f"upload latency: {options['latency']}s, samples: {options['samples']}",
+            "",
+            "| Pipeline | p50 (ms) | p95 (ms) | max (ms) | bytes uploaded |",
+            "| --- | --- | --- | --- | --- |",
+        ]
+        try:
+            for label, upload in [
+                ("sequential originals (legacy)", self.upload_sequentially),
+                ("preprocessed, thread pool", upload_staged_photos),
+            ]:
+                timings = []
+                for sample in range(options["samples"]):
+                    photos = {
+                        field: stage_photo(
+                            f"benchmark-{sample}",
+                            field,
+                            ContentFile(photo, "bench.jpg"),
+                        )
+                        for field in PHOTO_FIELDS
+                    }
+                    started = time.perf_counter()
+                    results = upload(photos)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    discard_staged_photos(photos)
+                lines.append(
+                    f"| {label} | {statistics.median(timings):.1f} | "
+                    f"{statistics.quantiles(timings, n=20)[18]:.1f} | "
+                    f"{max(timings):.1f} | {self.uploaded_bytes(results)} |"
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        report = "\n".join(lines) + "\n"
+        self.stdout.write(report)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+
+    def build_photo(self, width, height):
+        # A gradient with coarse noise compresses like a camera photo rather
+        # than like a flat colour or random bytes.
+        image = Image.merge(
+            "RGB",
+            [
+                Image.linear_gradient("L").resize((width, height)),
+                Image.effect_noise((width // 8, height // 8), 64).resize(
+                    (width, height)
+                ),
+                Image.linear_gradient("L").rotate(90).resize((width, height)),
+            ],
+        )
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=95)
+        return buffer.getvalue()
+
+    def upload_sequentially(self, photos):
+        return {
+            field: {"image": upload_staged_photo(name), "thumbnail": None}
+            for field, name in photos.items()
+        }
+
+    def uploaded_bytes(self, results):
+        return sum(
+            response["bytes"]
+            for result in results.values()
+            for response in (result["image"], result["thumbnail"])
+            if response
+        )
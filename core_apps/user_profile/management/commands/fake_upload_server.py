@@ -0,0 +1,76 @@
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+def build_handler(latency: float):
+    class FakeUploadHandler(BaseHTTPRequestHandler):
+        # Answers Cloudinary upload calls with a plausible response after a
+        # fixed delay, standing in for the network round trip.
+        def do_POST(self):
+            remaining = int(self.headers.get("Content-Length", 0))
+            received = 0
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    break
+                received += len(chunk)
+                remaining -= len(chunk)
+            time.sleep(latency)
+
+            public_id = uuid.uuid4().hex
+            host = self.headers.get("Host", "localhost")
+            body = json.dumps(
+                {
+                    "public_id": public_id,
+                    "version": 1,
+                    "format": "jpg",
+                    "resource_type": "image",
+                    "bytes": received,
+                    "url": f"http://{host}/image/upload/v1/{public_id}.jpg",
+                    "secure_url": f"https://{host}/image/upload/v1/{public_id}.jpg",
+                }
+            ).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeUploadHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local HTTP server that mimics the Cloudinary upload API. Point "
+        "CLOUDINARY_UPLOAD_PREFIX at it to exercise the photo pipeline offline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--latency", type=float, default=0.25, help="Seconds per upload"
+        )
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(
+            (options["host"], options["port"]), build_handler(options["latency"])
+        )
+        self.stdout.write(
+            f"Fake upload server on http://{options['host']}:{options['port']} "
+            f"with {options['latency']}s latency"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,51 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+def backfill_search_vector(apps, schema_editor):
+    Profile = apps.get_model("user_profile", "Profile")
+    User = apps.get_model("user_auth", "User")
+    schema_editor.execute(
+        f"""
+        UPDATE {Profile._meta.db_table} AS p
+        SET search_vector =
+            setweight(to_tsvector('simple',
+                coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')), 'A')
+            || setweight(to_tsvector('simple',
+                coalesce(u.email, '') || ' ' || u.id_no::text), 'B')
+            || setweight(to_tsvector('simple',
+                coalesce(p.phone_number, '') || ' '
+                || ltrim(coalesce(p.phone_number, ''), '+')), 'C')
+        FROM {User._meta.db_table} AS u
+        WHERE u.id = p.user_id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("user_auth", "0009_user_permissions_version"),
+        ("user_profile", "0007_profile_account_currency_profile_account_type_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name="profile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="profile_search_vector_idx"
+            ),
+        ),
+    ]
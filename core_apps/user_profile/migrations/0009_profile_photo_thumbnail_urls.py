@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_profile", "0008_profile_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="photo_thumbnail_url",
+            field=models.URLField(
+                blank=True, null=True, verbose_name="Photo Thumbnail URL"
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="id_photo_thumbnail_url",
+            field=models.URLField(
+                blank=True, null=True, verbose_name="ID Photo Thumbnail URL"
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="signature_photo_thumbnail_url",
+            field=models.URLField(
+                blank=True, null=True, verbose_name="Signature Photo Thumbnail URL"
+            ),
+        ),
+    ]
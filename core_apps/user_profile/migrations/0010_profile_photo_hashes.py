@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_profile", "0009_profile_photo_thumbnail_urls"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="photo_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=64,
+                null=True,
+                verbose_name="Photo Hash",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="id_photo_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=64,
+                null=True,
+                verbose_name="ID Photo Hash",
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="signature_photo_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=64,
+                null=True,
+                verbose_name="Signature Photo Hash",
+            ),
+        ),
+    ]
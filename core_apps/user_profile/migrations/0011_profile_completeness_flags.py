@@ -0,0 +1,90 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+TEXT_FIELDS = (
+    "title",
+    "gender",
+    "country_of_birth",
+    "place_of_birth",
+    "marital_status",
+    "means_of_identification",
+    "nationality",
+    "phone_number",
+    "address",
+    "city",
+    "country",
+    "employment_status",
+    "photo",
+    "id_photo",
+    "signature_photo",
+)
+DATE_FIELDS = ("date_of_birth", "id_issue_date", "id_expiry_date")
+
+
+def backfill_completeness(apps, schema_editor):
+    Profile = apps.get_model("user_profile", "Profile")
+    NextOfKin = apps.get_model("user_profile", "NextOfKin")
+    BankAccount = apps.get_model("accounts", "BankAccount")
+    required = [f"coalesce(p.{field}, '') <> ''" for field in TEXT_FIELDS] + [
+        f"p.{field} IS NOT NULL" for field in DATE_FIELDS
+    ]
+    schema_editor.execute(
+        f"""
+        UPDATE {Profile._meta.db_table} AS p
+        SET is_complete = TRUE
+        WHERE {" AND ".join(required)}
+        AND EXISTS (
+            SELECT 1 FROM {NextOfKin._meta.db_table} AS k WHERE k.profile_id = p.id
+        )
+        """
+    )
+    schema_editor.execute(
+        f"""
+        UPDATE {Profile._meta.db_table} AS p
+        SET awaiting_account = TRUE
+        WHERE p.is_complete
+        AND NOT EXISTS (
+            SELECT 1 FROM {BankAccount._meta.db_table} AS a
+            WHERE a.user_id = p.user_id
+            AND a.currency IS NOT DISTINCT FROM p.account_currency
+            AND a.account_type IS NOT DISTINCT FROM p.account_type
+        )
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0003_ledgerentry"),
+        ("user_profile", "0010_profile_photo_hashes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="is_complete",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Is Complete"
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="awaiting_account",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Awaiting Account"
+            ),
+        ),
+        migrations.RunPython(backfill_completeness, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name="profile",
+            index=models.Index(
+                condition=models.Q(("awaiting_account", True)),
+                fields=["updated_at"],
+                name="profile_awaiting_account_idx",
+            ),
+        ),
+    ]
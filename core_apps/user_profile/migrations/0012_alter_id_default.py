@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 06:59
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_profile", "0011_profile_completeness_flags"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="nextofkin",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="profile",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+    ]
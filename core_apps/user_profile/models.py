@@ -2,8 +2,11 @@ from typing import Any
 from cloudinary.models import CloudinaryField
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import CharField, Q, Value
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
 from phonenumber_field.modelfields import PhoneNumberField
@@ -15,6 +18,16 @@ User = get_user_model()
 
 
 class Profile(TimeStampedModel):
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="profile_search_vector_idx"),
+            models.Index(
+                fields=["updated_at"],
+                condition=Q(awaiting_account=True),
+                name="profile_awaiting_account_idx",
+            ),
+        ]
+
     class Salutation(models.TextChoices):
         MR = (
             "Mr",
@@ -193,12 +206,67 @@ class Profile(TimeStampedModel):
     )
     photo = CloudinaryField(_("Photo"), blank=True, null=True)
     photo_url = models.URLField(_("Photo URL"), blank=True, null=True)
+    photo_thumbnail_url = models.URLField(
+        _("Photo Thumbnail URL"), blank=True, null=True
+    )
+    photo_hash = models.CharField(
+        _("Photo Hash"), max_length=64, blank=True, null=True, db_index=True
+    )
     id_photo = CloudinaryField(_("ID Photo"), blank=True, null=True)
     id_photo_url = models.URLField(_("ID Photo URL"), blank=True, null=True)
+    id_photo_thumbnail_url = models.URLField(
+        _("ID Photo Thumbnail URL"), blank=True, null=True
+    )
+    id_photo_hash = models.CharField(
+        _("ID Photo Hash"), max_length=64, blank=True, null=True, db_index=True
+    )
     signature_photo = CloudinaryField(_("Signature Photo"), blank=True, null=True)
     signature_photo_url = models.URLField(
         _("Signature Photo URL"), blank=True, null=True
     )
+    signature_photo_thumbnail_url = models.URLField(
+        _("Signature Photo Thumbnail URL"), blank=True, null=True
+    )
+    signature_photo_hash = models.CharField(
+        _("Signature Photo Hash"), max_length=64, blank=True, null=True, db_index=True
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
+    is_complete = models.BooleanField(_("Is Complete"), default=False, editable=False)
+    awaiting_account = models.BooleanField(
+        _("Awaiting Account"), default=False, editable=False
+    )
+
+    REQUIRED_FIELDS = (
+        "title",
+        "gender",
+        "date_of_birth",
+        "country_of_birth",
+        "place_of_birth",
+        "marital_status",
+        "means_of_identification",
+        "id_issue_date",
+        "id_expiry_date",
+        "nationality",
+        "phone_number",
+        "address",
+        "city",
+        "country",
+        "employment_status",
+        "photo",
+        "id_photo",
+        "signature_photo",
+    )
+    ACCOUNT_CHOICE_FIELDS = ("account_currency", "account_type")
+    COMPLETENESS_FIELDS = (*REQUIRED_FIELDS, *ACCOUNT_CHOICE_FIELDS)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_account_choice = instance._account_choice()
+        return instance
+
+    def _account_choice(self) -> tuple:
+        return tuple(self.__dict__.get(field) for field in self.ACCOUNT_CHOICE_FIELDS)
 
     def clean(self) -> None:
         super().clean()
@@ -210,31 +278,88 @@ class Profile(TimeStampedModel):
 
     def save(self, *args: Any, **kwargs: Any) -> None:
         self.full_clean()
+        # Derived columns are written by the same UPDATE as the fields they
+        # come from, and only recomputed when those fields are being saved.
+        update_fields = kwargs.get("update_fields")
+        saved = set(update_fields) if update_fields is not None else None
+        derived = set()
+        if saved is None or not saved.isdisjoint(self.COMPLETENESS_FIELDS):
+            self.refresh_completeness()
+            derived |= {"is_complete", "awaiting_account"}
+        if saved is None or "phone_number" in saved:
+            self.search_vector = self.build_search_vector()
+            derived.add("search_vector")
+        if saved is not None:
+            kwargs["update_fields"] = saved | derived
         super().save(*args, **kwargs)
+        self._loaded_account_choice = self._account_choice()
 
-    def is_complete_with_next_of_kin(self):
-        required_fields = [
-            self.title,
-            self.gender,
-            self.date_of_birth,
-            self.country_of_birth,
-            self.place_of_birth,
-            self.marital_status,
-            self.means_of_identification,
-            self.id_issue_date,
-            self.id_expiry_date,
-            self.nationality,
-            self.phone_number,
-            self.address,
-            self.city,
-            self.country,
-            self.employment_status,
-            self.photo,
-            self.id_photo,
-            self.signature_photo,
-        ]
+    def has_required_fields(self) -> bool:
+        return all(getattr(self, field) for field in self.REQUIRED_FIELDS)
+
+    def refresh_completeness(self, check_next_of_kin: bool = False) -> None:
+        """Recompute ``is_complete`` and ``awaiting_account`` in memory.
 
-        return all(required_fields) and self.next_of_kin.exists()
+        Next of kin changes pass ``check_next_of_kin``, so a profile that is
+        already complete keeps its flag without querying next of kin again.
+        """
+        was_complete = self.is_complete
+        if not self.has_required_fields():
+            self.is_complete = False
+        elif check_next_of_kin or not was_complete:
+            self.is_complete = not self._state.adding and self.next_of_kin.exists()
+
+        loaded_choice = getattr(self, "_loaded_account_choice", None)
+        if not self.is_complete:
+            self.awaiting_account = False
+        elif not was_complete or loaded_choice != self._account_choice():
+            self.awaiting_account = True
+
+    def sync_completeness(self, check_next_of_kin: bool = False) -> None:
+        # Photo uploads and next of kin changes write around ``save``, so they
+        # persist the flags directly instead of re-running full validation.
+        flags = (self.is_complete, self.awaiting_account)
+        self.refresh_completeness(check_next_of_kin)
+        if flags != (self.is_complete, self.awaiting_account):
+            Profile.objects.filter(pk=self.pk).update(
+                is_complete=self.is_complete, awaiting_account=self.awaiting_account
+            )
+
+    def build_search_vector(self) -> SearchVector:
+        def text(value: Any) -> Value:
+            return Value(str(value or ""), output_field=CharField())
+
+        phone_number = str(self.phone_number or "")
+        return (
+            SearchVector(
+                text(self.user.first_name),
+                text(self.user.last_name),
+                weight="A",
+                config="simple",
+            )
+            + SearchVector(
+                text(self.user.email),
+                text(self.user.id_no),
+                weight="B",
+                config="simple",
+            )
+            + SearchVector(
+                text(phone_number),
+                text(phone_number.lstrip("+")),
+                weight="C",
+                config="simple",
+            )
+        )
+
+    def update_search_vector(self) -> None:
+        # Name, email and ID number live on the user row, so user saves that
+        # touch them refresh the column through a signal.
+        Profile.objects.filter(pk=self.pk).update(
+            search_vector=self.build_search_vector()
+        )
+
+    def is_complete_with_next_of_kin(self) -> bool:
+        return self.has_required_fields() and self.next_of_kin.exists()
 
     def __str__(self):
         return f"{self.title} {self.user.first_name} Profile"
@@ -296,6 +421,19 @@ class NextOfKin(TimeStampedModel):
     def save(self, *args: Any, **kwargs: Any) -> None:
         self.full_clean()
         super().save(*args, **kwargs)
+        self.sync_profile_completeness()
+
+    def delete(self, *args: Any, **kwargs: Any):
+        deleted = super().delete(*args, **kwargs)
+        self.sync_profile_completeness()
+        return deleted
+
+    def sync_profile_completeness(self) -> None:
+        # The related profile may be a stale copy, so the flags are
+        # recomputed from a fresh row.
+        Profile.objects.get(pk=self.profile_id).sync_completeness(
+            check_next_of_kin=True
+        )
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - Next of kin for {self.profile.user.full_name}"
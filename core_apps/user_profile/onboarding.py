@@ -0,0 +1,85 @@
+from typing import Optional
+
+from django.db import transaction
+from loguru import logger
+
+from core_apps.accounts.models import BankAccount
+from core_apps.accounts.utils import create_bank_account
+
+from .models import Profile
+
+
+def open_pending_account(profile: Profile) -> Optional[BankAccount]:
+    """Open the account a complete profile is waiting for.
+
+    Returns ``None`` when the user already holds an account in the chosen
+    currency and type. Either way the profile leaves the queue.
+    """
+    exists = BankAccount.objects.filter(
+        user_id=profile.user_id,
+        currency=profile.account_currency,
+        account_type=profile.account_type,
+    ).exists()
+    account = None
+    if not exists:
+        account = create_bank_account(
+            profile.user,
+            currency=profile.account_currency,
+            account_type=profile.account_type,
+        )
+
+    Profile.objects.filter(pk=profile.pk).update(awaiting_account=False)
+    profile.awaiting_account = False
+    return account
+
+
+def open_pending_accounts(batch_size: int) -> int:
+    """Drain the awaiting-account queue in batches and return accounts opened.
+
+    Rows are claimed with ``SKIP LOCKED``, so a profile being updated through
+    the API, or claimed by another worker, is left for whoever holds it.
+    """
+    opened = 0
+    failed = set()
+    while True:
+        with transaction.atomic():
+            profiles = list(
+                Profile.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("user")
+                .filter(awaiting_account=True)
+                .exclude(pk__in=failed)
+                .order_by("updated_at")[:batch_size]
+            )
+            if not profiles:
+                return opened
+
+            existing = set(
+                BankAccount.objects.filter(
+                    user_id__in=[profile.user_id for profile in profiles]
+                ).values_list("user_id", "currency", "account_type")
+            )
+            done = []
+            for profile in profiles:
+                choice = (
+                    profile.user_id,
+                    profile.account_currency,
+                    profile.account_type,
+                )
+                try:
+                    with transaction.atomic():
+                        if choice not in existing:
+                            create_bank_account(
+                                profile.user,
+                                currency=profile.account_currency,
+                                account_type=profile.account_type,
+                            )
+                            opened += 1
+                except Exception as e:
+                    logger.error(
+                        f"Failed to open account for profile {profile.pk}: {str(e)}"
+                    )
+                    failed.add(profile.pk)
+                    continue
+                done.append(profile.pk)
+
+            Profile.objects.filter(pk__in=done).update(awaiting_account=False)
@@ -1,19 +1,18 @@
-import base64
 from csv import excel
+from functools import partial
 from typing import Any, Dict
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
+from django.db import transaction
 from django_countries.serializer_fields import CountryField
 from phonenumber_field.serializerfields import PhoneNumberField
 from rest_framework import serializers
 
-from core_apps.common.models import ContentView
+from core_apps.common.view_counter import get_view_count
 from core_apps.accounts.models import BankAccount
 from .models import Profile, NextOfKin
 from .tasks import upload_photos_to_cloudinary
+from .uploads import PHOTO_FIELDS, content_hash, find_uploaded_photo, stage_photo
 
 User = get_user_model()
 
@@ -39,6 +38,13 @@ class NextOfKinSerializer(serializers.ModelSerializer):
         return NextOfKin.objects.create(profile=profile, **validated_data)
 
 
+class ChunkedUploadInitSerializer(serializers.Serializer):
+    field = serializers.ChoiceField(choices=PHOTO_FIELDS)
+    size = serializers.IntegerField(
+        min_value=1, max_value=settings.CHUNKED_UPLOAD_MAX_SIZE
+    )
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     id = UUIDField(read_only=True)
     first_name = serializers.CharField(source="user.first_name")
@@ -114,6 +120,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             "view_count",
             "account_currency",
             "account_type",
+            "is_complete",
         ]
         read_only_fields = [
             "user",
@@ -135,15 +142,6 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         return attrs
 
-    def to_representation(self, instance: Profile) -> dict:
-        representation = super().to_representation(instance)
-
-        representation["next_of_kin"] = NextOfKinSerializer(
-            instance.next_of_kin.all(), many=True
-        ).data
-
-        return representation
-
     def update(self, instance: Profile, validated_data: dict) -> Profile:
         user_data = validated_data.pop("user", {})
 
@@ -155,19 +153,23 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         photos_to_upload = {}
 
-        for field in ["photo", "id_photo", "signature_photo"]:
+        for field in PHOTO_FIELDS:
             if field in validated_data:
                 photo = validated_data.pop(field)
-                if photo.size > settings.MAX_UPLOAD_SIZE:
-                    temp_file = default_storage.save(
-                        f"temp_{instance.id}_{field}.jpg", ContentFile(photo.read())
-                    )
-                    temp_file_path = default_storage.path(temp_file)
-                    photos_to_upload[field] = {"type": "file", "path": temp_file_path}
-                else:
-                    image_content = photo.read()
-                    encoded_image = base64.b64encode(image_content).decode("utf-8")
-                    photos_to_upload[field] = {"type": "base64", "data": encoded_image}
+                photo_hash = content_hash(photo)
+                if photo_hash == getattr(instance, f"{field}_hash"):
+                    continue
+
+                uploaded = find_uploaded_photo(instance, field, photo_hash)
+                if uploaded:
+                    for attr, value in uploaded.items():
+                        setattr(instance, attr, value)
+                    continue
+
+                photos_to_upload[field] = {
+                    "name": stage_photo(instance.id, field, photo),
+                    "hash": photo_hash,
+                }
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -175,15 +177,18 @@ class ProfileSerializer(serializers.ModelSerializer):
         instance.save()
 
         if photos_to_upload:
-            upload_photos_to_cloudinary.delay(str(instance.id), photos_to_upload)
+            transaction.on_commit(
+                partial(
+                    upload_photos_to_cloudinary.delay,
+                    str(instance.id),
+                    photos_to_upload,
+                )
+            )
 
         return instance
 
     def get_view_count(self, obj: Profile) -> int:
-        content_type = ContentType.objects.get_for_model(obj)
-        return ContentView.objects.filter(
-            content_type=content_type, object_id=obj.id
-        ).count()
+        return get_view_count(obj)
 
 
 class ProfileListSerializer(serializers.ModelSerializer):
@@ -206,6 +211,8 @@ class ProfileListSerializer(serializers.ModelSerializer):
         ]
 
     def get_photo(self, obj: Profile) -> str | None:
+        if obj.photo_thumbnail_url:
+            return obj.photo_thumbnail_url
         try:
             return obj.photo.url
         except AttributeError:
@@ -1,4 +1,4 @@
-from typing import Any, Type
+from typing import Any, Optional, Type
 from django.db.models.base import Model
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -17,6 +17,21 @@ def create_user_profile(
         logger.info(f"Profile created for {instance.first_name} {instance.last_name}")
 
 
+SEARCHABLE_USER_FIELDS = {"first_name", "last_name", "email", "id_no"}
+
+
 @receiver(post_save, sender=AUTH_USER_MODEL)
-def create_user_profile(sender: Type[Model], instance: Model, **kwargs: Any) -> None:
-    instance.profile.save()
+def save_user_profile(
+    sender: Type[Model],
+    instance: Model,
+    created: bool,
+    update_fields: Optional[frozenset] = None,
+    **kwargs: Any,
+) -> None:
+    # Logins and lockouts save the user with update_fields, so only changes
+    # that can move the profile in search touch the profile row.
+    if created:
+        return
+    if update_fields is not None and not SEARCHABLE_USER_FIELDS & update_fields:
+        return
+    instance.profile.update_search_vector()
@@ -1,45 +1,42 @@
-import base64
 from uuid import UUID
-import cloudinary.uploader
 from celery import shared_task
-from django.apps import apps
-from django.core.files.storage import default_storage
+from django.conf import settings
 from loguru import logger
 
+from .chunked_uploads import purge_stale_parts
+from .onboarding import open_pending_accounts
+from .uploads import discard_staged_photos, save_uploaded_photos, upload_staged_photos
+
 
 @shared_task(name="upload_photos_to_cloudinary")
 def upload_photos_to_cloudinary(profile_id: UUID, photos: dict) -> None:
-    print(photos)
+    names = {field: photo["name"] for field, photo in photos.items()}
+    hashes = {field: photo["hash"] for field, photo in photos.items()}
     try:
-        profile_model = apps.get_model("user_profile", "Profile")
-        profile = profile_model.objects.get(id=profile_id)
-
-        for field_name, photo_data in photos.items():
-            if photo_data["type"] == "base64":
-                image_content = base64.b64decode(photo_data["path"])
-                response = cloudinary.uploader.upload(image_content)
-            else:
-                print("else")
-                with open(photo_data["path"], "rb") as image_file:
-                    print("entra with")
-                    response = cloudinary.uploader.upload(image_file)
-                    print("response: ", response)
-                default_storage.delete(photo_data["path"])
-                print("delete")
-            setattr(profile, field_name, response["public_id"])
-            print("entra5")
-            setattr(profile, f"{field_name}_url", response["url"])
-            print("entra5")
-        profile.save()
-        print("save")
-
-        logger.info(f"Photos for  {profile.user.email}'s uploaded successfully")
+        results = upload_staged_photos(names)
+        save_uploaded_photos(profile_id, results, hashes)
+
+        uploaded = [field for field, response in results.items() if response]
+        logger.info(f"Uploaded {uploaded} for profile {profile_id}")
 
     except Exception as e:
         logger.error(f"Failed to upload photos for profile {profile_id}: {str(e)} ")
 
-        for photo_data in photos.values():
-            if photo_data["type"] == "file" and default_storage.exists(
-                photo_data["path"]
-            ):
-                default_storage.delete(photo_data["path"])
+    finally:
+        discard_staged_photos(names)
+
+
+@shared_task(name="purge_stale_chunked_uploads")
+def purge_stale_chunked_uploads() -> int:
+    purged = purge_stale_parts()
+    if purged:
+        logger.info(f"Purged {purged} abandoned chunked uploads")
+    return purged
+
+
+@shared_task(name="open_pending_accounts")
+def open_pending_accounts_task() -> int:
+    opened = open_pending_accounts(settings.ACCOUNT_OPENING_BATCH_SIZE)
+    if opened:
+        logger.info(f"Opened {opened} accounts for completed profiles")
+    return opened
@@ -1,3 +1,437 @@
-from django.test import TestCase
+import hashlib
+import tempfile
+import uuid
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django_redis import get_redis_connection
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core_apps.common.testing import create_user
+
+from . import chunked_uploads, uploads, views
+from .images import preprocess_photo
+from .filters import ProfileSearchFilter
+from .models import NextOfKin, Profile
+from .tasks import upload_photos_to_cloudinary
+
+User = get_user_model()
+
+
+def image_file(
+    name: str = "photo.png", size=(64, 64), mode: str = "RGB", **save_kwargs
+) -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new(mode, size, "red").save(buffer, format="PNG", **save_kwargs)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def fake_upload(file, **options) -> dict:
+    public_id = uuid.uuid4().hex
+    return {"public_id": public_id, "url": f"https://cdn.example.com/{public_id}"}
+
+
+class StagedUploadTestMixin:
+    def setUp(self):
+        super().setUp()
+        staging_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(staging_dir.cleanup)
+        self.storage = FileSystemStorage(location=staging_dir.name)
+        for module in (uploads, chunked_uploads, views):
+            patcher = mock.patch.object(module, "upload_storage", self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stage(self, profile, field_name, photo):
+        return {
+            "name": uploads.stage_photo(profile.id, field_name, photo),
+            "hash": uploads.content_hash(photo),
+        }
+
+
+class ProfileDetailQueryCountTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(1)
+        self.client.force_authenticate(self.user)
+
+    def add_next_of_kin(self, count):
+        for index in range(count):
+            NextOfKin.objects.create(
+                profile=self.user.profile,
+                title=NextOfKin.Salutation.MR,
+                first_name="John",
+                last_name=f"Doe {index}",
+                date_of_birth="1980-01-01",
+                gender=NextOfKin.Gender.MALE,
+                relationship="Brother",
+                email_address=f"kin{index}@example.com",
+                phone_number="+525555555555",
+                address="Street 1",
+                city="Mexico City",
+                country="Mexico",
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("profile_detail"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_next_of_kin(self):
+        self.add_next_of_kin(1)
+        self.count_queries()
+        single_count = self.count_queries()
+
+        self.add_next_of_kin(4)
+        many_count = self.count_queries()
+
+        self.assertEqual(single_count, many_count)
+
+
+class ProfileSearchTests(APITestCase):
+    def setUp(self):
+        manager = create_user(0, role=User.RoleChoices.BRANCH_MANAGER)
+        self.client.force_authenticate(manager)
+        self.maria = create_user(1, first_name="Maria", last_name="Lopez")
+        self.mario = create_user(2, first_name="Mario", last_name="Gomez")
+        self.ana = create_user(
+            3, first_name="Ana", last_name="Perez", email="lopez.ana@example.com"
+        )
+        create_user(4, first_name="Maria", last_name="Lopez", is_staff=True)
+
+    def search(self, term):
+        response = self.client.get(reverse("all_profiles"), {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [profile["email"] for profile in response.data["results"]]
+
+    def test_prefix_matches_rank_names_above_email(self):
+        self.assertEqual(self.search("lop"), [self.maria.email, self.ana.email])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("mar lop"), [self.maria.email])
+
+    def test_id_number_is_searchable(self):
+        self.assertEqual(self.search(str(self.mario.id_no)), [self.mario.email])
+
+    def test_renaming_a_user_updates_the_search_vector(self):
+        self.mario.first_name = "Marcos"
+        self.mario.save()
+
+        self.assertEqual(self.search("marcos"), [self.mario.email])
+        self.assertEqual(self.search("mario"), [])
+
+    def test_blank_search_lists_every_customer_profile(self):
+        self.assertEqual(len(self.search("")), 4)
+
+
+class PhotoUploadTaskTests(StagedUploadTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile = create_user(1).profile
+
+    def test_staged_photos_are_uploaded_and_removed(self):
+        photos = {
+            "photo": self.stage(self.profile, "photo", image_file()),
+            "id_photo": self.stage(self.profile, "id_photo", image_file("id.png")),
+        }
+
+        with mock.patch("cloudinary.uploader.upload", side_effect=fake_upload):
+            upload_photos_to_cloudinary(str(self.profile.id), photos)
+
+        self.profile.refresh_from_db()
+        self.assertTrue(self.profile.photo_url.startswith("https://cdn.example.com/"))
+        self.assertTrue(self.profile.id_photo_url)
+        self.assertEqual(self.profile.photo_hash, photos["photo"]["hash"])
+        self.assertIsNone(self.profile.signature_photo_url)
+        for photo in photos.values():
+            self.assertFalse(self.storage.exists(photo["name"]))
+
+    def test_failed_upload_keeps_the_photos_that_succeeded(self):
+        photos = {
+            "photo": self.stage(self.profile, "photo", image_file()),
+            "signature_photo": self.stage(
+                self.profile, "signature_photo", image_file("signature.png")
+            ),
+        }
+
+        def upload(file, **options):
+            if "signature_photo_" in file.name:
+                raise ConnectionError("upload failed")
+            return fake_upload(file, **options)
+
+        with (
+            mock.patch.object(uploads, "preprocess_photo", side_effect=ValueError),
+            mock.patch("cloudinary.uploader.upload", side_effect=upload),
+        ):
+            upload_photos_to_cloudinary(str(self.profile.id), photos)
+
+        self.profile.refresh_from_db()
+        self.assertTrue(self.profile.photo_url)
+        self.assertIsNone(self.profile.signature_photo_url)
+        self.assertIsNone(self.profile.signature_photo_hash)
+        for photo in photos.values():
+            self.assertFalse(self.storage.exists(photo["name"]))
+
+
+@override_settings(
+    PHOTO_OUTPUT_FORMAT="WEBP",
+    PHOTO_MAX_DIMENSIONS=(1600, 1600),
+    PHOTO_THUMBNAIL_DIMENSIONS=(200, 200),
+)
+class PreprocessPhotoTests(SimpleTestCase):
+    def open(self, data: bytes) -> Image.Image:
+        image = Image.open(BytesIO(data))
+        image.load()
+        return image
+
+    def test_photo_is_bounded_and_paired_with_a_thumbnail(self):
+        processed = preprocess_photo(image_file(size=(4000, 2000)))
+
+        self.assertEqual(processed.format, "webp")
+        image = self.open(processed.image)
+        self.assertEqual((image.format, image.size), ("WEBP", (1600, 800)))
+        self.assertEqual(self.open(processed.thumbnail).size, (200, 100))
+
+    def test_small_photo_is_not_enlarged(self):
+        processed = preprocess_photo(image_file(size=(120, 80)))
+
+        self.assertEqual(self.open(processed.image).size, (120, 80))
+        self.assertEqual(self.open(processed.thumbnail).size, (120, 80))
+
+    def test_exif_rotation_is_applied_to_the_pixels(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise.
+
+        processed = preprocess_photo(image_file(size=(300, 100), exif=exif))
+
+        self.assertEqual(self.open(processed.image).size, (100, 300))
+
+    @override_settings(PHOTO_OUTPUT_FORMAT="JPEG")
+    def test_transparent_photo_is_flattened_for_jpeg(self):
+        processed = preprocess_photo(image_file(size=(50, 50), mode="RGBA"))
+
+        image = self.open(processed.image)
+        self.assertEqual((image.format, image.mode), ("JPEG", "RGB"))
+
+
+class ProcessAndUploadPhotoTests(StagedUploadTestMixin, SimpleTestCase):
+    def test_image_and_thumbnail_are_uploaded(self):
+        name = self.storage.save("photo.png", image_file(size=(400, 400)))
+
+        with mock.patch("cloudinary.uploader.upload", side_effect=fake_upload):
+            result = uploads.process_and_upload_photo(name)
+
+        self.assertTrue(result["image"]["url"])
+        self.assertTrue(result["thumbnail"]["url"])
+
+    def test_unreadable_image_is_uploaded_as_it_is(self):
+        name = self.storage.save(
+            "photo.png", SimpleUploadedFile("photo.png", b"not an image")
+        )
+
+        with mock.patch(
+            "cloudinary.uploader.upload", side_effect=fake_upload
+        ) as upload:
+            result = uploads.process_and_upload_photo(name)
+
+        self.assertIsNone(result["thumbnail"])
+        upload.assert_called_once()
+
+
+class PhotoReuseTests(TestCase):
+    def setUp(self):
+        self.owner = create_user(1).profile
+        self.other = create_user(2).profile
+
+    def upload(self, profile, field_name, photo_hash):
+        uploads.save_uploaded_photos(
+            profile.id,
+            {field_name: {"image": fake_upload(None), "thumbnail": None}},
+            {field_name: photo_hash},
+        )
+
+    def test_profile_photo_is_reused_across_profiles(self):
+        self.upload(self.owner, "photo", "a" * 64)
+
+        self.assertTrue(uploads.reuse_uploaded_photo(self.other, "photo", "a" * 64))
+
+        self.other.refresh_from_db()
+        self.owner.refresh_from_db()
+        self.assertEqual(self.other.photo_url, self.owner.photo_url)
+
+    def test_identity_documents_are_not_reused_across_profiles(self):
+        for field_name in ("id_photo", "signature_photo"):
+            with self.subTest(field_name=field_name):
+                self.upload(self.owner, field_name, "b" * 64)
+
+                self.assertFalse(
+                    uploads.reuse_uploaded_photo(self.other, field_name, "b" * 64)
+                )
+                self.other.refresh_from_db()
+                self.assertIsNone(getattr(self.other, f"{field_name}_url"))
+
+
+class ChunkedUploadTests(StagedUploadTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(1)
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(views.upload_photos_to_cloudinary, "delay")
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start(self, content: bytes, field_name: str = "photo") -> str:
+        response = self.client.post(
+            reverse("chunked_upload_init"),
+            {"field": field_name, "size": len(content)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data["upload_id"]
+
+    def put_chunk(self, upload_id: str, offset: int, chunk: bytes):
+        return self.client.put(
+            reverse("chunked_upload", args=[upload_id]),
+            chunk,
+            content_type="application/octet-stream",
+            headers={"Upload-Offset": str(offset)},
+        )
+
+    def upload(self, content: bytes, chunk_size: int = 100) -> str:
+        upload_id = self.start(content)
+        for offset in range(0, len(content), chunk_size):
+            response = self.put_chunk(
+                upload_id, offset, content[offset : offset + chunk_size]
+            )
+            self.assertEqual(response.status_code, 200)
+        return upload_id
+
+    def complete(self, upload_id: str, **data):
+        return self.client.post(
+            reverse("chunked_upload_complete", args=[upload_id]), data, format="json"
+        )
+
+    def test_completed_upload_is_queued_for_processing(self):
+        content = image_file(size=(120, 80)).read()
+        upload_id = self.upload(content)
+
+        response = self.complete(upload_id, sha256=hashlib.sha256(content).hexdigest())
+
+        self.assertEqual(response.status_code, 202)
+        profile_id, photos = self.delay.call_args.args
+        self.assertEqual(profile_id, str(self.user.profile.id))
+        staged = photos["photo"]["name"]
+        self.assertFalse(staged.endswith(chunked_uploads.PART_SUFFIX))
+        with self.storage.open(staged, "rb") as photo:
+            self.assertEqual(photo.read(), content)
+
+    def test_chunk_at_the_wrong_offset_is_rejected(self):
+        upload_id = self.start(b"x" * 200)
+        self.put_chunk(upload_id, 0, b"x" * 100)
+
+        response = self.put_chunk(upload_id, 50, b"x" * 100)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], 100)
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        upload_id = self.start(b"x" * 200)
+        self.put_chunk(upload_id, 0, b"x" * 100)
+
+        response = self.complete(upload_id)
+
+        self.assertEqual(response.status_code, 400)
+        self.delay.assert_not_called()
+
+    def test_content_that_is_not_an_image_is_rejected(self):
+        upload_id = self.upload(b"not an image" * 20)
+
+        response = self.complete(upload_id)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("photo", response.data["errors"])
+        self.delay.assert_not_called()
+        self.assertEqual(self.storage.listdir(str(self.user.profile.id))[1], [])
+
+    def test_mismatched_checksum_is_rejected(self):
+        upload_id = self.upload(image_file().read())
+
+        response = self.complete(upload_id, sha256="0" * 64)
+
+        self.assertEqual(response.status_code, 400)
+        self.delay.assert_not_called()
+
+    def test_concurrent_completion_is_refused(self):
+        upload_id = self.upload(image_file().read())
+        connection = get_redis_connection("default")
+        lock_key = chunked_uploads._lock_key(upload_id)
+        connection.set(lock_key, 1)
+        self.addCleanup(connection.delete, lock_key)
+
+        response = self.complete(upload_id)
+
+        self.assertEqual(response.status_code, 409)
+        self.delay.assert_not_called()
+
+    def test_completing_twice_does_not_fail(self):
+        upload_id = self.upload(image_file().read())
+        self.complete(upload_id)
+
+        response = self.complete(upload_id)
+
+        self.assertEqual(response.status_code, 404)
+        self.delay.assert_called_once()
+
+
+class ProfileSaveQueryTests(TestCase):
+    def setUp(self):
+        self.user = create_user(1)
+        self.table = Profile._meta.db_table
+
+    def profile_updates(self, queries):
+        return [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(f'UPDATE "{self.table}"')
+        ]
+
+    def test_profile_save_writes_the_row_once(self):
+        profile = Profile.objects.select_related("user").get(user=self.user)
+        profile.phone_number = "+525512345678"
+
+        with CaptureQueriesContext(connection) as queries:
+            profile.save()
+
+        self.assertEqual(len(self.profile_updates(queries)), 1)
+        query = ProfileSearchFilter().build_query("525512345678")
+        self.assertTrue(Profile.objects.filter(search_vector=query).exists())
+
+    def test_login_bookkeeping_does_not_touch_the_profile(self):
+        user = User.objects.get(pk=self.user.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            user.handle_failed_login_attempts()
+            user.reset_failed_login_attempts()
+
+        self.assertEqual(self.profile_updates(queries), [])
+        self.assertEqual(len(queries), 2)
+
+    def test_renaming_the_user_refreshes_only_the_search_vector(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.last_name = "Lopez"
+
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=["last_name"])
+
+        updates = self.profile_updates(queries)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"search_vector"', updates[0])
+        self.assertNotIn('"is_complete"', updates[0])
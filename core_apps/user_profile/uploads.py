@@ -0,0 +1,154 @@
+import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Optional
+
+import cloudinary.uploader
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from loguru import logger
+
+from .images import preprocess_photo
+from .models import Profile
+
+PHOTO_FIELDS = ("photo", "id_photo", "signature_photo")
+SHARED_PHOTO_FIELDS = ("photo",)
+
+# Staged uploads live on a directory shared by the API and the Celery
+# workers, so only the file names travel through the broker.
+upload_storage = FileSystemStorage(location=settings.PHOTO_UPLOAD_TEMP_DIR)
+
+
+def content_hash(photo: Any) -> str:
+    digest = hashlib.sha256()
+    for chunk in photo.chunks():
+        digest.update(chunk)
+    photo.seek(0)
+    return digest.hexdigest()
+
+
+def find_uploaded_photo(
+    profile: Profile, field_name: str, photo_hash: str
+) -> Optional[dict[str, Any]]:
+    # Identical profile photos already uploaded for any profile are reused as
+    # they are, so only the first copy reaches Cloudinary. ID documents and
+    # signatures are never linked to another customer's upload.
+    profiles = Profile.objects.filter(**{f"{field_name}_hash": photo_hash}).exclude(
+        **{f"{field_name}_url": None}
+    )
+    if field_name not in SHARED_PHOTO_FIELDS:
+        profiles = profiles.filter(id=profile.id)
+    return profiles.values(
+        field_name,
+        f"{field_name}_url",
+        f"{field_name}_thumbnail_url",
+        f"{field_name}_hash",
+    ).first()
+
+
+def reuse_uploaded_photo(profile: Profile, field_name: str, photo_hash: str) -> bool:
+    if photo_hash == getattr(profile, f"{field_name}_hash"):
+        return True
+
+    uploaded = find_uploaded_photo(profile, field_name, photo_hash)
+    if not uploaded:
+        return False
+
+    Profile.objects.filter(id=profile.id).update(updated_at=timezone.now(), **uploaded)
+    Profile.objects.get(id=profile.id).sync_completeness()
+    return True
+
+
+def stage_photo(profile_id: Any, field_name: str, photo: Any) -> str:
+    suffix = Path(getattr(photo, "name", "") or "").suffix or ".jpg"
+    return upload_storage.save(
+        f"{profile_id}/{field_name}_{uuid.uuid4().hex}{suffix}", photo
+    )
+
+
+def discard_staged_photos(photos: dict[str, str]) -> None:
+    for name in photos.values():
+        if upload_storage.exists(name):
+            upload_storage.delete(name)
+
+
+def upload_staged_photo(name: str) -> dict[str, Any]:
+    with upload_storage.open(name, "rb") as image_file:
+        return cloudinary.uploader.upload(image_file)
+
+
+def process_and_upload_photo(name: str) -> dict[str, Any]:
+    try:
+        with upload_storage.open(name, "rb") as image_file:
+            processed = preprocess_photo(image_file)
+    except Exception as e:
+        logger.warning(f"Could not preprocess {name}, uploading original: {str(e)}")
+        return {"image": upload_staged_photo(name), "thumbnail": None}
+
+    return {
+        "image": cloudinary.uploader.upload(
+            BytesIO(processed.image), format=processed.format
+        ),
+        "thumbnail": cloudinary.uploader.upload(
+            BytesIO(processed.thumbnail), format=processed.format
+        ),
+    }
+
+
+def upload_staged_photos(photos: dict[str, str]) -> dict[str, Optional[dict]]:
+    """Preprocess and upload every staged photo concurrently.
+
+    Responses come back by field as ``{"image": ..., "thumbnail": ...}``. A
+    failed upload is logged and reported as ``None`` so the photos that did
+    succeed can still be saved.
+    """
+    if not photos:
+        return {}
+
+    workers = min(len(photos), settings.PHOTO_UPLOAD_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            field_name: executor.submit(process_and_upload_photo, name)
+            for field_name, name in photos.items()
+        }
+
+    results = {}
+    for field_name, future in futures.items():
+        try:
+            results[field_name] = future.result()
+        except Exception as e:
+            logger.error(f"Failed to upload {field_name}: {str(e)}")
+            results[field_name] = None
+    return results
+
+
+def save_uploaded_photos(
+    profile_id: Any,
+    results: dict[str, Optional[dict]],
+    hashes: Optional[dict[str, str]] = None,
+) -> int:
+    hashes = hashes or {}
+    fields = {}
+    for field_name, response in results.items():
+        if response:
+            fields[f"{field_name}_hash"] = hashes.get(field_name)
+            fields[field_name] = response["image"]["public_id"]
+            fields[f"{field_name}_url"] = response["image"]["url"]
+            thumbnail = response["thumbnail"]
+            fields[f"{field_name}_thumbnail_url"] = (
+                thumbnail["url"] if thumbnail else None
+            )
+    if not fields:
+        return 0
+
+    updated = Profile.objects.filter(id=profile_id).update(
+        updated_at=timezone.now(), **fields
+    )
+    # The bulk update skips ``save``, so a photo that completes the profile
+    # refreshes the completeness flags here.
+    if updated:
+        Profile.objects.get(id=profile_id).sync_completeness()
+    return updated
@@ -1,6 +1,9 @@
 from django.urls import path
 
 from .views import (
+    ChunkedUploadAPIView,
+    ChunkedUploadCompleteAPIView,
+    ChunkedUploadInitAPIView,
     NextOfKinDetailAPIView,
     NextOfKinAPIView,
     ProfileListAPIView,
@@ -11,6 +14,21 @@ from .views import (
 urlpatterns = [
     path("all/", ProfileListAPIView.as_view(), name="all_profiles"),
     path("my-profile/", ProfileDetailAPIView.as_view(), name="profile_detail"),
+    path(
+        "my-profile/uploads/",
+        ChunkedUploadInitAPIView.as_view(),
+        name="chunked_upload_init",
+    ),
+    path(
+        "my-profile/uploads/<uuid:upload_id>/",
+        ChunkedUploadAPIView.as_view(),
+        name="chunked_upload",
+    ),
+    path(
+        "my-profile/uploads/<uuid:upload_id>/complete/",
+        ChunkedUploadCompleteAPIView.as_view(),
+        name="chunked_upload_complete",
+    ),
     path(
         "my-profile/next-of-kin/", NextOfKinAPIView.as_view(), name="next-of-kin-list"
     ),
@@ -1,25 +1,47 @@
 from pydoc import pager
 from typing import Any, List
 
+from django.conf import settings
 from django.db import transaction
-from django.contrib.contenttypes.models import ContentType
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, filters, generics, serializers
+from rest_framework import status, generics, serializers
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import (
+    BaseParser,
+    FormParser,
+    JSONParser,
+    MultiPartParser,
+)
 from rest_framework.response import Response
 from rest_framework.request import Request
+from rest_framework.views import APIView
 
-from core_apps.common.models import ContentView
+from core_apps.common.view_counter import record_view
 from core_apps.common.permissions import IsBranchManager
-from core_apps.accounts.utils import create_bank_account
-from core_apps.accounts.models import BankAccount
 from core_apps.common.renderers import GenericJSONRenderer
+from .chunked_uploads import (
+    ChunkedUploadBusy,
+    ChunkOffsetMismatch,
+    create_upload,
+    discard_upload,
+    finish_upload,
+    get_upload,
+    write_chunk,
+)
+from .filters import ProfileSearchFilter
+from .images import is_valid_photo
 from .models import NextOfKin, Profile
-from .serializers import ProfileSerializer, ProfileListSerializer, NextOfKinSerializer
+from .onboarding import open_pending_account
+from .serializers import (
+    ChunkedUploadInitSerializer,
+    ProfileSerializer,
+    ProfileListSerializer,
+    NextOfKinSerializer,
+)
+from .tasks import upload_photos_to_cloudinary
+from .uploads import reuse_uploaded_photo, upload_storage
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -34,13 +56,14 @@ class ProfileListAPIView(generics.ListAPIView):
     pagination_class = StandardResultsSetPagination
     object_label = "profiles"
     permission_classes = [IsBranchManager]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    search_fields = ["user__first_name", "user__last_name", "user__id_no"]
+    filter_backends = [DjangoFilterBackend, ProfileSearchFilter]
     fieldset_fields = ["user__first_name", "user__last_name", "user__id_no"]
 
     def get_queryset(self) -> List[Profile]:
-        return Profile.objects.exclude(user__is_staff=True).exclude(
-            user__is_superuser=True
+        return (
+            Profile.objects.select_related("user")
+            .exclude(user__is_staff=True)
+            .exclude(user__is_superuser=True)
         )
 
 
@@ -52,24 +75,17 @@ class ProfileDetailAPIView(generics.RetrieveUpdateAPIView):
 
     def get_object(self) -> Profile:
         try:
-            profile = Profile.objects.get(user=self.request.user)
-            self.record_profile_view(profile)
+            profile = (
+                Profile.objects.select_related("user")
+                .prefetch_related("next_of_kin")
+                .get(user=self.request.user)
+            )
             return profile
         except Profile.DoesNotExist:
             raise Http404("Profile does not exist")
 
     def record_profile_view(self, profile: Profile) -> None:
-        content_type = ContentType.objects.get_for_model(profile)
-        viewer_ip = self.get_client_ip()
-        user = self.request.user
-
-        obj, created = ContentView.objects.update_or_create(
-            content_type=content_type,
-            object_id=profile.id,
-            user=user,
-            viewer_ip=viewer_ip,
-            defaults={"last_viewed": timezone.now()},
-        )
+        record_view(profile, self.request.user.pk, self.get_client_ip())
 
     def get_client_ip(self):
         x_forwarded_for = self.request.META.get("HTTP_X_FORWARDER_FOR")
@@ -81,6 +97,7 @@ class ProfileDetailAPIView(generics.RetrieveUpdateAPIView):
 
     def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         instance = self.get_object()
+        self.record_profile_view(instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -93,19 +110,12 @@ class ProfileDetailAPIView(generics.RetrieveUpdateAPIView):
             serializer.is_valid(raise_exception=True)
             with transaction.atomic():
                 updated_instance = serializer.save()
-                if updated_instance.is_complete_with_next_of_kin():
-                    existing_account = BankAccount.objects.filter(
-                        user=request.user,
-                        currency=updated_instance.account_currency,
-                        account_type=updated_instance.account_type,
-                    ).first()
-
-                    if not existing_account:
-                        bank_account = create_bank_account(
-                            request.user,
-                            currency=updated_instance.account_currency,
-                            account_type=updated_instance.account_type,
-                        )
+                if updated_instance.is_complete:
+                    bank_account = None
+                    if updated_instance.awaiting_account:
+                        bank_account = open_pending_account(updated_instance)
+
+                    if bank_account:
                         message = (
                             "Profile updated and new bank account created successfully. "
                             "An email has been sent to you with further instructions"
@@ -143,6 +153,173 @@ class ProfileDetailAPIView(generics.RetrieveUpdateAPIView):
         serializer.save()
 
 
+class ChunkParser(BaseParser):
+    media_type = "*/*"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> bytes:
+        # One byte past the limit is enough to tell an oversized chunk apart.
+        if stream is None:
+            return b""
+        return stream.read(settings.CHUNKED_UPLOAD_CHUNK_SIZE + 1)
+
+
+class ChunkedUploadInitAPIView(generics.CreateAPIView):
+    serializer_class = ChunkedUploadInitSerializer
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "chunked_upload"
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = create_upload(
+            request.user.pk,
+            request.user.profile.pk,
+            serializer.validated_data["field"],
+            serializer.validated_data["size"],
+        )
+        return Response(
+            {
+                "upload_id": upload["upload_id"],
+                "field": upload["field"],
+                "size": upload["size"],
+                "offset": upload["offset"],
+                "chunk_size": settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ChunkedUploadAPIView(APIView):
+    parser_classes = [ChunkParser]
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "chunked_upload"
+
+    def get_upload(self, upload_id) -> dict:
+        upload = get_upload(upload_id, self.request.user.pk)
+        if upload is None:
+            raise Http404("Upload does not exist or has expired")
+        return upload
+
+    def get(self, request: Request, upload_id, *args: Any, **kwargs: Any) -> Response:
+        upload = self.get_upload(upload_id)
+        return Response(
+            {
+                "upload_id": upload["upload_id"],
+                "field": upload["field"],
+                "size": upload["size"],
+                "offset": upload["offset"],
+            }
+        )
+
+    def put(self, request: Request, upload_id, *args: Any, **kwargs: Any) -> Response:
+        upload = self.get_upload(upload_id)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "Upload-Offset header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        chunk = request.data
+        if len(chunk) > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+            return Response(
+                {"error": "Chunk is larger than the allowed chunk size"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if not chunk or offset + len(chunk) > upload["size"]:
+            return Response(
+                {"error": "Chunk does not fit in the declared upload size"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            new_offset = write_chunk(upload, offset, chunk)
+        except ChunkOffsetMismatch as e:
+            return Response(
+                {"error": "Chunk offset does not match", "offset": e.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except ChunkedUploadBusy:
+            return Response(
+                {"error": "Another chunk for this upload is being written"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response({"upload_id": upload["upload_id"], "offset": new_offset})
+
+
+class ChunkedUploadCompleteAPIView(APIView):
+    renderer_classes = [GenericJSONRenderer]
+    object_label = "chunked_upload"
+
+    def post(self, request: Request, upload_id, *args: Any, **kwargs: Any) -> Response:
+        upload = get_upload(upload_id, request.user.pk)
+        if upload is None:
+            raise Http404("Upload does not exist or has expired")
+        if upload["offset"] != upload["size"]:
+            return Response(
+                {"error": "Upload is not complete", "offset": upload["offset"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            finished = finish_upload(upload)
+        except ChunkedUploadBusy:
+            return Response(
+                {"error": "This upload is already being completed"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if finished is None:
+            raise Http404("Upload does not exist or has expired")
+
+        name, photo_hash = finished
+        expected_hash = request.data.get("sha256")
+        if expected_hash and expected_hash.lower() != photo_hash:
+            discard_upload({**upload, "name": name})
+            return Response(
+                {"error": "Uploaded content does not match the provided sha256"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        field_name = upload["field"]
+        with upload_storage.open(name, "rb") as photo:
+            valid_photo = is_valid_photo(photo)
+        if not valid_photo:
+            discard_upload({**upload, "name": name})
+            return Response(
+                {
+                    "errors": {
+                        field_name: [
+                            "Upload a valid image. The file you uploaded was "
+                            "either not an image or a corrupted image."
+                        ]
+                    }
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        profile = Profile.objects.get(id=upload["profile_id"])
+        if reuse_uploaded_photo(profile, field_name, photo_hash):
+            upload_storage.delete(name)
+            return Response(
+                {"message": "Photo already uploaded", "field": field_name},
+                status=status.HTTP_200_OK,
+            )
+
+        upload_photos_to_cloudinary.delay(
+            str(profile.id), {field_name: {"name": name, "hash": photo_hash}}
+        )
+        return Response(
+            {
+                "message": "Upload received and queued for processing",
+                "field": field_name,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
 class NextOfKinAPIView(generics.ListCreateAPIView):
     serializer_class = NextOfKinSerializer
     pagination_calss = StandardResultsSetPagination